@@ -0,0 +1,67 @@
+"""Compare loans per second of :mod:`mortgage.batch` against the scalar :class:`Loan`.
+
+Install the package with ``pip install -e .[numpy]`` and run from the top level directory::
+
+    python benchmarks/bench_batch.py --loans 100000
+"""
+import argparse
+import random
+import time
+
+from mortgage import Loan, batch
+
+
+def make_portfolio(size, seed=0):
+    rng = random.Random(seed)
+    principals = [rng.randrange(50000, 1000000, 1000) for _ in range(size)]
+    rates = [rng.randrange(200, 800, 125) / 10000 for _ in range(size)]
+    terms = [rng.choice([15, 30]) for _ in range(size)]
+    return principals, rates, terms
+
+
+def scalar(principals, rates, terms):
+    for principal, rate, term in zip(principals, rates, terms):
+        loan = Loan(principal=principal, interest=rate, term=term)
+        loan.monthly_payment, loan.total_interest, loan.apr, loan.apy  # pylint: disable=pointless-statement
+
+
+def scalar_schedules(principals, rates, terms):
+    for principal, rate, term in zip(principals, rates, terms):
+        Loan(principal=principal, interest=rate, term=term).schedule()
+
+
+def vectorized(principals, rates, terms):
+    batch.amortize(principals, rates, terms, reduced=True)
+
+
+def vectorized_schedules(principals, rates, terms):
+    batch.amortize(principals, rates, terms)
+
+
+def rate(func, principals, rates, terms):
+    start = time.perf_counter()
+    func(principals, rates, terms)
+    return len(principals) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--loans', type=int, default=20000, help='number of loans in the batch')
+    args = parser.parse_args()
+
+    portfolio = make_portfolio(args.loans)
+    sample = [column[:max(args.loans // 100, 10)] for column in portfolio]
+
+    cases = [
+        ('summary statistics', scalar, vectorized, portfolio),
+        ('full schedules', scalar_schedules, vectorized_schedules, sample),
+    ]
+    print('{:<20} {:>16} {:>16} {:>10}'.format('case', 'Loan loans/s', 'batch loans/s', 'speedup'))
+    for name, slow, fast, loans in cases:
+        slow_rate = rate(slow, *[column[:max(len(column) // 10, 10)] for column in loans])
+        fast_rate = rate(fast, *loans)
+        print('{:<20} {:>16,.0f} {:>16,.0f} {:>9.0f}x'.format(name, slow_rate, fast_rate, fast_rate / slow_rate))
+
+
+if __name__ == '__main__':
+    main()
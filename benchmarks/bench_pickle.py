@@ -0,0 +1,51 @@
+"""Compare the pickled size and round trip time of :class:`Loan` against its :class:`LoanSpec`.
+
+Run from the top level directory::
+
+    python benchmarks/bench_pickle.py --loans 1000
+"""
+import argparse
+import pickle
+import time
+
+from mortgage import Loan
+from mortgage.prepayment import Prepayment
+
+
+def make_loans(size, backend, built):
+    loans = [Loan(principal=100000 + 1000 * (index % 500), interest=.03 + .00125 * (index % 32),
+                  term=(15, 30)[index % 2], backend=backend,
+                  prepayment=Prepayment(extra=100) if backend == 'bank' else None)
+             for index in range(size)]
+    if built:
+        for loan in loans:
+            loan.schedule()
+    return loans
+
+
+def round_trip(objects):
+    start = time.perf_counter()
+    data = pickle.dumps(objects, protocol=pickle.HIGHEST_PROTOCOL)
+    pickle.loads(data)
+    return len(data) / len(objects), (time.perf_counter() - start) / len(objects)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--loans', type=int, default=1000, help='number of loans pickled at once')
+    args = parser.parse_args()
+
+    print('{:<24} {:>14} {:>14} {:>14} {:>14}'.format(
+        'case', 'Loan bytes', 'spec bytes', 'Loan us', 'spec us'))
+    for backend in ('decimal', 'float', 'bank'):
+        for built in (False, True):
+            loans = make_loans(args.loans, backend, built)
+            loan_size, loan_time = round_trip(loans)
+            spec_size, spec_time = round_trip([loan.spec for loan in loans])
+            name = '{}{}'.format(backend, ' + schedule' if built else '')
+            print('{:<24} {:>14,.0f} {:>14,.0f} {:>14,.1f} {:>14,.1f}'.format(
+                name, loan_size, spec_size, loan_time * 1e6, spec_time * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""Benchmark the common operations of :class:`Loan` and :mod:`mortgage.batch`.
+
+Every case reports its throughput and the peak memory allocated by one run of it. Results
+can be saved as JSON and compared against an earlier run to catch regressions between
+commits. Install the package with ``pip install -e .[numpy]`` (the batch cases are skipped
+without numpy) and run from the top level directory::
+
+    python benchmarks/suite.py --output before.json
+    git checkout my-branch
+    python benchmarks/suite.py --compare before.json
+"""
+import argparse
+import asyncio
+from collections import namedtuple
+import contextlib
+import io
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+
+from mortgage import Loan, aio
+
+try:
+    from mortgage import batch
+except ImportError:
+    batch = None
+
+Case = namedtuple('Case', 'name setup items')
+Result = namedtuple('Result', 'name ops_per_sec items_per_sec seconds peak_bytes')
+
+CASES = []
+
+
+def case(name, items=1, requires=True):
+    """Register a benchmark. The decorated function prepares and returns the callable to time."""
+    def register(setup):
+        if requires:
+            CASES.append(Case(name, setup, items))
+        return setup
+    return register
+
+
+for _compounded in ('monthly', 'daily', 'annually'):
+    for _term in (15, 30):
+        @case('construct/{}/{}'.format(_compounded, _term))
+        def _construct(compounded=_compounded, term=_term):
+            return lambda: Loan(principal=200000, interest=.06, term=term, compounded=compounded)
+
+
+@case('schedule/nth')
+def _schedule_nth():
+    return lambda: Loan(principal=200000, interest=.06, term=30).schedule(180)
+
+
+@case('schedule/nth/built')
+def _schedule_nth_built():
+    loan = Loan(principal=200000, interest=.06, term=30)
+    loan.schedule()
+    return lambda: loan.schedule(180)
+
+
+@case('schedule/full', items=361)
+def _schedule_full():
+    return lambda: Loan(principal=200000, interest=.06, term=30).schedule()
+
+
+@case('schedule/full/float', items=361)
+def _schedule_full_float():
+    return lambda: Loan(principal=200000, interest=.06, term=30, backend='float').schedule()
+
+
+@case('schedule/full/bank', items=361)
+def _schedule_full_bank():
+    return lambda: Loan(principal=200000, interest=.06, term=30, backend='bank').schedule()
+
+
+@case('schedule/iter', items=361)
+def _schedule_iter():
+    return lambda: sum(1 for _ in Loan(principal=200000, interest=.06, term=30).iter_schedule())
+
+
+for _name in ('monthly_payment', 'total_interest', 'apr', 'apy'):
+    @case('property/{}'.format(_name))
+    def _property(name=_name):
+        loan = Loan(principal=200000, interest=.06, term=30)
+        return lambda: getattr(loan, name)
+
+
+@case('summarize')
+def _summarize():
+    loan = Loan(principal=200000, interest=.06, term=30)
+
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            loan.summarize  # pylint: disable=pointless-statement
+    return run
+
+
+@case('summary')
+def _summary():
+    loan = Loan(principal=200000, interest=.06, term=30)
+    return loan.summary
+
+
+@case('pickle/loan/built')
+def _pickle_loan():
+    loan = Loan(principal=200000, interest=.06, term=30)
+    loan.schedule()
+    return lambda: pickle.loads(pickle.dumps(loan))
+
+
+@case('pickle/spec')
+def _pickle_spec():
+    spec = Loan(principal=200000, interest=.06, term=30).spec
+    return lambda: pickle.loads(pickle.dumps(spec)).loan()
+
+
+@case('aio/quote', items=1000)
+def _aio_quote():
+    specs = [(200000 + 1000 * (index % 100), .06, 30) for index in range(1000)]
+
+    async def load():
+        async with aio.QuoteService() as service:
+            await asyncio.gather(*(service.quote(*spec) for spec in specs))
+    return lambda: asyncio.run(load())
+
+
+_BATCH_SIZE = 10000
+
+
+def _portfolio(size):
+    principals = [50000 + 1000 * (index % 950) for index in range(size)]
+    rates = [.02 + .00125 * (index % 48) for index in range(size)]
+    terms = [(15, 30)[index % 2] for index in range(size)]
+    return principals, rates, terms
+
+
+@case('batch/amortize/reduced', items=_BATCH_SIZE, requires=batch is not None)
+def _batch_reduced():
+    portfolio = _portfolio(_BATCH_SIZE)
+    return lambda: batch.amortize(*portfolio, reduced=True)
+
+
+@case('batch/amortize', items=_BATCH_SIZE // 10, requires=batch is not None)
+def _batch_schedules():
+    portfolio = _portfolio(_BATCH_SIZE // 10)
+    return lambda: batch.amortize(*portfolio)
+
+
+@case('batch/rescale', items=_BATCH_SIZE // 10, requires=batch is not None)
+def _batch_rescale():
+    principals, _, _ = _portfolio(_BATCH_SIZE // 10)
+    return lambda: batch.rescale(principals, .06, 30)
+
+
+@case('batch/rate_from_payment', items=_BATCH_SIZE, requires=batch is not None)
+def _batch_rate():
+    principals, rates, terms = _portfolio(_BATCH_SIZE)
+    payments = batch.amortize(principals, rates, terms, reduced=True).monthly_payment
+    return lambda: batch.rate_from_payment(payments, principals, terms)
+
+
+def measure(benchmark, min_time=0.2, repeat=3) -> Result:
+    """
+    Time ``benchmark`` and record the peak memory allocated by one call of it.
+
+    The callable is run in a loop long enough to last ``min_time`` seconds, ``repeat``
+    times, and the fastest loop is kept. Memory is traced on a separate call, since
+    tracing slows everything down.
+    """
+    func = benchmark.setup()
+    func()
+
+    calls, elapsed = 1, 0.0
+    while True:
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            break
+        calls *= 2 if elapsed == 0 else max(2, int(min_time / elapsed * 1.2))
+
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(calls):
+            func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    seconds = best / calls
+    return Result(name=benchmark.name, ops_per_sec=1 / seconds,
+                  items_per_sec=benchmark.items / seconds, seconds=seconds, peak_bytes=peak)
+
+
+def _commit():
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], check=True,
+                                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.decode().strip()
+
+
+def run(pattern='', min_time=0.2, repeat=3) -> dict:
+    """Run every case whose name contains ``pattern`` and return the results as a dict."""
+    results = [measure(benchmark, min_time, repeat)
+               for benchmark in CASES if pattern in benchmark.name]
+    return {
+        'commit': _commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'results': {result.name: result._asdict() for result in results},
+    }
+
+
+def report(report_data, baseline=None, out=sys.stdout):
+    """Print the results as a table, with the change in throughput from ``baseline``."""
+    header = '{:<28} {:>14} {:>14} {:>12} {:>10}'.format(
+        'case', 'ops/s', 'items/s', 'peak KiB', 'change')
+    print(header, file=out)
+    print('-' * len(header), file=out)
+    previous = (baseline or {}).get('results', {})
+    for name, result in report_data['results'].items():
+        change = ''
+        if name in previous:
+            change = '{:+.1%}'.format(result['ops_per_sec'] / previous[name]['ops_per_sec'] - 1)
+        print('{:<28} {:>14,.0f} {:>14,.0f} {:>12,.1f} {:>10}'.format(
+            name, result['ops_per_sec'], result['items_per_sec'], result['peak_bytes'] / 1024,
+            change), file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('pattern', nargs='?', default='', help='only run cases containing this')
+    parser.add_argument('--min-time', type=float, default=0.2, help='seconds per timing loop')
+    parser.add_argument('--repeat', type=int, default=3, help='timing loops per case')
+    parser.add_argument('--output', help='save the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file of earlier results to compare against')
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as handle:
+            baseline = json.load(handle)
+
+    results = run(args.pattern, args.min_time, args.repeat)
+    report(results, baseline)
+    if args.output:
+        with open(args.output, 'w') as handle:
+            json.dump(results, handle, indent=2, sort_keys=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""Rate resets and recasts that re-amortize a loan part way through its term."""
+from bisect import bisect_right
+from decimal import Decimal
+
+from mortgage.prepayment import to_decimal
+
+
+def _last(numbers, number):
+    # The largest of the sorted ``numbers`` that is no greater than ``number``.
+    index = bisect_right(numbers, number)
+    return numbers[index - 1] if index else None
+
+
+class Adjustment(object):
+    """
+    :class:`Adjustment <Adjustment>` object describing changes to a loan's rate or payment.
+
+    Each change re-amortizes the loan: the level payment is recomputed so the balance at
+    that point is repaid over the rest of the original term. Two kinds can be combined:
+
+    :param resets: Mapping of payment number to the annual interest rate charged from that
+        payment on, as on an adjustable-rate mortgage (ARM). The payment is recomputed
+        from the balance before the payment at the new rate.
+    :param recasts: Mapping of payment number to a lump sum paid with that payment, after
+        which the payment is recomputed from the lower balance at the same rate.
+
+    Usage:
+        >>> from mortgage import Loan
+        >>> from mortgage.adjustment import Adjustment
+        >>> arm = Adjustment(resets={61: .07})
+        >>> loan = Loan(principal=200000, interest=.06, term=30, adjustment=arm)
+        >>> round(loan.schedule(61).payment, 2)
+        Decimal('1315.38')
+    """
+
+    def __init__(self, resets=None, recasts=None):
+        resets = resets or {}
+        recasts = recasts or {}
+
+        assert all(number > 0 for number in set(resets) | set(recasts)), \
+            'Payment numbers must be positive'
+        assert all(0 <= rate <= 1 for rate in resets.values()), \
+            'Interest rate must be between zero and one'
+        assert all(amount >= 0 for amount in recasts.values()), \
+            'Recast amounts must not be negative'
+
+        self.resets = {number: to_decimal(rate) for number, rate in resets.items()}
+        self.recasts = {number: to_decimal(amount) for number, amount in recasts.items()}
+        self._resets = sorted(self.resets)
+        self._events = sorted(set(self.resets) | set(self.recasts))
+
+    def __repr__(self):
+        return '<Adjustment resets={}, recasts={}>'.format(len(self.resets), len(self.recasts))
+
+    @classmethod
+    def arm(cls, rates, fixed, every=12, recasts=None):
+        """
+        Return the resets of an adjustable-rate mortgage following a path of rates.
+
+        The initial rate is fixed for ``fixed`` payments, then the rate resets to each of
+        ``rates`` in turn every ``every`` payments. A 5/1 ARM with monthly payments is
+        ``Adjustment.arm(rates, fixed=60)``.
+
+        Usage:
+            >>> from mortgage.adjustment import Adjustment
+            >>> sorted(Adjustment.arm([.07, .08], fixed=60).resets)
+            [61, 73]
+        """
+        resets = {fixed + 1 + index * every: rate for index, rate in enumerate(rates)}
+        return cls(resets=resets, recasts=recasts)
+
+    def reset_at(self, number):
+        """Return the annual rate the nth payment resets to, or ``None``."""
+        return self.resets.get(number)
+
+    def recast_at(self, number) -> Decimal:
+        """Return the lump sum paid with the nth payment before recasting, or ``None``."""
+        return self.recasts.get(number)
+
+    def last_reset(self, number):
+        """Return the last payment number, up to ``number``, with a reset, or ``None``."""
+        return _last(self._resets, number)
+
+    def last_event(self, number):
+        """Return the last payment number, up to ``number``, with any change, or ``None``."""
+        return _last(self._events, number)
+
+    def first_difference(self, other: 'Adjustment'):
+        """
+        Return the first payment number at which ``other`` may adjust differently, or ``None``.
+
+        Schedules are identical up to, but not including, this payment.
+        """
+        other = other or Adjustment()
+        candidates = [number for number in set(self.resets) | set(other.resets)
+                      if self.resets.get(number) != other.resets.get(number)]
+        candidates.extend(number for number in set(self.recasts) | set(other.recasts)
+                          if self.recasts.get(number) != other.recasts.get(number))
+        return min(candidates) if candidates else None
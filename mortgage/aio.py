@@ -0,0 +1,304 @@
+"""Quote loans from asyncio code without blocking the event loop.
+
+A :class:`QuoteService` sends the work behind every quote to an executor, so coroutines
+awaiting quotes never run it on the event loop. Between the callers and the executor:
+
+* concurrent requests for the same loan are coalesced into one computation, and all of
+  their callers receive its :class:`~mortgage.loan.Summary`
+* requests queued while the executor is busy, or within ``max_delay`` of each other, are
+  computed together in one call of at most ``max_batch`` loans, vectorized with
+  :mod:`mortgage.batch` when numpy is installed
+* at most ``max_pending`` distinct loans are queued or computing at once; further
+  requests wait for a free slot, for at most ``max_wait`` seconds if it is set
+
+Usage:
+    >>> import asyncio
+    >>> from mortgage import aio
+    >>> async def main():
+    ...     async with aio.QuoteService() as service:
+    ...         quotes = await asyncio.gather(service.quote(200000, .06, 30),
+    ...                                       service.quote(200000, .06, 30),
+    ...                                       service.quote(200000, .06, 15))
+    ...         return [quote.monthly_payment for quote in quotes], service.stats().computed
+    >>> asyncio.run(main())
+    ([Decimal('1199.10'), Decimal('1199.10'), Decimal('1687.71')], 2)
+"""
+import asyncio
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from mortgage import instrumentation
+from mortgage.loan import Loan, LoanSpec, Summary
+
+try:
+    from mortgage import batch
+except ImportError:
+    batch = None
+
+Stats = namedtuple('Stats', 'requests coalesced rejected batches computed pending '
+                            'latency_mean latency_p50 latency_p99 throughput')
+
+
+def _key(principal, interest, term, term_unit, compounded):
+    LoanSpec(principal, interest, term, term_unit, compounded)
+    return principal, interest, term, term_unit, compounded
+
+
+def quote_batch(keys, vectorize=False):
+    """
+    Summarize the loans of a batch of requests, in the calling thread.
+
+    :param keys: Sequence of ``(principal, interest, term, term_unit, compounded)`` tuples.
+    :param vectorize: Compute the payments and interest of the batch with
+        :mod:`mortgage.batch`. Amounts are then the float closed forms rounded to the cent,
+        which match :meth:`Loan.summary <mortgage.Loan.summary>` except at exact half cent
+        ties, as the ``float`` backend does.
+    :return: list of :class:`~mortgage.loan.Summary`, one per key
+    """
+    # Batches read terms in years, so loans with terms in other units are summarized alone.
+    in_years = [key for key in keys if key[3] == 'years'] if vectorize else []
+    if not in_years:
+        return [Loan(*key).summary() for key in keys]
+    principals, rates, terms, _, compounded = zip(*in_years)
+    loans = batch.prepare(principals, rates, terms, compounded)
+    payments = batch.level_payments(loans.principals, loans.period_rates, loans.n_payments)
+    total_interest = payments * loans.n_payments - loans.principals
+    summaries = {key: Summary.from_loan(Loan(*key), payment, interest)
+                 for key, payment, interest in zip(in_years, payments.tolist(),
+                                                   total_interest.tolist())}
+    return [summaries[key] if key in summaries else Loan(*key).summary() for key in keys]
+
+
+class QuoteService(object):
+    """
+    :class:`QuoteService <QuoteService>` object answering quote requests from coroutines.
+
+    The service starts with the first request, on the running event loop, and must be
+    used from that loop only. Close it with :meth:`close` or use it as an async context
+    manager to stop its batching task and, if the service created it, its executor.
+
+    :param max_batch: The most loans computed by one executor call.
+    :param max_delay: Seconds to wait after the first queued request for others to batch
+        with it. Zero only batches the requests queued while the executor was busy.
+    :param max_pending: The most distinct loans queued or computing at once.
+    :param max_wait: Seconds a request may wait for a pending slot before it fails with
+        :class:`asyncio.TimeoutError`. By default requests wait as long as needed.
+    :param workers: Threads of the executor the service creates, and the most batches sent
+        to the executor at once. Further batches wait for one of them to finish, and
+        requests made meanwhile join them.
+    :param executor: A :class:`concurrent.futures.Executor` to use instead. Set ``workers``
+        to the number of batches it should run at once.
+    :param vectorize: Compute batches with numpy, by default when it is installed.
+    """
+
+    def __init__(self, max_batch=256, max_delay=0.001, max_pending=4096, max_wait=None, workers=1,
+                 executor=None, vectorize=None):
+        assert max_batch > 0, 'max_batch must be a positive number'
+        assert max_delay >= 0, 'max_delay must not be negative'
+        assert max_pending > 0, 'max_pending must be a positive number'
+        assert max_wait is None or max_wait > 0, 'max_wait must be a positive number'
+        assert workers > 0, 'workers must be a positive number'
+        assert not vectorize or batch is not None, 'vectorize requires numpy'
+
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.max_pending = max_pending
+        self.max_wait = max_wait
+        self.vectorize = batch is not None if vectorize is None else vectorize
+        self.workers = workers
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=workers)
+        self._inflight = {}
+        self._queue = []
+        self._tasks = set()
+        self._batcher = None
+        self._closed = False
+        self._latencies = deque(maxlen=10000)
+        self._started = None
+        self._counts = dict(requests=0, coalesced=0, rejected=0, batches=0, computed=0,
+                            completed=0)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _start(self):
+        # Synchronization primitives are created on the loop that uses them.
+        self._slots = asyncio.Semaphore(self.max_pending)
+        self._running = asyncio.Semaphore(self.workers)
+        self._wakeup = asyncio.Event()
+        self._batcher = asyncio.ensure_future(self._batch())
+        self._started = instrumentation.clock()
+
+    async def quote(self, principal, interest, term, term_unit='years',
+                    compounded='monthly') -> Summary:
+        """
+        Return the :meth:`Loan.summary <mortgage.Loan.summary>` of a loan.
+
+        Arguments are those of :class:`~mortgage.Loan` and are validated before the request
+        is queued. Raises :class:`RuntimeError` once the service is closed.
+        """
+        key = _key(principal, interest, term, term_unit, compounded)
+        if self._closed:
+            raise RuntimeError('QuoteService is closed')
+        if self._batcher is None:
+            self._start()
+        started = instrumentation.clock()
+        self._counts['requests'] += 1
+        future = self._inflight.get(key)
+        if future is None:
+            await self._acquire()
+            if self._closed:
+                self._slots.release()
+                raise RuntimeError('QuoteService is closed')
+            future = self._inflight.get(key)
+            if future is None:
+                future = asyncio.get_event_loop().create_future()
+                self._inflight[key] = future
+                self._queue.append(key)
+                self._wakeup.set()
+            else:
+                self._slots.release()
+                self._coalesce()
+        else:
+            self._coalesce()
+
+        try:
+            return await asyncio.shield(future)
+        finally:
+            latency = instrumentation.clock() - started
+            self._latencies.append(latency)
+            self._counts['completed'] += 1
+            if instrumentation.enabled:
+                instrumentation.timing('aio.quote', latency)
+
+    def _coalesce(self):
+        self._counts['coalesced'] += 1
+        if instrumentation.enabled:
+            instrumentation.count('aio.coalesced')
+
+    async def _acquire(self):
+        if self.max_wait is None:
+            await self._slots.acquire()
+            return
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.max_wait)
+        except asyncio.TimeoutError:
+            self._counts['rejected'] += 1
+            if instrumentation.enabled:
+                instrumentation.count('aio.rejected')
+            raise
+
+    async def _batch(self):
+        while True:
+            await self._wakeup.wait()
+            if self.max_delay and len(self._queue) < self.max_batch:
+                await asyncio.sleep(self.max_delay)
+            self._wakeup.clear()
+            while self._queue:
+                await self._dispatch()
+
+    async def _dispatch(self):
+        # Wait until fewer than ``workers`` batches are computing, so the requests queued
+        # while the executor is busy are sent together in the next batch.
+        await self._running.acquire()
+        keys = self._queue[:self.max_batch]
+        del self._queue[:self.max_batch]
+        task = asyncio.ensure_future(self._compute(keys))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _compute(self, keys):
+        self._counts['batches'] += 1
+        if instrumentation.enabled:
+            instrumentation.count('aio.batches')
+            instrumentation.count('aio.computed', len(keys))
+        loop = asyncio.get_event_loop()
+        try:
+            results = await loop.run_in_executor(self._executor, quote_batch, keys, self.vectorize)
+            error = None
+        except Exception as exception:
+            results, error = [None] * len(keys), exception
+        finally:
+            self._running.release()
+        self._counts['computed'] += len(keys)
+        for key, result in zip(keys, results):
+            future = self._inflight.pop(key)
+            self._slots.release()
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                future.set_exception(error)
+
+    def stats(self) -> Stats:
+        """
+        Return the counts of requests and batches so far and the latency of recent requests.
+
+        ``coalesced`` requests shared the computation of an earlier identical request, and
+        ``computed`` is the number of loans actually computed. Latencies are in seconds,
+        over the last 10,000 requests, and ``throughput`` is completed requests per second
+        since the first request.
+        """
+        latencies = sorted(self._latencies)
+        elapsed = instrumentation.clock() - self._started if self._started is not None else 0
+
+        def percentile(fraction):
+            return latencies[min(int(fraction * len(latencies)), len(latencies) - 1)]
+
+        return Stats(requests=self._counts['requests'],
+                     coalesced=self._counts['coalesced'],
+                     rejected=self._counts['rejected'],
+                     batches=self._counts['batches'],
+                     computed=self._counts['computed'],
+                     pending=len(self._inflight),
+                     latency_mean=sum(latencies) / len(latencies) if latencies else 0.0,
+                     latency_p50=percentile(.5) if latencies else 0.0,
+                     latency_p99=percentile(.99) if latencies else 0.0,
+                     throughput=self._counts['completed'] / elapsed if elapsed else 0.0)
+
+    async def close(self):
+        """Finish the batches being computed, then stop the service. Closing twice does nothing."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._batcher is not None:
+            self._batcher.cancel()
+            try:
+                await self._batcher
+            except asyncio.CancelledError:
+                pass
+            while self._queue:
+                await self._dispatch()
+            if self._tasks:
+                await asyncio.gather(*self._tasks)
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+
+_service = None
+
+
+async def quote(principal, interest, term, term_unit='years', compounded='monthly') -> Summary:
+    """
+    Return the :meth:`Loan.summary <mortgage.Loan.summary>` of a loan from a shared service.
+
+    The module keeps one :class:`QuoteService` with the default settings for the running
+    event loop, and replaces it when called from another loop.
+
+    Usage:
+        >>> import asyncio
+        >>> from mortgage import aio
+        >>> asyncio.run(aio.quote(200000, .06, 30)).total_paid
+        Decimal('431676.38')
+    """
+    global _service
+    loop = asyncio.get_event_loop()
+    if _service is None or _service[0] is not loop:
+        if _service is not None:
+            _service[1]._executor.shutdown(wait=False)
+        _service = (loop, QuoteService())
+    return await _service[1].quote(principal, interest, term, term_unit, compounded)
@@ -0,0 +1,283 @@
+"""Vectorized amortization of many loans at once.
+
+This module requires `numpy <https://numpy.org>`_, available with ``pip install mortgage[numpy]``.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from mortgage.loan import PERIODS, Loan
+from mortgage.solve import MAX_ITERATIONS, RATE_TOLERANCE
+
+Loans = namedtuple('Loans', 'principals rates n_payments period_rates n_periods')
+Schedules = namedtuple('Schedules', 'interest principal balance mask')
+Summaries = namedtuple('Summaries', 'monthly_payment total_interest apr apy')
+
+
+def _periods(compounded, size):
+    if isinstance(compounded, str):
+        assert compounded in PERIODS, \
+            'Compounding can occur daily, weekly, biweekly, semimonthly, monthly, or annually'
+        return np.full(size, PERIODS[compounded], dtype=np.int64)
+    compounded = list(compounded)
+    assert all(value in PERIODS for value in compounded), \
+        'Compounding can occur daily, weekly, biweekly, semimonthly, monthly, or annually'
+    return np.array([PERIODS[value] for value in compounded], dtype=np.int64)
+
+
+def _round_like_loan(values, exact):
+    # Round to the cent, rounding values that are within float error of a half cent tie
+    # with ``exact(index)``, which computes them in Decimal as Loan does.
+    rounded = np.round(values, 2)
+    scaled = values * 100
+    for index in np.flatnonzero(np.abs(scaled - np.floor(scaled) - .5) < 1e-6):
+        rounded[index] = float(exact(index))
+    return rounded
+
+
+def prepare(principals, rates, terms, compounded='monthly') -> Loans:
+    """
+    Validate the arguments of many loans and broadcast them to flat arrays.
+
+    This is how every function of this module reads its arguments, for other vectorized
+    code to read loans the same way.
+
+    :param principals: The original sum of money borrowed for each loan.
+    :param rates: The annual interest rate for each loan.
+    :param terms: The lifespan of each loan in years, rounded to the nearest whole payment.
+    :param compounded: Frequency that interest is compounded, for all loans or one per loan.
+    :return: :class:`Loans` of per loan arrays
+
+    Usage:
+        >>> from mortgage import batch
+        >>> loans = batch.prepare([200000, 150000], .06, [30, 15.5])
+        >>> loans.n_payments.tolist(), loans.period_rates.tolist()
+        ([360, 186], [0.005, 0.005])
+    """
+    principals = np.asarray(principals, dtype=np.float64).ravel()
+    rates = np.asarray(rates, dtype=np.float64).ravel()
+    terms = np.asarray(terms, dtype=np.float64).ravel()
+    principals, rates, terms = np.broadcast_arrays(principals, rates, terms)
+    n_periods = _periods(compounded, principals.size)
+
+    assert np.all(principals > 0), 'Principal must be positive value'
+    assert np.all((rates >= 0) & (rates <= 1)), 'Interest rate must be between zero and one'
+    assert np.all(terms > 0), 'Term must be a positive number'
+    assert n_periods.size == principals.size, 'compounded must be a string or one value per loan'
+
+    # Terms that are not a whole number of payments are rounded to the nearest payment, as
+    # Loan rounds them.
+    n_payments = np.round(terms * n_periods).astype(np.int64)
+    assert np.all(n_payments > 0), 'Term must be at least one payment long'
+    return Loans(principals=principals, rates=rates, n_payments=n_payments,
+                 period_rates=rates / n_periods, n_periods=n_periods)
+
+
+def level_payments(principals, period_rates, n_payments):
+    """
+    Return the level payment repaying each principal over its payments at its periodic rate.
+
+    Usage:
+        >>> from mortgage import batch
+        >>> batch.level_payments([200000, 1200], [.005, 0], 360).round(2).tolist()
+        [1199.1, 3.33]
+    """
+    principals, period_rates = np.asarray(principals), np.asarray(period_rates)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        payments = principals * period_rates / -np.expm1(-n_payments * np.log1p(period_rates))
+    return np.where(period_rates == 0, principals / n_payments, payments)
+
+
+def amortize(principals, rates, terms, compounded='monthly', reduced=False):
+    """
+    Amortize many fixed rate loans in one vectorized pass.
+
+    Arguments are broadcast against each other, so a scalar may be given for any of them.
+    Loans with different terms are padded to the longest term; ``mask`` is ``False`` for
+    the padded periods and their values are zero.
+
+    Columns follow :meth:`Loan.schedule <mortgage.Loan.schedule>` numbering, so column ``n``
+    holds the nth payment and column ``0`` the opening balance. All values are ``float64``.
+    The full tables take ``loans * (periods + 1) * 25`` bytes, so very large portfolios
+    should be passed in chunks or with ``reduced=True``.
+
+    :param principals: The original sum of money borrowed for each loan.
+    :param rates: The annual interest rate for each loan.
+    :param terms: The lifespan of each loan in years, rounded to the nearest whole payment.
+    :param compounded: Frequency that interest is compounded, for all loans or one per loan.
+    :param reduced: Only return the per loan summary statistics instead of the schedules.
+        Their ``apr`` and ``apy`` are rounded to the cent exactly as :class:`~mortgage.Loan`
+        rounds them; the few that fall on a half cent are computed by a ``Loan``.
+    :return: :class:`Schedules` of ``(loans, periods + 1)`` arrays, or :class:`Summaries`
+        of per loan arrays when ``reduced`` is set.
+
+    Usage:
+        >>> from mortgage import batch
+        >>> summaries = batch.amortize([200000, 150000], [.06, .045], [30, 15], reduced=True)
+        >>> summaries.monthly_payment.tolist()
+        [1199.1, 1147.49]
+        >>> schedules = batch.amortize([200000, 150000], [.06, .045], [30, 15])
+        >>> schedules.balance.shape
+        (2, 361)
+        >>> bool(schedules.mask[1, 181])
+        False
+    """
+    prepared = prepare(principals, rates, terms, compounded)
+    principals, rates, n_payments, period_rates, n_periods = prepared
+    payments = level_payments(principals, period_rates, n_payments)
+
+    if reduced:
+        # The rates are rounded like Loan's, through Decimal, wherever float rounding of a
+        # half cent could go the other way.
+        compounding = {periods: name for name, periods in PERIODS.items()}
+
+        def loan(index):
+            return Loan(principal=float(principals[index]), interest=float(rates[index]), term=1,
+                        compounded=compounding[int(n_periods[index])])
+
+        total_interest = payments * n_payments - principals
+        simple_interest = np.round(principals * rates, 2)
+        apy = np.expm1(n_periods * np.log1p(period_rates))
+        return Summaries(monthly_payment=np.round(payments, 2),
+                         total_interest=np.round(total_interest, 2),
+                         apr=_round_like_loan(simple_interest / principals * 100,
+                                              lambda index: loan(index).apr),
+                         apy=_round_like_loan(apy * 100, lambda index: loan(index).apy))
+
+    numbers = np.arange(n_payments.max() + 1)
+    mask = numbers[np.newaxis, :] <= n_payments[:, np.newaxis]
+    remaining = np.maximum(n_payments[:, np.newaxis] - numbers[np.newaxis, :], 0)
+
+    # The balance after n payments is the present value of the payments still to come.
+    rates_column = period_rates[:, np.newaxis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        annuity = -np.expm1(-remaining * np.log1p(rates_column)) / rates_column
+    annuity = np.where(rates_column == 0, remaining, annuity)
+    balance = payments[:, np.newaxis] * annuity
+    balance[:, 0] = principals
+
+    interest = np.zeros_like(balance)
+    interest[:, 1:] = balance[:, :-1] * rates_column
+    principal = np.zeros_like(balance)
+    principal[:, 1:] = balance[:, :-1] - balance[:, 1:]
+
+    interest[~mask] = 0
+    principal[~mask] = 0
+    balance[~mask] = 0
+    return Schedules(interest=interest, principal=principal, balance=balance, mask=mask)
+
+
+def rescale(principals, rate, term, compounded='monthly'):
+    """
+    Amortize many loans that share one rate and term by rescaling a single schedule.
+
+    Every column of a level payment schedule is proportional to the principal, so the
+    schedule for a principal of one is computed once and multiplied by each principal.
+    This replaces ``loans * periods`` power evaluations with one outer product.
+
+    :param principals: The original sum of money borrowed for each loan.
+    :param rate: The annual interest rate shared by every loan.
+    :param term: The lifespan shared by every loan in years.
+    :param compounded: Frequency that interest is compounded.
+    :return: :class:`Schedules` of ``(loans, periods + 1)`` arrays, as from :func:`amortize`.
+
+    Usage:
+        >>> from mortgage import batch
+        >>> schedules = batch.rescale([200000, 350000, 425000], .06, 30)
+        >>> schedules.balance[:, 10].round(2).tolist()
+        [197963.59, 346436.28, 420672.63]
+    """
+    principals = np.asarray(principals, dtype=np.float64).ravel()
+    assert np.all(principals > 0), 'Principal must be positive value'
+    unit = amortize(1, rate, term, compounded)
+    mask = np.broadcast_to(unit.mask, (principals.size, unit.mask.shape[1]))
+    return Schedules(interest=np.outer(principals, unit.interest[0]),
+                     principal=np.outer(principals, unit.principal[0]),
+                     balance=np.outer(principals, unit.balance[0]),
+                     mask=mask)
+
+
+def _annuity(period_rates, n_payments):
+    # Payment per unit of principal, and its derivative with respect to the periodic rate.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        paid_down = -np.expm1(-n_payments * np.log1p(period_rates))
+        factor = period_rates / paid_down
+        discounted = n_payments * period_rates * (1 - paid_down) / (1 + period_rates)
+        derivative = (paid_down - discounted) / paid_down ** 2
+    zero = period_rates == 0
+    factor = np.where(zero, 1 / n_payments, factor)
+    derivative = np.where(zero, (n_payments + 1) / (2 * n_payments), derivative)
+    return factor, derivative
+
+
+def rate_from_payment(payments, principals, terms, compounded='monthly'):
+    """
+    Return the annual interest rate of each loan, given its payment, principal and term.
+
+    The vectorized form of :func:`mortgage.solve.rate_from_payment`, iterating Newton's
+    method on every loan at once until all of them have converged.
+
+    Usage:
+        >>> from mortgage import batch
+        >>> batch.rate_from_payment([1199.10, 1687.71], 200000, [30, 15]).round(4).tolist()
+        [0.06, 0.06]
+    """
+    payments = np.asarray(payments, dtype=np.float64).ravel()
+    principals, _, n_payments, _, n_periods = prepare(principals, 0, terms, compounded)
+    payments, principals, n_payments, n_periods = np.broadcast_arrays(
+        payments, principals, n_payments, n_periods)
+    target = payments / principals
+    assert np.all(target * n_payments >= 1), 'Payment is too small to ever repay the principal'
+
+    low, high = np.zeros_like(target), target.copy()
+    tangent = (target - 1 / n_payments) * 2 * n_payments / (n_payments + 1)
+    rates = np.minimum(high, np.maximum(0, tangent))
+    for _ in range(MAX_ITERATIONS):
+        factor, derivative = _annuity(rates, n_payments)
+        error = factor - target
+        if np.all(np.abs(error) <= RATE_TOLERANCE * target):
+            break
+        high = np.where(error > 0, rates, high)
+        low = np.where(error > 0, low, rates)
+        rates = rates - error / derivative
+        outside = (rates <= low) | (rates >= high)
+        rates = np.where(outside, (low + high) / 2, rates)
+    return rates * n_periods
+
+
+def term_from_payment(payments, principals, rates, compounded='monthly'):
+    """
+    Return the term in years over which each payment repays its principal.
+
+    The vectorized form of :func:`mortgage.solve.term_from_payment`.
+
+    Usage:
+        >>> from mortgage import batch
+        >>> batch.term_from_payment([1199.10, 1687.71], 200000, .06).round(1).tolist()
+        [30.0, 15.0]
+    """
+    payments = np.asarray(payments, dtype=np.float64).ravel()
+    principals, _, _, period_rates, n_periods = prepare(principals, rates, 1, compounded)
+    assert np.all(payments > principals * period_rates), \
+        'Payment does not cover the interest on the principal'
+    with np.errstate(divide='ignore', invalid='ignore'):
+        n_payments = -np.log1p(-principals * period_rates / payments) / np.log1p(period_rates)
+    n_payments = np.where(period_rates == 0, principals / payments, n_payments)
+    return n_payments / n_periods
+
+
+def principal_from_payment(payments, rates, terms, compounded='monthly'):
+    """
+    Return the largest principal each payment repays at its rate and term, rounded to the cent.
+
+    The vectorized form of :func:`mortgage.solve.principal_from_payment`.
+
+    Usage:
+        >>> from mortgage import batch
+        >>> batch.principal_from_payment([1199.10, 1687.71], .06, [30, 15]).tolist()
+        [199999.82, 199999.57]
+    """
+    payments = np.asarray(payments, dtype=np.float64).ravel()
+    _, _, n_payments, period_rates, _ = prepare(1, rates, terms, compounded)
+    factor, _ = _annuity(period_rates, n_payments)
+    return np.round(payments / factor, 2)
@@ -0,0 +1,255 @@
+"""Bounded caches of loans and amortization schedules shared between callers.
+
+Loans quoted over and over with the same terms (standard 15 and 30 year terms at rates
+quoted to an eighth of a point) are built once and handed out again. Schedules are kept
+per rate and term for a principal of one and rescaled to each balance, so loans that only
+differ in principal share all of the amortization work.
+
+Everything returned from this module is shared between callers. Loans are
+:class:`SharedLoan` objects that refuse to be changed; schedules must be treated as
+read-only.
+"""
+from collections import OrderedDict, namedtuple
+import threading
+
+from mortgage import instrumentation
+from mortgage.adjustment import Adjustment
+from mortgage.loan import Loan, LoanSpec
+from mortgage.prepayment import Prepayment
+
+CacheInfo = namedtuple('CacheInfo', 'hits misses evictions currsize nbytes maxsize maxbytes')
+
+
+class LRUCache(object):
+    """
+    :class:`LRUCache <LRUCache>` object keeping the most recently used values.
+
+    The cache is bounded by a number of entries, a number of bytes or both. When a new
+    value would exceed either bound, the least recently used values are evicted.
+
+    :param maxsize: The largest number of entries to keep, or ``None`` for no limit.
+    :param maxbytes: The largest total size in bytes to keep, or ``None`` for no limit.
+    :param sizeof: Function returning the size of a value in bytes, required with ``maxbytes``.
+    :param name: Name the cache's hits, misses and evictions are reported under by
+        :mod:`~mortgage.instrumentation`.
+
+    Usage:
+        >>> from mortgage.cache import LRUCache
+        >>> cache = LRUCache(maxsize=2)
+        >>> cache.get('a', lambda: 1), cache.get('a', lambda: 2)
+        (1, 1)
+        >>> cache.info()
+        CacheInfo(hits=1, misses=1, evictions=0, currsize=1, nbytes=0, maxsize=2, maxbytes=None)
+    """
+
+    def __init__(self, maxsize=128, maxbytes=None, sizeof=None, name='cache'):
+        assert maxsize is None or maxsize > 0, 'maxsize must be a positive number'
+        assert maxbytes is None or sizeof is not None, 'sizeof is required to limit the cache in bytes'
+
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self._sizeof = sizeof
+        self.name = name
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.nbytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, factory):
+        """
+        Return the value cached for ``key``, calling ``factory()`` to create it on a miss.
+
+        The factory runs outside of the cache lock, so slow values do not block other keys.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if instrumentation.enabled:
+                    instrumentation.count('cache.{}.hits'.format(self.name))
+                return entry[0]
+            self.misses += 1
+        if instrumentation.enabled:
+            instrumentation.count('cache.{}.misses'.format(self.name))
+
+        value = factory()
+        size = self._sizeof(value) if self._sizeof else 0
+
+        with self._lock:
+            if key in self._entries:
+                return self._entries[key][0]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            self._evict()
+        return value
+
+    def _evict(self):
+        while self._entries and (self._over(len(self._entries), self.maxsize)
+                                 or self._over(self.nbytes, self.maxbytes)):
+            _, (_, size) = self._entries.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+            if instrumentation.enabled:
+                instrumentation.count('cache.{}.evictions'.format(self.name))
+
+    @staticmethod
+    def _over(value, limit):
+        return limit is not None and value > limit
+
+    def info(self) -> CacheInfo:
+        """Return the hit, miss and eviction counters and the current size of the cache."""
+        with self._lock:
+            return CacheInfo(hits=self.hits, misses=self.misses, evictions=self.evictions,
+                             currsize=len(self._entries), nbytes=self.nbytes,
+                             maxsize=self.maxsize, maxbytes=self.maxbytes)
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.evictions = self.nbytes = 0
+
+
+class SharedLoan(Loan):
+    """
+    :class:`SharedLoan <SharedLoan>` object: a :class:`~mortgage.Loan` that can not be changed.
+
+    Its attributes are fixed once it is built, so one caller can not change the loan every
+    other caller holds. The schedule is still built lazily, once, under a lock so threads
+    reading it for the first time wait for the same build, and it is
+    :meth:`frozen <mortgage.schedule.Schedule.freeze>`. Methods that derive a loan, such as
+    :meth:`~mortgage.Loan.rescale`, return ordinary loans.
+
+    Usage:
+        >>> from mortgage.cache import SharedLoan
+        >>> loan = SharedLoan(principal=200000, interest=.06, term=30)
+        >>> loan.term = 15
+        Traceback (most recent call last):
+        ...
+        AttributeError: SharedLoan is immutable
+    """
+
+    _frozen = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        object.__setattr__(self, '_lock', threading.Lock())
+        object.__setattr__(self, '_frozen', True)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        object.__setattr__(self, '__dict__', state)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def __setattr__(self, name, value):
+        # The only change allowed is building the schedule the first time it is read.
+        if self._frozen and not (name == '_Loan__schedule' and self._Loan__schedule is None):
+            raise AttributeError('SharedLoan is immutable')
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        raise AttributeError('SharedLoan is immutable')
+
+    @property
+    def _schedule(self):
+        if self._Loan__schedule is None:
+            with self._lock:
+                if self._Loan__schedule is None:
+                    return super()._schedule
+        return self._Loan__schedule
+
+    def _amortize(self):
+        return super()._amortize().freeze()
+
+
+loans = LRUCache(maxsize=4096, name='loans')
+unit_schedules = LRUCache(maxsize=None, maxbytes=64 * 1024 * 1024, sizeof=lambda schedule: schedule.nbytes,
+                          name='unit_schedules')
+schedules = LRUCache(maxsize=None, maxbytes=64 * 1024 * 1024, sizeof=lambda schedule: schedule.nbytes,
+                     name='schedules')
+
+
+def get_loan(principal, interest, term, term_unit='years', compounded='monthly', currency='$',
+             backend='decimal', prepayment: Prepayment = None, adjustment: Adjustment = None,
+             payment_frequency=None) -> SharedLoan:
+    """
+    Return a shared :class:`SharedLoan` for these terms, building it only the first time.
+
+    Loans are keyed by their :class:`~mortgage.loan.LoanSpec`, so terms that build the same
+    loan share it, whether the principal and rate are given as numbers or as
+    :class:`~decimal.Decimal`. A prepayment or adjustment is matched by identity: pass the
+    same object to share the loan. The amortization schedule
+    of a shared loan is built at most once, however many callers read it.
+
+    Usage:
+        >>> from mortgage.cache import get_loan
+        >>> get_loan(200000, .06, 30) is get_loan(200000, .06, 30)
+        True
+    """
+    spec = LoanSpec(principal, interest, term, term_unit, compounded, currency, backend,
+                    prepayment, adjustment, payment_frequency)
+    return loans.get(spec, lambda: SharedLoan(principal=principal, interest=interest, term=term,
+                                              term_unit=term_unit, compounded=compounded,
+                                              currency=currency, backend=backend,
+                                              prepayment=prepayment, adjustment=adjustment,
+                                              payment_frequency=payment_frequency))
+
+
+def get_schedule(principal, interest, term, term_unit='years', compounded='monthly', backend='decimal',
+                 payment_frequency=None):
+    """
+    Return a shared, :meth:`frozen <mortgage.schedule.Schedule.freeze>` amortization
+    :class:`~mortgage.schedule.Schedule` for these terms.
+
+    Schedules are keyed by :class:`~mortgage.loan.LoanSpec` as in :func:`get_loan`. The
+    schedule for a principal of one is cached per rate and term and rescaled to the
+    requested principal, so a new balance at a rate and term seen before costs one
+    multiplication per value instead of a full amortization. ``bank`` schedules are rounded
+    to the cent at every payment and are amortized directly instead.
+
+    Usage:
+        >>> from mortgage.cache import get_schedule
+        >>> round(get_schedule(200000, .06, 30)[10].balance, 2)
+        Decimal('197963.59')
+    """
+    def amortize(principal):
+        return Loan(principal=principal, interest=interest, term=term, term_unit=term_unit,
+                    compounded=compounded, backend=backend,
+                    payment_frequency=payment_frequency).schedule()
+
+    spec = LoanSpec(principal, interest, term, term_unit, compounded, backend=backend,
+                    payment_frequency=payment_frequency)
+    if backend == 'bank':
+        return schedules.get(spec, lambda: amortize(principal).freeze())
+
+    def build():
+        unit = LoanSpec(1, interest, term, term_unit, compounded, backend=backend,
+                        payment_frequency=payment_frequency)
+        return unit_schedules.get(unit, lambda: amortize(1)).scale(spec.principal).freeze()
+
+    return schedules.get(spec, build)
+
+
+def cache_info() -> dict:
+    """Return the :class:`CacheInfo` of every cache in this module by name."""
+    return {'loans': loans.info(), 'unit_schedules': unit_schedules.info(), 'schedules': schedules.info()}
+
+
+def clear():
+    """Empty every cache in this module."""
+    loans.clear()
+    unit_schedules.clear()
+    schedules.clear()
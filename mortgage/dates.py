@@ -0,0 +1,236 @@
+"""Payment dates, day-count conventions and dated amortization of many loans at once.
+
+Dates are numpy ``datetime64[D]`` arrays and every function works on whole arrays of loans,
+so dating the schedules of millions of loans takes no Python loop per payment.
+
+Day counts follow the usual conventions:
+
+* ``30/360``: every month counts as 30 days, with the ISDA (bond basis) rule: a start on
+  the 31st counts as the 30th, and so does an end on the 31st when the start is then the
+  30th. Years are 360 days.
+* ``ACT/360``: actual days between the dates, in years of 360 days.
+* ``ACT/365``: actual days between the dates, in years of 365 days.
+
+This module requires `numpy <https://numpy.org>`_, available with ``pip install mortgage[numpy]``.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from mortgage import batch
+from mortgage.loan import PERIODS, Loan
+
+# Days in a year, by day-count convention.
+CONVENTIONS = {
+    '30/360': 360,
+    'ACT/360': 360,
+    'ACT/365': 365,
+}
+
+# Length of one payment period, in months or in days, by payment frequency.
+MONTHS = {'monthly': 1, 'annually': 12}
+DAYS = {'daily': 1, 'weekly': 7, 'biweekly': 14}
+
+DatedSchedules = namedtuple('DatedSchedules', 'date interest principal balance mask')
+
+
+def _dates(values):
+    return np.asarray(values, dtype='datetime64[D]')
+
+
+def _add_months(dates, months):
+    # Move each date by whole months, keeping its day of the month unless the target month
+    # is shorter, in which case the date falls on the last day of that month. Converting
+    # between datetime units is slow for large arrays, so only the few months spanned are
+    # converted and every date is looked up in them.
+    month = dates.astype('datetime64[M]')
+    day = (dates - month.astype('datetime64[D]')).astype(np.int64)
+    target = month.astype(np.int64) + months
+    first = target.min()
+    starts = np.arange(first, target.max() + 2).astype('datetime64[M]').astype('datetime64[D]')
+    starts = starts.astype(np.int64)
+    start = starts[target - first]
+    length = starts[target - first + 1] - start
+    return (start + np.minimum(day, length - 1)).astype('datetime64[D]')
+
+
+def payment_dates(first_payments, n_payments, compounded='monthly'):
+    """
+    Return the payment dates of many loans, one row per loan.
+
+    Column ``n`` holds the date of the nth payment, as in :meth:`Loan.schedule
+    <mortgage.Loan.schedule>`, and column ``0`` the date interest starts to accrue, one
+    period before the first payment. Monthly and annual payments keep the day of the month
+    of the first payment, moved to the last day of shorter months. Semimonthly payments
+    alternate between that day and fifteen days later. Loans with fewer payments are padded
+    with ``NaT``.
+
+    :param first_payments: The date of the first payment of each loan.
+    :param n_payments: The number of payments of each loan.
+    :param compounded: Frequency of the payments.
+    :return: ``(loans, payments + 1)`` array of ``datetime64[D]``
+
+    Usage:
+        >>> from mortgage.dates import payment_dates
+        >>> [str(date) for date in payment_dates('2024-01-31', 4)[0]]
+        ['2023-12-31', '2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30']
+    """
+    assert compounded in PERIODS, \
+        'Payments can occur daily, weekly, biweekly, semimonthly, monthly, or annually'
+    first_payments = _dates(first_payments).ravel()
+    n_payments = np.asarray(n_payments, dtype=np.int64).ravel()
+    first_payments, n_payments = np.broadcast_arrays(first_payments, n_payments)
+    assert np.all(n_payments > 0), 'Term must be at least one payment long'
+
+    offsets = np.arange(-1, n_payments.max())[np.newaxis, :]
+    first = first_payments[:, np.newaxis]
+    if compounded in DAYS:
+        dates = first + offsets * DAYS[compounded]
+    elif compounded in MONTHS:
+        dates = _add_months(first, offsets * MONTHS[compounded])
+    else:
+        dates = _add_months(first, offsets // 2) + 15 * (offsets % 2)
+
+    return np.where(offsets < n_payments[:, np.newaxis], dates, np.datetime64('NaT'))
+
+
+def _parts(dates):
+    # Year, month and day of each date, looked up in a table of the days spanned.
+    valid = ~np.isnat(dates)
+    days = np.where(valid, dates.astype(np.int64), 0)
+    first, last = (days[valid].min(), days[valid].max()) if valid.any() else (0, 0)
+    span = np.arange(first, last + 1).astype('datetime64[D]')
+    months = span.astype('datetime64[M]')
+    index = np.where(valid, days - first, 0)
+    return (span.astype('datetime64[Y]').astype(np.int64)[index],
+            (months.astype(np.int64) % 12)[index],
+            ((span - months.astype('datetime64[D]')).astype(np.int64) + 1)[index])
+
+
+def day_count(starts, ends, convention='30/360'):
+    """
+    Return the days between pairs of dates under a day-count convention.
+
+    :param starts: The first dates.
+    :param ends: The last dates, broadcast against ``starts``.
+    :param convention: ``30/360``, ``ACT/360`` or ``ACT/365``.
+    :return: array of days as ``int64``
+
+    Usage:
+        >>> from mortgage.dates import day_count
+        >>> day_count('2024-01-15', ['2024-02-15', '2024-03-31'], '30/360').tolist()
+        [30, 76]
+        >>> day_count('2024-01-15', ['2024-02-15', '2024-03-31'], 'ACT/365').tolist()
+        [31, 76]
+    """
+    assert convention in CONVENTIONS, 'convention can be either 30/360, ACT/360, or ACT/365'
+    starts, ends = np.broadcast_arrays(_dates(starts), _dates(ends))
+    if convention != '30/360':
+        return (ends - starts).astype(np.int64)
+
+    start_years, start_months, start_days = _parts(starts)
+    end_years, end_months, end_days = _parts(ends)
+    start_days = np.minimum(start_days, 30)
+    end_days = np.where((end_days == 31) & (start_days == 30), 30, end_days)
+    return (360 * (end_years - start_years) + 30 * (end_months - start_months)
+            + end_days - start_days)
+
+
+def year_fraction(starts, ends, convention='30/360'):
+    """
+    Return the fraction of a year between pairs of dates under a day-count convention.
+
+    Usage:
+        >>> from mortgage.dates import year_fraction
+        >>> year_fraction('2024-01-01', '2024-07-01', 'ACT/360').tolist()
+        0.5055555555555555
+    """
+    return day_count(starts, ends, convention) / CONVENTIONS[convention]
+
+
+def amortize(principals, rates, terms, first_payments, convention='30/360', compounded='monthly'):
+    """
+    Amortize many fixed rate loans with interest accrued on their payment dates.
+
+    The level payment is the contractual one :func:`mortgage.batch.amortize` computes from
+    the periodic rate. The interest charged with each payment is the balance times the
+    annual rate times the year fraction since the previous payment under ``convention``, so
+    under ``ACT`` conventions long months cost more interest than short ones. As with the
+    ``bank`` backend, the final payment repays whatever balance the calendar leaves; a loan
+    whose calendar charges less interest is paid off early, with a smaller last payment, and
+    its balance stays at zero after it. With ``30/360`` and first payments on the 28th or
+    earlier, every monthly period is exactly a twelfth of a year and the schedules are
+    those of :func:`mortgage.batch.amortize`.
+
+    Balances are computed from the running product of each period's growth instead of a
+    loop over payments. The tables take ``loans * (periods + 1) * 33`` bytes, so very large
+    portfolios should be passed in chunks.
+
+    :param principals: The original sum of money borrowed for each loan.
+    :param rates: The annual interest rate for each loan.
+    :param terms: The lifespan of each loan in years.
+    :param first_payments: The date of the first payment of each loan.
+    :param convention: ``30/360``, ``ACT/360`` or ``ACT/365``.
+    :param compounded: Frequency that interest is compounded and payments are made.
+    :return: :class:`DatedSchedules` of ``(loans, periods + 1)`` arrays, laid out as the
+        :class:`~mortgage.batch.Schedules` of :func:`mortgage.batch.amortize` with the
+        ``date`` of every payment
+
+    Usage:
+        >>> from mortgage import dates
+        >>> schedules = dates.amortize(200000, .06, 30, '2024-02-01', convention='ACT/365')
+        >>> str(schedules.date[0, 1]), round(float(schedules.interest[0, 1]), 2)
+        ('2024-02-01', 1019.18)
+    """
+    assert convention in CONVENTIONS, 'convention can be either 30/360, ACT/360, or ACT/365'
+    prepared = batch.prepare(principals, rates, terms, compounded)
+    principals, rates, n_payments, period_rates, _ = prepared
+    payments = batch.level_payments(principals, period_rates, n_payments)
+    first_payments = np.broadcast_to(_dates(first_payments).ravel(), principals.shape)
+    dates = payment_dates(first_payments, n_payments, compounded)
+
+    numbers = np.arange(dates.shape[1])
+    mask = numbers[np.newaxis, :] <= n_payments[:, np.newaxis]
+    fractions = np.where(mask[:, 1:], year_fraction(dates[:, :-1], dates[:, 1:], convention), 0)
+
+    # b[n] = b[n-1] * g[n] - p unrolls to b[n] = G[n] * (b[0] - p * sum(1 / G[k], k <= n)),
+    # where G is the running product of the growth factors g. Once it would go negative a
+    # balance only falls further, so clamping it at zero pays the loan off at that payment.
+    growth = np.cumprod(1 + rates[:, np.newaxis] * fractions, axis=1)
+    balance = np.empty(dates.shape)
+    balance[:, 0] = principals
+    balance[:, 1:] = growth * (principals[:, np.newaxis]
+                               - payments[:, np.newaxis] * np.cumsum(1 / growth, axis=1))
+    np.maximum(balance, 0, out=balance)
+    balance[~mask | (numbers[np.newaxis, :] == n_payments[:, np.newaxis])] = 0
+
+    interest = np.zeros_like(balance)
+    interest[:, 1:] = balance[:, :-1] * rates[:, np.newaxis] * fractions
+    principal = np.zeros_like(balance)
+    principal[:, 1:] = balance[:, :-1] - balance[:, 1:]
+    principal[~mask] = 0
+    return DatedSchedules(date=dates, interest=interest, principal=principal, balance=balance,
+                          mask=mask)
+
+
+def loan_dates(loan: Loan, first_payment):
+    """
+    Return the date of every row of a loan's schedule.
+
+    Rows follow :meth:`Loan.schedule <mortgage.Loan.schedule>`: the first is the date
+    interest starts to accrue and the others the payment dates, at the loan's payment
+    frequency. Loans paid off early have as many dates as rows. The schedule is only built
+    to count them for loans with a prepayment or adjustment.
+
+    Usage:
+        >>> from mortgage import Loan
+        >>> from mortgage.dates import loan_dates
+        >>> loan = Loan(principal=200000, interest=.06, term=30, payment_frequency='biweekly')
+        >>> [str(date) for date in loan_dates(loan, '2024-01-05')[:3]]
+        ['2023-12-22', '2024-01-05', '2024-01-19']
+    """
+    if loan.prepayment is None and loan.adjustment is None:
+        n_payments = loan.n_payments
+    else:
+        n_payments = len(loan.schedule()) - 1
+    return payment_dates(first_payment, n_payments, loan.payment_frequency)[0]
@@ -0,0 +1,239 @@
+"""Stream amortization schedules of many loans to CSV or to a binary ``.npy`` file.
+
+Both writers take one or many loans (or :class:`~mortgage.schedule.Schedule` objects) and
+write one row per payment, prefixed by the loan's id, in chunks of ``chunk_size`` rows. Only
+one chunk and the schedule being written are held in memory, so the memory used is fixed
+however many loans are exported, as long as ``loans`` is an iterator that does not keep the
+loans alive itself. Rows are formatted from the stored columns with one format operation
+per row instead of one string conversion per :class:`~decimal.Decimal`.
+
+Amounts are written through binary floating point, so loans with the ``decimal`` backend
+are amortized with the ``float`` backend for export, which is faster than converting their
+:class:`~decimal.Decimal` amounts one by one. Amounts rounded to the cent match the
+``decimal`` schedule except at exact half cent ties.
+"""
+from collections.abc import Iterable
+from contextlib import contextmanager
+import csv
+import io
+from itertools import count, islice, zip_longest
+
+from mortgage.loan import Loan
+from mortgage.schedule import COLUMNS, Installment, Schedule
+
+FIELDS = ('loan',) + Installment._fields
+
+# The loan id is quoted by the csv module once per loan; amounts are formatted here.
+_ROW = '%s,%d,%.2f,%.2f,%.2f,%.2f,%.2f\n'
+
+_MISSING = object()
+
+
+def iter_schedules(loans, ids=None):
+    """
+    Yield the id and schedule of each loan, as the writers of this module read them.
+
+    Loans with the ``decimal`` backend are amortized with the ``float`` backend, and
+    schedules are passed through as they are.
+
+    :param loans: A :class:`~mortgage.Loan` or schedule, or an iterable of them.
+    :param ids: The id of each loan, by default its position counting from one.
+    :raises ValueError: if ``ids`` and ``loans`` are not the same length. Both are read
+        lazily, so this is raised once the shorter one runs out, after the pairs before it.
+    """
+    if isinstance(loans, (Loan, Schedule)) or not isinstance(loans, Iterable):
+        loans = [loans]
+    if ids is None:
+        pairs = zip(count(1), loans)
+    else:
+        pairs = zip_longest(ids, loans, fillvalue=_MISSING)
+    for loan_id, loan in pairs:
+        if loan_id is _MISSING or loan is _MISSING:
+            raise ValueError('ids and loans must be the same length')
+        if isinstance(loan, Loan):
+            if loan.backend == 'decimal':
+                loan = loan.with_backend('float')
+            loan = loan.schedule()
+        yield loan_id, loan
+
+
+def _floats(schedule, name):
+    column = schedule.column(name)
+    if schedule.kind == 'cents':
+        return [value / 100 for value in column]
+    if schedule.kind == 'float':
+        return column
+    return list(map(float, column))
+
+
+def _amounts(schedule, name):
+    # Amounts that round to zero cents from below, including -0.0, are normalized to zero
+    # so they are written as 0.00 rather than -0.00.
+    return [0.0 if -0.005 < value <= 0 else value for value in _floats(schedule, name)]
+
+
+def _quoted(fields):
+    # One CSV line of ``fields``, quoted wherever the csv module would quote them.
+    line = io.StringIO()
+    csv.writer(line, lineterminator='').writerow(fields)
+    return line.getvalue()
+
+
+@contextmanager
+def _opened(file, mode):
+    if isinstance(file, str):
+        with open(file, mode) as handle:
+            yield handle
+    else:
+        yield file
+
+
+def to_csv(loans, file, ids=None, chunk_size=8192, header=True) -> int:
+    """
+    Write the schedules of ``loans`` to ``file`` as CSV, one row per payment.
+
+    :param loans: A :class:`~mortgage.Loan` or schedule, or an iterable of them.
+    :param file: A path, or a text file opened for writing.
+    :param ids: The id written for each loan, by default its position counting from one.
+        Ids are quoted as the :mod:`csv` module quotes fields. :class:`ValueError` is
+        raised if there are not as many ids as loans.
+    :param chunk_size: The number of rows formatted and written at a time.
+    :param header: Write the field names as the first row.
+    :return: the number of payment rows written
+
+    Usage:
+        >>> import io
+        >>> from mortgage import Loan
+        >>> from mortgage.export import to_csv
+        >>> out = io.StringIO()
+        >>> to_csv(Loan(principal=200000, interest=.06, term=30), out)
+        361
+        >>> print(''.join(out.getvalue().splitlines(True)[:3]), end='')
+        loan,number,payment,interest,principal,total_interest,balance
+        1,0,0.00,0.00,0.00,0.00,200000.00
+        1,1,1199.10,1000.00,199.10,1000.00,199800.90
+    """
+    assert chunk_size > 0, 'chunk_size must be a positive number'
+    written = 0
+    with _opened(file, 'w') as handle:
+        if header:
+            handle.write(_quoted(FIELDS) + '\n')
+        lines = []
+        for loan_id, schedule in iter_schedules(loans, ids):
+            loan_id = _quoted([loan_id])
+            columns = [_amounts(schedule, name) for name in COLUMNS]
+            numbers = range(schedule.start, schedule.start + len(schedule))
+            rows = zip(numbers, *columns)
+            while True:
+                chunk = list(islice(rows, chunk_size - len(lines)))
+                if not chunk:
+                    break
+                lines.extend(_ROW % ((loan_id,) + row) for row in chunk)
+                if len(lines) >= chunk_size:
+                    handle.write(''.join(lines))
+                    written += len(lines)
+                    lines = []
+        handle.write(''.join(lines))
+        written += len(lines)
+    return written
+
+
+def record_dtype():
+    """
+    Return the numpy structured dtype of one exported payment row.
+
+    The loan id and payment number are 64 and 32 bit integers and every amount is a
+    ``float64``, so each row takes 52 bytes.
+    """
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    return np.dtype([('loan', '<i8'), ('number', '<i4')] + [(name, '<f8') for name in COLUMNS])
+
+
+def _npy_header(dtype, rows):
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    header = "{{'descr': {!r}, 'fortran_order': False, 'shape': ({},), }}".format(
+        np.lib.format.dtype_to_descr(dtype), rows)
+    # The shape is rewritten once the number of rows is known, so room is left for the
+    # largest one. Version 1.0 headers are padded to a multiple of 64 bytes with a newline.
+    header = header.ljust(len(header) + 24 - len(str(rows)))
+    size = 10 + len(header) + 1
+    header += ' ' * (-size % 64) + '\n'
+    return b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1')
+
+
+def to_npy(loans, file, ids=None, chunk_size=65536) -> int:
+    """
+    Write the schedules of ``loans`` to ``file`` as one ``.npy`` array of payment rows.
+
+    The array has the :func:`record_dtype` structured dtype and can be read with
+    ``numpy.load``, or memory-mapped with ``numpy.load(file, mmap_mode='r')`` to read any
+    row without loading the rest. Rows are gathered into a preallocated chunk of
+    ``chunk_size`` rows, column by column, and written as raw bytes. The file must be
+    seekable so the header can be completed once every row is written. Requires numpy.
+
+    :param loans: A :class:`~mortgage.Loan` or schedule, or an iterable of them.
+    :param file: A path, or a binary file opened for writing.
+    :param ids: The integer id written for each loan, by default its position counting
+        from one. :class:`ValueError` is raised if there are not as many ids as loans.
+    :param chunk_size: The number of rows gathered and written at a time.
+    :return: the number of payment rows written
+
+    Usage:
+        >>> import io
+        >>> import numpy as np
+        >>> from mortgage import Loan
+        >>> from mortgage.export import to_npy
+        >>> out = io.BytesIO()
+        >>> to_npy([Loan(200000, .06, 30), Loan(150000, .045, 15)], out)
+        542
+        >>> rows = np.load(io.BytesIO(out.getvalue()))
+        >>> row = rows[361]
+        >>> int(row['loan']), int(row['number']), float(row['balance'])
+        (2, 0, 150000.0)
+    """
+    assert chunk_size > 0, 'chunk_size must be a positive number'
+    with _opened(file, 'wb') as handle:
+        return write_npy(handle, iter_schedules(loans, ids), chunk_size)
+
+
+def write_npy(handle, schedules, chunk_size=65536) -> int:
+    """
+    Write ``(loan_id, schedule)`` pairs to an open, seekable binary file as one ``.npy`` array.
+
+    This is :func:`to_npy` for pairs from :func:`iter_schedules`, for callers that keep
+    their own index of the rows written.
+
+    :return: the number of payment rows written
+    """
+    assert chunk_size > 0, 'chunk_size must be a positive number'
+    import numpy as np  # pylint: disable=import-outside-toplevel
+    dtype = record_dtype()
+    chunk = np.zeros(chunk_size, dtype=dtype)
+    written = 0
+    start = handle.tell()
+    handle.write(_npy_header(dtype, 0))
+    filled = 0
+    for loan_id, schedule in schedules:
+        columns = [np.asarray(_floats(schedule, name), dtype=np.float64) for name in COLUMNS]
+        offset = 0
+        while offset < len(schedule):
+            size = min(chunk_size - filled, len(schedule) - offset)
+            rows = chunk[filled:filled + size]
+            rows['loan'] = loan_id
+            rows['number'] = np.arange(schedule.start + offset, schedule.start + offset + size)
+            for name, column in zip(COLUMNS, columns):
+                rows[name] = column[offset:offset + size]
+            filled += size
+            offset += size
+            if filled == chunk_size:
+                handle.write(chunk.tobytes())
+                written += filled
+                filled = 0
+    handle.write(chunk[:filled].tobytes())
+    written += filled
+
+    end = handle.tell()
+    handle.seek(start)
+    handle.write(_npy_header(dtype, written))
+    handle.seek(end)
+    return written
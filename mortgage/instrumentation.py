@@ -0,0 +1,166 @@
+"""Opt-in counters and timers for the amortization hot paths.
+
+Instrumentation is off by default. Every hook in the package is guarded by a check of the
+module level ``enabled`` flag, so a disabled hook costs one attribute lookup. Enabling it
+sends each event to one or more sinks. A sink is any callable taking
+``(kind, name, value)``, where ``kind`` is ``'counter'`` (``value`` is an increment) or
+``'timer'`` (``value`` is a duration in seconds). :class:`Registry` is a sink that keeps
+running totals and renders them in the Prometheus text format.
+
+Events recorded:
+
+* ``loan.payment``: evaluations of the level payment formula
+* ``loan.split_payment``: closed-form splits of a payment into interest and principal
+* ``loan.closed_form``: balances, totals and rows answered by the annuity formulas
+* ``loan.recurrence``: amortizations run with the recurrence from the first payment
+* ``schedule.builds`` and ``schedule.build``: schedules built, and the time taken
+* ``schedule.resumes`` and ``schedule.resume``: schedules derived from another one's rows
+* ``schedule.rows``: rows computed by builds and resumes
+* ``schedule.reused_rows``: rows copied from another schedule by resumes
+* ``cache.<name>.hits``, ``cache.<name>.misses`` and ``cache.<name>.evictions``
+
+Usage:
+    >>> from mortgage import Loan, instrumentation
+    >>> with instrumentation.recording() as registry:
+    ...     _ = Loan(principal=200000, interest=.06, term=30).schedule()
+    >>> registry.counters['schedule.builds'], registry.counters['schedule.rows']
+    (1, 361)
+"""
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import threading
+import time
+
+clock = time.perf_counter
+
+enabled = False
+_sinks = ()
+
+
+def enable(*sinks):
+    """Start sending events to ``sinks``, in addition to any sinks already enabled."""
+    global enabled, _sinks  # pylint: disable=global-statement
+    assert sinks and all(callable(sink) for sink in sinks), 'Sinks must be callables'
+    _sinks = _sinks + sinks
+    enabled = True
+
+
+def disable(sink=None):
+    """Stop sending events to ``sink``, or to every sink when none is given."""
+    global enabled, _sinks  # pylint: disable=global-statement
+    _sinks = tuple(other for other in _sinks if sink is not None and other is not sink)
+    enabled = bool(_sinks)
+
+
+@contextmanager
+def recording(registry=None):
+    """Send events to ``registry`` (a new :class:`Registry` by default) inside the block."""
+    registry = Registry() if registry is None else registry
+    enable(registry)
+    try:
+        yield registry
+    finally:
+        disable(registry)
+
+
+def count(name, value=1):
+    """Add ``value`` to the counter ``name``."""
+    for sink in _sinks:
+        sink('counter', name, value)
+
+
+def timing(name, seconds):
+    """Record that the operation ``name`` took ``seconds``."""
+    for sink in _sinks:
+        sink('timer', name, seconds)
+
+
+class Registry(object):
+    """
+    :class:`Registry <Registry>` sink keeping the running total of every counter and timer.
+
+    Timers keep the number of observations, their sum and the largest one.
+
+    Usage:
+        >>> from mortgage.instrumentation import Registry
+        >>> registry = Registry()
+        >>> registry('counter', 'schedule.builds', 1)
+        >>> print(registry.render())
+        # TYPE mortgage_schedule_builds_total counter
+        mortgage_schedule_builds_total 1
+        <BLANKLINE>
+    """
+
+    def __init__(self, prefix='mortgage'):
+        self.prefix = prefix
+        self.counters = {}
+        self.timers = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, kind, name, value):
+        with self._lock:
+            if kind == 'counter':
+                self.counters[name] = self.counters.get(name, 0) + value
+            else:
+                calls, total, longest = self.timers.get(name, (0, 0.0, 0.0))
+                self.timers[name] = (calls + 1, total + value, max(longest, value))
+
+    def snapshot(self) -> dict:
+        """Return a copy of the counters and timers as ``{'counters': ..., 'timers': ...}``."""
+        with self._lock:
+            timers = {name: {'count': calls, 'sum': total, 'max': longest}
+                      for name, (calls, total, longest) in self.timers.items()}
+            return {'counters': dict(self.counters), 'timers': timers}
+
+    def clear(self):
+        """Reset every counter and timer."""
+        with self._lock:
+            self.counters.clear()
+            self.timers.clear()
+
+    def _metric(self, name):
+        return '{}_{}'.format(self.prefix, name.replace('.', '_'))
+
+    def render(self) -> str:
+        """Return the counters and timers in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines = []
+        for name, value in sorted(snapshot['counters'].items()):
+            metric = self._metric(name) + '_total'
+            lines.append('# TYPE {} counter'.format(metric))
+            lines.append('{} {}'.format(metric, value))
+        for name, timer in sorted(snapshot['timers'].items()):
+            metric = self._metric(name) + '_seconds'
+            lines.append('# TYPE {} summary'.format(metric))
+            lines.append('{}_count {}'.format(metric, timer['count']))
+            lines.append('{}_sum {!r}'.format(metric, timer['sum']))
+        return '\n'.join(lines) + '\n'
+
+
+def serve(registry, host='127.0.0.1', port=0) -> HTTPServer:
+    """
+    Serve ``registry`` for scraping at ``http://host:port/metrics`` from a daemon thread.
+
+    The server is returned so it can be shut down with ``server.shutdown()``; its address
+    is ``server.server_address``.
+    """
+    class Handler(BaseHTTPRequestHandler):
+
+        def do_GET(self):  # pylint: disable=invalid-name
+            if self.path != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):  # pylint: disable=arguments-differ
+            pass
+
+    server = HTTPServer((host, port), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
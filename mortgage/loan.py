@@ -1,9 +1,273 @@
 """The  Loan object used to create and calculate various mortgage statistics."""
 from collections import namedtuple
-from decimal import Decimal
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+from itertools import islice
+import json
 from typing import Tuple
 
-Installment = namedtuple('Installment', 'number payment interest principal total_interest balance')
+from mortgage import instrumentation
+from mortgage.adjustment import Adjustment
+from mortgage.prepayment import Prepayment
+from mortgage.schedule import Installment, Schedule, from_cents
+
+SPLIT_TOLERANCE = Decimal('1E-9')
+
+# Largest difference between a schedule row and its closed form, by numeric backend. The
+# ``bank`` value is the rounding of a single cent amount; its rows drift further with the
+# rate and term (see :meth:`Loan.verify`).
+TOLERANCES = {
+    'decimal': SPLIT_TOLERANCE,
+    'float': Decimal('1E-6'),
+    'bank': Decimal('0.005'),
+}
+
+PERIODS = {
+    'daily': 365,
+    'weekly': 52,
+    'biweekly': 26,
+    'semimonthly': 24,
+    'monthly': 12,
+    'annually': 1
+}
+
+# Number of each term unit in a year.
+TERM_UNITS = {
+    'days': 365,
+    'months': 12,
+    'years': 1
+}
+
+PeriodTable = namedtuple('PeriodTable', 'rate growth compound discount')
+
+
+@lru_cache(maxsize=4096)
+def period_table(interest, compounded, payment_frequency, n_payments, number=Decimal) -> PeriodTable:
+    """
+    Return the interest rate of one payment period and its growth over a term.
+
+    When payments and compounding have the same frequency the periodic rate is the annual
+    rate divided by that frequency. Otherwise it is the rate that, charged once per payment,
+    grows a balance by as much as the compounding does over the same time, so a loan paid
+    biweekly and compounded monthly costs the same effective annual rate either way.
+
+    Tables are cached per rate, frequencies, term and number type, so every loan with the
+    same rate and term shares one, whatever its principal.
+
+    :param interest: The annual interest rate.
+    :param compounded: Frequency that interest is compounded.
+    :param payment_frequency: Frequency of the payments.
+    :param n_payments: Number of payments over the term.
+    :param number: The number type of the rates, :class:`~decimal.Decimal` or ``float``.
+    :return: :class:`PeriodTable` of the periodic ``rate``, the ``growth`` of a balance over
+        one period, its ``compound`` growth over the whole term and the ``discount``
+        factor of the final payment
+
+    Usage:
+        >>> from mortgage.loan import period_table
+        >>> period_table(.06, 'monthly', 'monthly', 360, float).rate
+        0.005
+        >>> round(period_table(.06, 'monthly', 'biweekly', 780, float).rate, 8)
+        0.00230459
+    """
+    compoundings, payments = PERIODS[compounded], PERIODS[payment_frequency]
+    annual = number(interest)
+    if compoundings == payments:
+        rate = annual / compoundings
+    else:
+        rate = (1 + annual / compoundings) ** (number(compoundings) / number(payments)) - 1
+    growth = 1 + rate
+    return PeriodTable(rate=rate, growth=growth, compound=growth ** n_payments,
+                       discount=growth ** -n_payments)
+
+
+class Summary(namedtuple('Summary', 'principal interest apy apr term term_unit monthly_payment '
+                                    'total_principal total_interest total_paid '
+                                    'interest_to_principle years_to_pay')):
+    """
+    The statistics of a loan, as returned by :meth:`Loan.summary`.
+
+    Amounts are :class:`~decimal.Decimal` values rounded to the cent, as the matching
+    :class:`Loan` properties return them.
+
+    Usage:
+        >>> from mortgage import Loan
+        >>> summary = Loan(principal=200000, interest=.06, term=30).summary()
+        >>> summary.total_paid
+        Decimal('431676.38')
+        >>> summary.to_dict()['total_paid']
+        431676.38
+    """
+    __slots__ = ()
+
+    @classmethod
+    def from_loan(cls, loan: 'Loan', payment, total_interest) -> 'Summary':
+        """
+        Return the summary of ``loan`` given its payment and total interest, unrounded.
+
+        :meth:`Loan.summary` is built this way; code that computes the payment and interest
+        of many loans at once, such as :func:`mortgage.batch.amortize`, can build the same
+        summaries from its own values.
+        """
+        total_principal = loan.total_principal
+        total_interest = loan._quantize(total_interest)
+        return cls(principal=loan.principal,
+                   interest=loan.interest,
+                   apy=loan.apy,
+                   apr=loan.apr,
+                   term=loan.term,
+                   term_unit=loan.term_unit,
+                   monthly_payment=loan._quantize(payment),
+                   total_principal=total_principal,
+                   total_interest=total_interest,
+                   total_paid=total_principal + total_interest,
+                   interest_to_principle=float(round(total_interest / total_principal * 100, 1)),
+                   years_to_pay=loan.years_to_pay)
+
+    def to_dict(self) -> dict:
+        """Return the summary as a dict of JSON types, with amounts converted to floats."""
+        return {name: float(value) if isinstance(value, Decimal) else value
+                for name, value in zip(self._fields, self)}
+
+    def to_json(self, **kwargs) -> str:
+        """Return the summary as a JSON object, passing ``kwargs`` on to :func:`json.dumps`."""
+        return json.dumps(self.to_dict(), **kwargs)
+
+
+def _validate(principal, interest, term, term_unit, compounded, backend, payment_frequency=None):
+    assert principal > 0, 'Principal must be positive value'
+    assert 0 <= interest <= 1, 'Interest rate must be between zero and one'
+    assert term > 0, 'Term must be a positive number'
+    assert term_unit in TERM_UNITS, 'term_unit can be either  days, months, or years'
+    assert compounded in PERIODS, \
+        'Compounding can occur daily, weekly, biweekly, semimonthly, monthly, or annually'
+    assert payment_frequency is None or payment_frequency in PERIODS, \
+        'Payments can occur daily, weekly, biweekly, semimonthly, monthly, or annually'
+    assert backend in TOLERANCES, 'backend can be either decimal, float, or bank'
+    payments_per_year = PERIODS[payment_frequency or compounded]
+    assert payment_count(term, term_unit, payments_per_year) > 0, \
+        'Term must be at least one payment long'
+
+
+def _principal(principal):
+    return Decimal(principal)
+
+
+def _interest(interest):
+    # Floats are scaled to percent first, so .0425 is read as 4.25 percent.
+    return Decimal(interest * 100) / 100
+
+
+def payment_count(term, term_unit, payments_per_year) -> int:
+    """
+    Return the number of payments a loan makes over its term.
+
+    Terms that are not a whole number of payments are rounded to the nearest payment, as
+    :class:`Loan` rounds them.
+
+    Usage:
+        >>> from mortgage.loan import payment_count
+        >>> payment_count(15.5, 'years', 12), payment_count(14.5, 'years', 1)
+        (186, 14)
+    """
+    return round(term * payments_per_year / TERM_UNITS[term_unit])
+
+
+def round_to_cent(value, rounding=None) -> Decimal:
+    """
+    Return ``value`` as a :class:`Decimal` rounded to the cent.
+
+    :param rounding: A :mod:`decimal` rounding mode, by default that of the current
+        context (half to even), which is how :class:`Loan` rounds its amounts.
+
+    Usage:
+        >>> from decimal import ROUND_DOWN, Decimal
+        >>> from mortgage.loan import round_to_cent
+        >>> round_to_cent(Decimal('1199.105')), round_to_cent(Decimal('1199.109'), ROUND_DOWN)
+        (Decimal('1199.10'), Decimal('1199.10'))
+    """
+    return Decimal(value).quantize(Decimal('0.01'), rounding=rounding)
+
+
+class LoanSpec(object):
+    """
+    :class:`LoanSpec <LoanSpec>` object holding the inputs of a :class:`Loan` and nothing else.
+
+    A spec is immutable and has no ``__dict__``. It pickles as its inputs alone, so it is
+    the cheap way to send a loan to another process or to store it: pickling a ``Loan``
+    carries its amortization schedule along once it is built, which is hundreds of rows.
+    The loan is rebuilt from the inputs the first time :meth:`loan` is called, and its
+    schedule only when it is read.
+
+    :param principal: The original sum of money borrowed.
+    :param interest: The amount charged by lender for use of the assets.
+    :param term: The lifespan of the loan.
+    :param term_unit: Unit for the lifespan of the loan.
+    :param compounded: Frequency that interest is compounded
+    :param currency: Set the currency symbol for use with summarize
+    :param backend: Numeric backend used for the payment and amortization schedule
+    :param prepayment: :class:`~mortgage.prepayment.Prepayment` paid on top of the schedule
+    :param adjustment: :class:`~mortgage.adjustment.Adjustment` resetting the rate or recasting
+        the payment part way through the term
+    :param payment_frequency: Frequency of the payments, by default that of compounding
+
+    The principal and rate are stored as the :class:`Decimal` values :class:`Loan` converts
+    them to, so specs compare and hash equal whenever the loans built from them are the
+    same, whether a value was given as an ``int``, a ``float`` or a :class:`Decimal`.
+
+    Usage:
+        >>> import pickle
+        >>> from mortgage.loan import LoanSpec
+        >>> spec = pickle.loads(pickle.dumps(LoanSpec(principal=200000, interest=.06, term=30)))
+        >>> spec
+        <LoanSpec principal=200000, interest=0.06, term=30>
+        >>> spec.loan().monthly_payment
+        Decimal('1199.10')
+    """
+    __slots__ = ('principal', 'interest', 'term', 'term_unit', 'compounded', 'currency', 'backend',
+                 'prepayment', 'adjustment', 'payment_frequency', '_loan')
+    _fields = __slots__[:-1]
+
+    def __init__(self, principal, interest, term, term_unit='years', compounded='monthly', currency='$',
+                 backend='decimal', prepayment: Prepayment = None, adjustment: Adjustment = None,
+                 payment_frequency=None):
+        _validate(principal, interest, term, term_unit, compounded, backend, payment_frequency)
+        values = (_principal(principal), _interest(interest), term, term_unit, compounded, currency,
+                  backend, prepayment, adjustment, payment_frequency or compounded)
+        for name, value in zip(self._fields, values):
+            object.__setattr__(self, name, value)
+        object.__setattr__(self, '_loan', None)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('LoanSpec is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('LoanSpec is immutable')
+
+    def __reduce__(self):
+        # Only the inputs are sent; the loan built from them stays behind.
+        return LoanSpec, self._values()
+
+    def __eq__(self, other):
+        if not isinstance(other, LoanSpec):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self):
+        return hash(self._values())
+
+    def __repr__(self):
+        return '<LoanSpec principal={}, interest={}, term={}>'.format(self.principal, self.interest,
+                                                                      self.term)
+
+    def _values(self):
+        return tuple(getattr(self, name) for name in self._fields)
+
+    def loan(self) -> 'Loan':
+        """Return the :class:`Loan` for these inputs, building it the first time only."""
+        if self._loan is None:
+            object.__setattr__(self, '_loan', Loan(*self._values()))
+        return self._loan
 
 
 class Loan(object):
@@ -18,71 +282,382 @@ class Loan(object):
     :param term_unit: Unit for the lifespan of the loan.
     :param compounded: Frequency that interest is compounded
     :param currency: Set the currency symbol for use with summarize
+    :param backend: Numeric backend used for the payment and amortization schedule
+    :param prepayment: :class:`~mortgage.prepayment.Prepayment` paid on top of the schedule
+    :param adjustment: :class:`~mortgage.adjustment.Adjustment` resetting the rate or recasting
+        the payment part way through the term
+    :param payment_frequency: Frequency of the payments, by default that of compounding
+
+    The term may be given in any ``term_unit`` and is converted to a number of payments,
+    rounded to the nearest whole payment. When payments and compounding have different
+    frequencies, each payment period is charged the rate that matches the effective annual
+    rate of the compounding (see :func:`period_table`). ``monthly_payment`` and the
+    schedule are then per payment period.
+
+    The ``backend`` trades precision for speed and memory:
+
+    * ``decimal`` (default): :class:`~decimal.Decimal` arithmetic with the 28 significant
+      digits of the default context. Schedule rows agree with :meth:`split_payment` to
+      within ``1E-9``.
+    * ``float``: binary floating point, with the schedule stored as ``array('d')``. Rows
+      agree with the closed form to within ``1E-6`` for balances up to ten million over
+      10,950 payments, so amounts rounded to the cent match ``decimal`` except at exact
+      half cent ties.
+    * ``bank``: whole cents with integer arithmetic, the way loans are serviced. The
+      payment is rounded to the cent, each interest charge is rounded half up, and the
+      final payment absorbs the rounding residual so the loan ends at exactly zero. Each
+      interest charge is within half a cent of the exact charge on the same balance, but
+      the rounded payment and charges move the balance by up to a cent a payment, and
+      every cent moved earns interest for the rest of the term. Interest charges agree
+      with the closed form to within ``0.005 + 0.01 * ((1 + r) ** n - 1)`` for the
+      periodic rate ``r`` over ``n`` payments: about ``0.06`` for 6% over 30 years paid
+      monthly, but ``0.35`` at 12% and ``3.83`` at 20%.
 
     Usage:
         >>> from mortgage import Loan
         >>> Loan(principal=200000, interest=.04125, term=15)
         <Loan principal=200000, interest=0.04125, term=15>
+        >>> biweekly = Loan(principal=200000, interest=.06, term=360, term_unit='months',
+        ...                 payment_frequency='biweekly')
+        >>> len(biweekly.schedule()) - 1, biweekly.monthly_payment
+        (780, Decimal('552.69'))
     """
 
-    def __init__(self, principal, interest, term, term_unit='years', compounded='monthly', currency='$'):
+    def __init__(self, principal, interest, term, term_unit='years', compounded='monthly', currency='$',
+                 backend='decimal', prepayment: Prepayment = None, adjustment: Adjustment = None,
+                 payment_frequency=None):
 
-        term_units = {'days', 'months', 'years'}
-        compound = {'daily', 'monthly', 'annually'}
+        _validate(principal, interest, term, term_unit, compounded, backend, payment_frequency)
 
-        assert principal > 0, 'Principal must be positive value'
-        assert 0 <= interest <= 1, 'Interest rate must be between zero and one'
-        assert term > 0, 'Term must be a positive number'
-        assert term_unit in term_units, 'term_unit can be either  days, months, or years'
-        assert compounded in compound, 'Compounding can occur daily, monthly, or annually'
-
-        periods = {
-            'daily': 365,
-            'monthly': 12,
-            'annually': 1
-        }
-
-        self.principal = Decimal(principal)
-        self.interest = Decimal(interest * 100) / 100
+        self.principal = _principal(principal)
+        self.interest = _interest(interest)
         self.term = term
         self.term_unit = term_unit
         self.compounded = compounded
-        self.n_periods = periods[compounded]
-        self._schedule = self._amortize()
+        self.n_periods = PERIODS[compounded]
+        self.payment_frequency = payment_frequency or compounded
+        self.payments_per_year = PERIODS[self.payment_frequency]
+        self._n_payments = payment_count(term, term_unit, self.payments_per_year)
         self._currency = currency
+        self.backend = backend
+        self._number = float if backend == 'float' else Decimal
+        self.prepayment = prepayment
+        self.adjustment = adjustment
+        self.__schedule = None
 
     def __repr__(self):
         return '<Loan principal={}, interest={}, term={}>'.format(self.principal, self.interest, self.term)
 
+    @property
+    def spec(self) -> LoanSpec:
+        """
+        Return the :class:`LoanSpec` of this loan, to pickle it without its schedule.
+
+        The spec's :meth:`~LoanSpec.loan` is this loan until the spec is pickled.
+
+        Usage:
+            >>> import pickle
+            >>> from mortgage import Loan
+            >>> loan = Loan(principal=200000, interest=.06, term=30)
+            >>> loan.spec.loan() is loan
+            True
+            >>> pickle.loads(pickle.dumps(loan.spec)).loan().total_paid
+            Decimal('431676.38')
+        """
+        spec = LoanSpec(self.principal, self.interest, self.term, self.term_unit, self.compounded,
+                        self._currency, self.backend, self.prepayment, self.adjustment,
+                        self.payment_frequency)
+        object.__setattr__(spec, '_loan', self)
+        return spec
+
     @staticmethod
     def _quantize(value):
-        return Decimal(value).quantize(Decimal('0.01'))
+        return round_to_cent(value)
+
+    @property
+    def _schedule(self):
+        # The amortization table is only built the first time it is needed, so
+        # loans used purely for their payment or rate statistics never pay for it.
+        if self.__schedule is None:
+            if instrumentation.enabled:
+                started = instrumentation.clock()
+                self.__schedule = self._amortize()
+                instrumentation.timing('schedule.build', instrumentation.clock() - started)
+                instrumentation.count('schedule.builds')
+                instrumentation.count('schedule.rows', len(self.__schedule))
+            else:
+                self.__schedule = self._amortize()
+        return self.__schedule
+
+    def _replace(self, **changes):
+        params = dict(principal=self.principal, interest=self.interest, term=self.term,
+                      term_unit=self.term_unit, compounded=self.compounded, currency=self._currency,
+                      backend=self.backend, prepayment=self.prepayment, adjustment=self.adjustment,
+                      payment_frequency=self.payment_frequency)
+        params.update(changes)
+        return Loan(**params)
+
+    @property
+    def _closed_form(self):
+        # Rounded charges, prepayments and adjustments all break the annuity formulas.
+        return self.backend != 'bank' and self.prepayment is None and self.adjustment is None
+
+    @property
+    def _table(self):
+        return period_table(self.interest, self.compounded, self.payment_frequency, self._n_payments,
+                            self._number)
+
+    @property
+    def _period_rate(self):
+        return self._table.rate
+
+    def _reset_rate(self, annual):
+        # Periodic rate of an annual rate the loan is reset to.
+        return period_table(annual, self.compounded, self.payment_frequency, self._n_payments,
+                            self._number).rate
 
     def schedule(self, nth_payment=None):
         """
         Retrieve payment information for the nth payment.
 
+        Without ``nth_payment`` the whole amortization table is returned as a
+        :class:`~mortgage.schedule.Schedule`. A single payment is computed directly from
+        the closed-form balance before it, so the table is not built just to read one row
+        (except with the ``bank`` backend, a prepayment or an adjustment, which have no
+        closed form). The closed form and the running balance of the built table round
+        differently, so such a row matches the table's row to within the backend's
+        tolerance (see :meth:`verify`) rather than digit for digit.
+
         Usage:
             >>> from mortgage import Loan
             >>> loan = Loan(principal=200000, interest=.06, term=30)
             >>> loan.schedule(1)
-            Installment(number=1, payment=Decimal('1199.101050305504789182922487'), interest=Decimal('1E+3'), principal=Decimal('199.101050305504789182922487'), total_interest=Decimal('1000'), balance=Decimal('199800.8989496944952108170775'))
+            Installment(number=1, payment=Decimal('1199.101050305504789182922487'), interest=Decimal('1000.000'), principal=Decimal('199.101050305504789182922487'), total_interest=Decimal('1000.000'), balance=Decimal('199800.8989496944952108170775'))
+        """
+        if not nth_payment:
+            return self._schedule
+        if self.__schedule is None and self._closed_form and 0 < nth_payment <= self._n_payments:
+            return next(self.iter_schedule(nth_payment, nth_payment + 1))
+        return self._schedule[nth_payment]
+
+    def balance_at(self, nth_payment: int) -> Decimal:
+        """
+        Return the balance remaining after the nth payment, without building the schedule.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> loan = Loan(principal=200000, interest=.06, term=30)
+            >>> loan.balance_at(120)
+            Decimal('167371.45')
+        """
+        assert 0 <= nth_payment <= self._n_payments, 'Payment number must be within the term'
+        if not self._closed_form:
+            installment = self._schedule[min(nth_payment, len(self._schedule) - 1)]
+            return self._quantize(installment.balance)
+        if instrumentation.enabled:
+            instrumentation.count('loan.closed_form')
+        return self._quantize(self._balance_after(nth_payment))
+
+    def cumulative_interest(self, nth_payment: int) -> Decimal:
+        """
+        Return the interest paid up to and including the nth payment, without building the schedule.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> loan = Loan(principal=200000, interest=.06, term=30)
+            >>> loan.cumulative_interest(120)
+            Decimal('111263.58')
+        """
+        assert 0 <= nth_payment <= self._n_payments, 'Payment number must be within the term'
+        if not self._closed_form:
+            installment = self._schedule[min(nth_payment, len(self._schedule) - 1)]
+            return self._quantize(installment.total_interest)
+        if instrumentation.enabled:
+            instrumentation.count('loan.closed_form')
+        principal_paid = self._number(self.principal) - self._balance_after(nth_payment)
+        return self._quantize(self._monthly_payment * nth_payment - principal_paid)
+
+    def rescale(self, principal) -> 'Loan':
+        """
+        Return a loan with the same rate and term for a different principal.
+
+        Every column of a level payment schedule is proportional to the principal, so the
+        new loan's schedule is this loan's schedule multiplied by the ratio of principals
+        instead of a new amortization. Amortizing a loan with a principal of one and
+        rescaling it to each requested balance does the amortization work only once. The
+        ``bank`` backend rounds every payment to the cent, and prepayments are fixed amounts,
+        so those loans are amortized afresh instead.
+
+        :param principal: The original sum of money borrowed for the new loan.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> unit = Loan(principal=1, interest=.06, term=30)
+            >>> loan = unit.rescale(200000)
+            >>> loan.monthly_payment, round(loan.schedule(10).balance, 2)
+            (Decimal('1199.10'), Decimal('197963.59'))
+        """
+        loan = self._replace(principal=principal)
+        if self._closed_form:
+            loan.__schedule = self._schedule.scale(loan.principal / self.principal)
+        return loan
+
+    def with_prepayment(self, prepayment: Prepayment) -> 'Loan':
+        """
+        Return this loan with a different prepayment, reusing the unchanged part of its schedule.
+
+        Payments before the first one the new prepayment changes are copied from this
+        loan's schedule, if it has been built, and the recurrence resumes from the balance
+        at that point instead of from the first payment. Running many prepayment scenarios
+        against one loan therefore only recomputes the payments each scenario changes.
+
+        :param prepayment: The new :class:`~mortgage.prepayment.Prepayment`, or ``None``.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> from mortgage.prepayment import Prepayment
+            >>> loan = Loan(principal=200000, interest=.06, term=30)
+            >>> loan.with_prepayment(Prepayment(lump_sums={120: 50000})).years_to_pay
+            21.2
+        """
+        start = (self.prepayment or Prepayment()).first_difference(prepayment)
+        return self._resume(start, prepayment=prepayment)
+
+    def with_adjustment(self, adjustment: Adjustment) -> 'Loan':
+        """
+        Return this loan with other resets or recasts, reusing the unchanged part of its schedule.
+
+        As with :meth:`with_prepayment`, payments before the first change that differs are
+        copied from this loan's schedule, if it has been built, and only the rest of the
+        term is re-amortized. Simulating many rate paths that share their early resets
+        costs one amortization of the common prefix plus the tail of each path.
+
+        :param adjustment: The new :class:`~mortgage.adjustment.Adjustment`, or ``None``.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> from mortgage.adjustment import Adjustment
+            >>> loan = Loan(principal=200000, interest=.06, term=30)
+            >>> arm = loan.with_adjustment(Adjustment.arm([.07, .08], fixed=60))
+            >>> round(arm.schedule(73).payment, 2)
+            Decimal('1433.20')
         """
-        if nth_payment:
-            data = self._schedule[nth_payment]
+        start = (self.adjustment or Adjustment()).first_difference(adjustment)
+        return self._resume(start, adjustment=adjustment)
+
+    def with_backend(self, backend) -> 'Loan':
+        """
+        Return this loan amortized with another backend.
+
+        The schedule is built again in the backend's number type, so none of this loan's
+        schedule is reused.
+
+        :param backend: ``decimal``, ``float`` or ``bank``.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> loan = Loan(principal=200000, interest=.06, term=30)
+            >>> loan.with_backend('float').schedule(1).interest
+            1000.0
+        """
+        return self._replace(backend=backend)
+
+    def _resume(self, start, **changes):
+        # A loan with ``changes`` whose schedule shares this one's rows before ``start``.
+        loan = self._replace(**changes)
+        if self.__schedule is None:
+            return loan
+
+        if start is None or start >= len(self.__schedule):
+            loan.__schedule = self.__schedule
+            return loan
+
+        started = instrumentation.clock() if instrumentation.enabled else None
+        columns = [column[:start] for column in self.__schedule.columns()]
+        if self.__schedule.frozen:
+            columns = [list(column) for column in columns]
+        number, _, _, _, total_interest, balance = self.__schedule.row(start - 1)
+        terms = loan._terms_after(number, self.__schedule)
+        if self.backend == 'bank':
+            rows = loan._recurrence_cents(number, total_interest, balance, terms)
         else:
-            data = self._schedule
-        return data
+            rows = loan._recurrence(number, total_interest, balance, self._n_payments + 1, terms)
+        for row in rows:
+            for column, value in zip(columns, row[1:]):
+                column.append(value)
+        loan.__schedule = loan._to_schedule(columns)
+        if started is not None:
+            instrumentation.timing('schedule.resume', instrumentation.clock() - started)
+            instrumentation.count('schedule.resumes')
+            instrumentation.count('schedule.reused_rows', start)
+            instrumentation.count('schedule.rows', len(loan.__schedule) - start)
+        return loan
+
+    def iter_schedule(self, start=0, stop=None):
+        """
+        Yield payment information one payment at a time without building the schedule.
+
+        Rows are produced by the amortization recurrence, so memory use is constant and
+        the first row is available immediately. The balance before ``start`` is found with
+        the closed-form annuity formula, so beginning part way through a loan costs the same
+        as beginning at the start. The ``bank`` backend, prepaid and adjusted loans have no
+        closed form and replay the recurrence up to ``start`` instead. Prepaid loans stop at
+        the payment that pays them off.
+
+        :param start: the first payment number to yield
+        :param stop: yield payments up to but not including this number, by default all of them
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> loan = Loan(principal=200000, interest=.06, term=30)
+            >>> [round(installment.balance, 2) for installment in loan.iter_schedule(358)]
+            [Decimal('2380.33'), Decimal('1193.14'), Decimal('0.00')]
+        """
+        n_rows = self._n_payments + 1
+        stop = n_rows if stop is None else min(stop, n_rows)
+        if start >= stop:
+            return
+        if self.__schedule is not None:
+            for number in range(start, min(stop, len(self.__schedule))):
+                yield self.__schedule[number]
+            return
+
+        rows = self._rows(start, stop)
+        if self.backend == 'bank':
+            for number, *values in rows:
+                yield Installment(number, *map(from_cents, values))
+        else:
+            for row in rows:
+                yield Installment(*row)
 
     @property
     def _monthly_payment(self):
-        principal = self.principal
-        _int = self.interest
-        num = self.n_periods
-        term = self.term
-        payment = principal * _int / num / (1 - (1 + _int / num) ** (- num * term))
+        if instrumentation.enabled:
+            instrumentation.count('loan.payment')
+        principal = self._number(self.principal)
+        table = self._table
+        if not table.rate:
+            return principal / self._n_payments
+        payment = principal * table.rate / (1 - table.discount)
         return payment
 
+    @property
+    def _total_interest(self):
+        return self._interest_paid(None)
+
+    def _interest_paid(self, payment):
+        if not self._closed_form:
+            # Rounded, prepaid or adjusted interest charges have no closed form; they must be
+            # added up.
+            return self._schedule[-1].total_interest
+        if instrumentation.enabled:
+            instrumentation.count('loan.closed_form')
+        if payment is None:
+            payment = self._monthly_payment
+        # Every payment is the same size and the final balance is zero, so the
+        # interest paid is simply everything paid less the amount borrowed.
+        return payment * self._n_payments - self._number(self.principal)
+
     @property
     def monthly_payment(self):
         """
@@ -159,7 +734,7 @@ class Loan(object):
             >>> loan.total_interest
             Decimal('103788.46')
         """
-        return self._quantize(self.schedule(self.term * self.n_periods).total_interest)
+        return self._quantize(self._total_interest)
 
     @property
     def total_paid(self) -> Decimal:
@@ -187,6 +762,18 @@ class Loan(object):
         """
         return float(round(self.total_interest / self.total_principal * 100, 1))
 
+    @property
+    def n_payments(self) -> int:
+        """
+        Return the number of payments over the term, before any prepayment shortens it.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> Loan(principal=200000, interest=.06, term=15.5).n_payments
+            186
+        """
+        return self._n_payments
+
     @property
     def years_to_pay(self) -> float:
         """
@@ -198,22 +785,41 @@ class Loan(object):
             >>> loan.years_to_pay
             15.0
         """
-        return round(self.term * self.n_periods / 12, 1)
+        n_payments = self._n_payments if self._closed_form else len(self._schedule) - 1
+        return round(n_payments / self.payments_per_year, 1)
 
     @property
     def summarize(self):
-        print('Original Balance:         {}{:>11,}'.format(self._currency,self.principal))
-        print('Interest Rate:             {:>11} %'.format(self.interest))
-        print('APY:                       {:>11} %'.format(self.apy))
-        print('APR:                       {:>11} %'.format(self.apr))
-        print('Term:                      {:>11} {}'.format(self.term, self.term_unit))
-        print('Monthly Payment:          {}{:>11}'.format(self._currency,self.monthly_payment))
+        summary = self.summary()
+        print('Original Balance:         {}{:>11,}'.format(self._currency,summary.principal))
+        print('Interest Rate:             {:>11} %'.format(summary.interest))
+        print('APY:                       {:>11} %'.format(summary.apy))
+        print('APR:                       {:>11} %'.format(summary.apr))
+        print('Term:                      {:>11} {}'.format(summary.term, summary.term_unit))
+        print('Monthly Payment:          {}{:>11}'.format(self._currency,summary.monthly_payment))
         print('')
-        print('Total principal payments: {}{:>11,}'.format(self._currency,self.total_principal))
-        print('Total interest payments:  {}{:>11,}'.format(self._currency,self.total_interest))
-        print('Total payments:           {}{:>11,}'.format(self._currency,self.total_paid))
-        print('Interest to principal:     {:>11} %'.format(self.interest_to_principle))
-        print('Years to pay:              {:>11}'.format(self.years_to_pay))
+        print('Total principal payments: {}{:>11,}'.format(self._currency,summary.total_principal))
+        print('Total interest payments:  {}{:>11,}'.format(self._currency,summary.total_interest))
+        print('Total payments:           {}{:>11,}'.format(self._currency,summary.total_paid))
+        print('Interest to principal:     {:>11} %'.format(summary.interest_to_principle))
+        print('Years to pay:              {:>11}'.format(summary.years_to_pay))
+
+    def summary(self) -> Summary:
+        """
+        Return the statistics :attr:`summarize` prints, as a :class:`Summary`.
+
+        Every statistic is computed once: the payment is shared by the total interest, and
+        the total interest by the total paid and the interest to principal ratio, so a
+        summary costs about as much as reading :attr:`total_interest` alone.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> summary = Loan(principal=200000, interest=.06, term=30).summary()
+            >>> summary.monthly_payment, summary.interest_to_principle
+            (Decimal('1199.10'), 115.8)
+        """
+        payment = self._monthly_payment
+        return Summary.from_loan(self, payment, self._interest_paid(payment))
 
     def split_payment(self, number: int, amount: Decimal) -> Tuple[Decimal, Decimal]:
         """
@@ -229,43 +835,238 @@ class Loan(object):
             >>> loan.split_payment(number=180, amount=Decimal(1199.10))
             (Decimal('8.396585353715933437157525763'), Decimal('1190.703414646283975613372297'))
         """
+        if instrumentation.enabled:
+            instrumentation.count('loan.split_payment')
+
         def compute_interest_portion(payment_number):
-            _int = self.interest / 12
-            _intp1 = _int + 1
+            table = self._table
+            if not table.rate:
+                return table.rate
+            _int = table.rate
+            _intp1 = table.growth
 
-            numerator = self.principal * _int * (_intp1 ** (self.n_periods * self.term + 1)
+            numerator = self._number(self.principal) * _int * (table.compound * _intp1
                                                  - _intp1 ** payment_number)
-            denominator = _intp1 * (_intp1 ** (self.n_periods * self.term) - 1)
+            denominator = _intp1 * (table.compound - 1)
             return numerator / denominator
 
         interest_payment = compute_interest_portion(number)
-        principal_payment = amount - interest_payment
+        principal_payment = self._number(amount) - interest_payment
         return interest_payment, principal_payment
 
-    def _amortize(self):
-        initialize = Installment(number=0,
-                                 payment=0,
-                                 interest=0,
-                                 principal=0,
-                                 total_interest=0,
-                                 balance=self.principal)
-        schedule = [initialize]
-        total_interest = 0
-        balance = self.principal
-        for payment_number in range(1, self.term * self.n_periods + 1):
-
-            split = self.split_payment(payment_number, self._monthly_payment)
-            interest_payment, principal_payment = split
+    def verify(self, tolerance: Decimal = None) -> Decimal:
+        """
+        Check the amortization schedule against the closed-form split of every payment.
+
+        The schedule is built with a running recurrence (interest is the carried
+        balance times the periodic rate). This recomputes the interest portion of each
+        payment with :meth:`split_payment` and raises :class:`AssertionError` if any row
+        differs by more than ``tolerance``.
+
+        :param tolerance: the largest absolute difference allowed for any row, by default
+            the bound documented for the loan's ``backend``, which for ``bank`` grows with
+            the rate and term
+        :return: the largest absolute difference found
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> from decimal import Decimal
+            >>> loan = Loan(principal=200000, interest=.06, term=30)
+            >>> loan.verify() < Decimal('1E-15')
+            True
+        """
+        if tolerance is None:
+            tolerance = self._tolerance
+        payment = self._monthly_payment
+        deviation = Decimal(0)
+        for installment in self._schedule[1:]:
+            interest_payment, _ = self.split_payment(installment.number, payment)
+            difference = abs(Decimal(installment.interest) - Decimal(interest_payment))
+            assert difference <= tolerance, 'Payment {} differs from its closed form by {}'.format(
+                installment.number, difference)
+            deviation = max(deviation, difference)
+        return deviation
+
+    @property
+    def _tolerance(self):
+        if self.backend != 'bank':
+            return TOLERANCES[self.backend]
+        # The payment and every charge are rounded by up to half a cent each, so the balance
+        # moves by up to a cent a payment and each cent compounds at the periodic rate until
+        # the end of the term: the drift is at most a cent times (1 + r) ** n - 1 over r,
+        # and the interest on it at most a cent times (1 + r) ** n - 1.
+        return TOLERANCES['bank'] * (2 * (self._table.compound - 1) + 1)
+
+    def _balance_after(self, number):
+        # Closed form for the balance remaining once ``number`` payments have been made.
+        table = self._table
+        n_payments = self._n_payments
+        principal = self._number(self.principal)
+        if not table.rate:
+            return principal * (n_payments - number) / n_payments
+        return principal * (table.compound - table.growth ** number) / (table.compound - 1)
+
+    def _rows(self, start, stop):
+        # Raw schedule rows in the backend's own units, from ``start`` up to ``stop``.
+        if not self._closed_form:
+            if instrumentation.enabled:
+                instrumentation.count('loan.recurrence')
+            yield from islice(self._replay(), start, stop)
+            return
+
+        principal = self._number(self.principal)
+        if start == 0:
+            yield 0, 0, 0, 0, 0, principal
+            start = 1
+        number = start - 1
+        if instrumentation.enabled:
+            instrumentation.count('loan.closed_form' if number else 'loan.recurrence')
+        if number:
+            balance = self._balance_after(number)
+            total_interest = self._monthly_payment * number - (principal - balance)
+        else:
+            balance, total_interest = principal, 0
+        yield from self._recurrence(number, total_interest, balance, stop)
+
+    def _replay(self):
+        # Every row from the first payment on, for schedules without a closed form.
+        if self.backend == 'bank':
+            balance = self._principal_cents
+            yield 0, 0, 0, 0, 0, balance
+            yield from self._recurrence_cents(0, 0, balance)
+        else:
+            balance = self._number(self.principal)
+            yield 0, 0, 0, 0, 0, balance
+            yield from self._recurrence(0, 0, balance, self._n_payments + 1)
+
+    def _recurrence(self, number, total_interest, balance, stop, terms=None):
+        # Rows following payment ``number``, given the interest paid and balance left after it,
+        # and the periodic rate and level payment in force at that point.
+        rate, level_payment = terms or (self._period_rate, self._monthly_payment)
+        payment = level_payment
+        prepayment = self.prepayment
+        adjustment = self.adjustment
+        n_payments = self._n_payments
+        for payment_number in range(number + 1, stop):
+
+            recast = None
+            if adjustment is not None:
+                reset = adjustment.reset_at(payment_number)
+                if reset is not None:
+                    rate = self._reset_rate(reset)
+                    remaining = n_payments - payment_number + 1
+                    level_payment = payment = self._annuity(balance, rate, remaining)
+                recast = adjustment.recast_at(payment_number)
+
+            interest_payment = balance * rate
+            principal_payment = level_payment - interest_payment
+
+            if prepayment is not None:
+                smm = self._number(prepayment.smm_at(payment_number, self.payments_per_year))
+                principal_payment += (balance - principal_payment) * smm
+                principal_payment += self._number(prepayment.extra_at(payment_number))
+            if recast is not None:
+                principal_payment += self._number(recast)
+            if prepayment is not None or recast is not None:
+                principal_payment = min(principal_payment, balance)
+                payment = interest_payment + principal_payment
 
             total_interest += interest_payment
             balance -= principal_payment
-            installment = Installment(number=payment_number,
-                                      payment=self._monthly_payment,
-                                      interest=interest_payment,
-                                      principal=principal_payment,
-                                      total_interest=total_interest,
-                                      balance=balance)
 
-            schedule.append(installment)
+            yield (payment_number, payment, interest_payment, principal_payment,
+                   total_interest, balance)
+            if recast is not None:
+                level_payment = payment = self._annuity(balance, rate, n_payments - payment_number)
+            if (prepayment is not None or adjustment is not None) and not balance:
+                return
+
+    def _annuity(self, balance, rate, n_payments):
+        # Level payment repaying ``balance`` over ``n_payments`` at the periodic ``rate``.
+        if not n_payments:
+            return balance
+        if not rate:
+            return balance / n_payments
+        return balance * rate / (1 - (1 + rate) ** -n_payments)
+
+    def _terms_after(self, number, schedule):
+        # The periodic rate and level payment in force once ``number`` payments have been
+        # made, recovered from the balances in ``schedule`` at the last change before then.
+        rate, payment = self._period_rate, self._monthly_payment
+        adjustment = self.adjustment
+        event = adjustment.last_event(number) if adjustment is not None else None
+        if event is None:
+            return rate, payment
+
+        reset = adjustment.last_reset(number)
+        if reset is not None:
+            rate = self._reset_rate(adjustment.reset_at(reset))
+        if adjustment.recast_at(event) is not None:
+            balance, remaining = schedule[event].balance, self._n_payments - event
+        else:
+            balance, remaining = schedule[event - 1].balance, self._n_payments - event + 1
+        return rate, self._annuity(self._number(balance), rate, remaining)
+
+    @property
+    def _principal_cents(self):
+        return self._cents(self.principal)
 
-        return schedule
+    def _cents(self, amount):
+        return int(self._quantize(amount) * 100)
+
+    def _recurrence_cents(self, number, total_interest, balance, terms=None):
+        # The periodic rate is an exact ratio of integers, so every charge below is
+        # computed in whole cents and rounded half up without touching floats or Decimals.
+        rate, level_payment = terms or (self._period_rate, self._monthly_payment)
+        numerator, denominator = rate.as_integer_ratio()
+        level_payment = self._cents(level_payment)
+        prepayment = self.prepayment
+        adjustment = self.adjustment
+
+        n_payments = self._n_payments
+        for payment_number in range(number + 1, n_payments + 1):
+
+            recast = None
+            if adjustment is not None:
+                reset = adjustment.reset_at(payment_number)
+                if reset is not None:
+                    rate = self._reset_rate(reset)
+                    numerator, denominator = rate.as_integer_ratio()
+                    remaining = n_payments - payment_number + 1
+                    level_payment = self._cents(self._annuity(from_cents(balance), rate, remaining))
+                recast = adjustment.recast_at(payment_number)
+
+            interest_payment = (2 * balance * numerator + denominator) // (2 * denominator)
+            principal_payment = level_payment - interest_payment
+
+            if prepayment is not None:
+                remaining = Decimal(balance - principal_payment)
+                prepaid = remaining * prepayment.smm_at(payment_number, self.payments_per_year)
+                principal_payment += int(prepaid.to_integral_value(ROUND_HALF_UP))
+                principal_payment += int(prepayment.extra_at(payment_number) * 100)
+            if recast is not None:
+                principal_payment += int(recast * 100)
+
+            if payment_number == n_payments or principal_payment > balance:
+                principal_payment = balance
+            payment = principal_payment + interest_payment
+
+            total_interest += interest_payment
+            balance -= principal_payment
+
+            yield (payment_number, payment, interest_payment, principal_payment,
+                   total_interest, balance)
+            if recast is not None:
+                remaining = n_payments - payment_number
+                level_payment = self._cents(self._annuity(from_cents(balance), rate, remaining))
+            if (prepayment is not None or adjustment is not None) and not balance:
+                return
+
+    def _to_schedule(self, columns):
+        if self.backend == 'bank':
+            return Schedule.from_cents(*columns)
+        return Schedule(*columns, kind=self.backend)
+
+    def _amortize(self):
+        _, *columns = zip(*self._rows(0, self._n_payments + 1))
+        return self._to_schedule(columns)
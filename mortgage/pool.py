@@ -0,0 +1,240 @@
+"""Aggregate the cash flows of many loans into pools, by period and by group.
+
+A :class:`Pool` keeps running sums per payment period for each group of loans: the payments,
+interest, principal and balances, and the balance-weighted coupon and remaining term behind
+the weighted average coupon (WAC) and weighted average maturity (WAM). Loans are added one
+at a time or as arrays of fixed rate loans in chunks, and each schedule is dropped as soon
+as it is added, so memory holds only the sums: seven floats per period per group, however
+many loans are pooled. Pools built separately, for example by worker processes, can be
+combined with :meth:`Pool.merge`.
+
+This module requires `numpy <https://numpy.org>`_, available with ``pip install mortgage[numpy]``.
+"""
+from collections import namedtuple
+from collections.abc import Iterable
+
+import numpy as np
+
+from mortgage import batch
+from mortgage.loan import Loan
+
+CashFlows = namedtuple('CashFlows', 'payment interest principal balance wac wam loans')
+
+# Rows of the running sums kept per group.
+_PAYMENT, _INTEREST, _PRINCIPAL, _BALANCE, _COUPON, _MATURITY, _LOANS = range(7)
+
+# Balances under half a cent are float residue of a loan that is paid off.
+OUTSTANDING = 0.005
+
+
+def rate_bucket(rates, width=0.005):
+    """
+    Return the lower edge of the bucket of ``width`` each rate falls in, to group loans by.
+
+    Usage:
+        >>> from mortgage.pool import rate_bucket
+        >>> rate_bucket([.03, .0425, .04875, .06]).tolist()
+        [0.03, 0.04, 0.045, 0.06]
+    """
+    assert width > 0, 'width must be a positive number'
+    rates = np.asarray(rates, dtype=np.float64)
+    # Rates on an edge are nudged up first, so 0.06 / 0.005 = 11.999... lands in its own bucket.
+    return np.round(np.floor(rates / width + 1e-9) * width, 10)
+
+
+def _column(schedule, name):
+    values = np.asarray(schedule.column(name), dtype=np.float64)
+    return values / 100 if schedule.kind == 'cents' else values
+
+
+def _coupons(loan, length):
+    # The annual rate charged on the balance left after each payment.
+    rates = np.full(length, float(loan.interest))
+    adjustment = loan.adjustment
+    if adjustment is not None:
+        for number, rate in sorted(adjustment.resets.items()):
+            rates[number - 1:] = float(rate)
+    return rates
+
+
+class Pool(object):
+    """
+    :class:`Pool <Pool>` object summing the cash flows of loans by period for each group.
+
+    Period ``n`` follows :meth:`Loan.schedule <mortgage.Loan.schedule>` numbering: it holds
+    the nth payments of every loan, and the balances left after them. Period ``0`` holds the
+    original balances. Loans are grouped by the key they are added with; loans added without
+    a key form the group ``None``.
+
+    Usage:
+        >>> from mortgage import Loan
+        >>> from mortgage.pool import Pool
+        >>> pool = Pool().add_loans([Loan(200000, .06, 30), Loan(100000, .03, 15)])
+        >>> flows = pool.cash_flows()
+        >>> round(float(flows.wac[0]), 4), float(flows.wam[0]), int(flows.loans[180])
+        (0.05, 300.0, 1)
+        >>> round(float(flows.interest[1]), 2)
+        1250.0
+    """
+
+    def __init__(self):
+        self._sums = {}
+
+    def __repr__(self):
+        return '<Pool groups={}, periods={}>'.format(len(self._sums), self.periods)
+
+    def __len__(self):
+        return len(self._sums)
+
+    def __contains__(self, key):
+        return key in self._sums
+
+    @property
+    def periods(self) -> int:
+        """Return the number of periods of the longest group, counting period zero."""
+        return max((sums.shape[1] for sums in self._sums.values()), default=0)
+
+    def keys(self):
+        """Return the keys of the groups in the pool, in the order they were first seen."""
+        return list(self._sums)
+
+    def _group(self, key, length):
+        sums = self._sums.get(key)
+        if sums is None or sums.shape[1] < length:
+            grown = np.zeros((7, length))
+            if sums is not None:
+                grown[:, :sums.shape[1]] = sums
+            sums = self._sums[key] = grown
+        return sums
+
+    def add(self, loan: Loan, key=None) -> 'Pool':
+        """
+        Add the schedule of one loan to the group ``key``.
+
+        The schedule is amortized on a copy of the loan with the ``float`` backend (or its
+        own ``bank`` backend), so the loan does not keep it afterwards. Loans with any
+        prepayment or adjustment are pooled as their schedules run; the coupon after a
+        reset is the new rate.
+        """
+        source = loan.with_backend('float' if loan.backend == 'decimal' else loan.backend)
+        schedule = source.schedule()
+        length = len(schedule)
+        sums = self._group(key, length)
+        balance = _column(schedule, 'balance')
+        sums[_PAYMENT, :length] += _column(schedule, 'payment')
+        sums[_INTEREST, :length] += _column(schedule, 'interest')
+        sums[_PRINCIPAL, :length] += _column(schedule, 'principal')
+        sums[_BALANCE, :length] += balance
+        sums[_COUPON, :length] += balance * _coupons(loan, length)
+        sums[_MATURITY, :length] += balance * (loan.n_payments - np.arange(length))
+        sums[_LOANS, :length] += balance >= OUTSTANDING
+        return self
+
+    def add_loans(self, loans, keys=None) -> 'Pool':
+        """
+        Add every loan of an iterable, one at a time.
+
+        :param loans: Iterable of :class:`~mortgage.Loan`, read once.
+        :param keys: The group of each loan: a function of the loan, or an iterable of keys
+            in the order of ``loans``. By default every loan is in the group ``None``.
+        """
+        if callable(keys):
+            for loan in loans:
+                self.add(loan, keys(loan))
+        elif keys is None:
+            for loan in loans:
+                self.add(loan)
+        else:
+            for loan, key in zip(loans, keys):
+                self.add(loan, key)
+        return self
+
+    def add_batch(self, principals, rates, terms, keys=None, compounded='monthly',
+                  chunk_size=4096) -> 'Pool':
+        """
+        Add many fixed rate loans given as arrays, amortized with :func:`mortgage.batch.amortize`.
+
+        Loans are amortized ``chunk_size`` at a time and every chunk is summed into its
+        groups with one sort, so the full schedules of a chunk are the only tables held.
+
+        :param principals: The original sum of money borrowed for each loan.
+        :param rates: The annual interest rate for each loan.
+        :param terms: The lifespan of each loan in years.
+        :param keys: The group of each loan, an array of keys or one key for all of them.
+        :param compounded: Frequency that interest is compounded, for all loans.
+        :param chunk_size: The number of loans amortized at a time.
+        """
+        assert chunk_size > 0, 'chunk_size must be a positive number'
+        principals, rates, terms = np.broadcast_arrays(np.asarray(principals, dtype=np.float64),
+                                                       np.asarray(rates, dtype=np.float64),
+                                                       np.asarray(terms, dtype=np.float64))
+        principals, rates, terms = principals.ravel(), rates.ravel(), terms.ravel()
+        if keys is None or isinstance(keys, str) or not isinstance(keys, Iterable):
+            keys = np.full(principals.size, 0), [keys]
+        else:
+            names, groups = np.unique(np.asarray(keys), return_inverse=True)
+            keys = groups.ravel(), names.tolist()
+        groups, names = keys
+        assert groups.size == principals.size, 'keys must be one key or one key per loan'
+
+        for start in range(0, principals.size, chunk_size):
+            chunk = slice(start, start + chunk_size)
+            self._add_chunk(principals[chunk], rates[chunk], terms[chunk], groups[chunk], names,
+                            compounded)
+        return self
+
+    def _add_chunk(self, principals, rates, terms, groups, names, compounded):
+        schedules = batch.amortize(principals, rates, terms, compounded)
+        balance = schedules.balance
+        n_payments = batch.prepare(principals, rates, terms, compounded).n_payments
+        remaining = n_payments[:, np.newaxis] - np.arange(balance.shape[1])
+        columns = (schedules.interest + schedules.principal, schedules.interest,
+                   schedules.principal, balance, balance * rates[:, np.newaxis], balance * remaining,
+                   balance >= OUTSTANDING)
+
+        order = np.argsort(groups, kind='stable')
+        present, starts = np.unique(groups[order], return_index=True)
+        widths = np.maximum.reduceat(n_payments[order], starts) + 1
+        targets = [self._group(names[group], width) for group, width in zip(present, widths)]
+        for row, values in enumerate(columns):
+            if len(present) == 1:
+                totals = [values.sum(axis=0)]
+            else:
+                totals = np.add.reduceat(values[order], starts, axis=0)
+            for sums, total, width in zip(targets, totals, widths):
+                sums[row, :width] += total[:width]
+
+    def merge(self, other: 'Pool') -> 'Pool':
+        """Add the sums of another pool, group by group, and return this pool."""
+        for key, sums in other._sums.items():
+            self._group(key, sums.shape[1])[:, :sums.shape[1]] += sums
+        return self
+
+    def cash_flows(self, key=None) -> CashFlows:
+        """
+        Return the cash flows of one group by period.
+
+        ``wac`` is the average annual coupon of the balances left after each period and
+        ``wam`` their average remaining term in payments, both weighted by balance, and
+        ``nan`` once nothing is left. ``loans`` counts the loans with a balance left.
+
+        :param key: The group, by default the loans added without a key.
+        :return: :class:`CashFlows` of arrays with one value per period
+        """
+        sums = self._sums[key]
+        balance = sums[_BALANCE]
+        outstanding = balance >= OUTSTANDING
+        with np.errstate(divide='ignore', invalid='ignore'):
+            wac = np.where(outstanding, sums[_COUPON] / balance, np.nan)
+            wam = np.where(outstanding, sums[_MATURITY] / balance, np.nan)
+        return CashFlows(payment=sums[_PAYMENT].copy(),
+                         interest=sums[_INTEREST].copy(),
+                         principal=sums[_PRINCIPAL].copy(),
+                         balance=balance.copy(),
+                         wac=wac,
+                         wam=wam,
+                         loans=sums[_LOANS].astype(np.int64))
+
+    def groups(self) -> dict:
+        """Return the :class:`CashFlows` of every group by key."""
+        return {key: self.cash_flows(key) for key in self._sums}
@@ -0,0 +1,152 @@
+"""Summarize many loans, in this process or in parallel across worker processes."""
+from collections import deque
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from itertools import islice
+import json
+import os
+from typing import List
+
+from mortgage.loan import Loan, LoanSpec, Summary
+
+
+def summarize(loan: Loan) -> Summary:
+    """
+    Return the statistics :attr:`Loan.summarize <mortgage.Loan.summarize>` prints, as data.
+
+    This is :meth:`Loan.summary <mortgage.Loan.summary>`, kept as a function to be mapped
+    over loans.
+
+    Usage:
+        >>> from mortgage import Loan
+        >>> from mortgage.portfolio import summarize
+        >>> summarize(Loan(principal=200000, interest=.06, term=30)).total_paid
+        Decimal('431676.38')
+    """
+    return loan.summary()
+
+
+def summaries(specs) -> List[Summary]:
+    """
+    Summarize every loan in ``specs`` in this process.
+
+    Loans with the same spec are summarized once, which suits the repeated quotes of a
+    web service better than starting worker processes with :func:`run`.
+
+    :param specs: Iterable of loan specs, in any of the forms :func:`run` accepts.
+    :return: list of :class:`~mortgage.loan.Summary`, in the order of ``specs``
+
+    Usage:
+        >>> from mortgage import portfolio
+        >>> results = portfolio.summaries([(200000, .06, 30), (200000, .06, 15)])
+        >>> [summary.monthly_payment for summary in results]
+        [Decimal('1199.10'), Decimal('1687.71')]
+    """
+    computed = {}
+    results = []
+    for spec in specs:
+        key = _key(spec)
+        if key is None:
+            results.append(_loan(spec).summary())
+            continue
+        if key not in computed:
+            computed[key] = _loan(spec).summary()
+        results.append(computed[key])
+    return results
+
+
+def to_json(summaries, **kwargs) -> str:
+    """
+    Return a JSON array of summaries, passing ``kwargs`` on to :func:`json.dumps`.
+
+    Usage:
+        >>> from mortgage import portfolio
+        >>> portfolio.to_json(portfolio.summaries([(200000, .06, 30)]))[:27]
+        '[{"principal": 200000.0, "i'
+    """
+    return json.dumps([summary.to_dict() for summary in summaries], **kwargs)
+
+
+def _key(spec):
+    # Loans carry their own state and mappings are unhashable, so only specs and tuples
+    # of plain values are shared.
+    if isinstance(spec, LoanSpec):
+        return spec
+    if isinstance(spec, (Loan, Mapping)):
+        return None
+    try:
+        hash(spec)
+    except TypeError:
+        return None
+    return tuple(spec)
+
+
+def _loan(spec):
+    if isinstance(spec, Loan):
+        return spec
+    if isinstance(spec, LoanSpec):
+        return spec.loan()
+    if isinstance(spec, Mapping):
+        return Loan(**spec)
+    return Loan(*spec)
+
+
+def _summarize_chunk(chunk):
+    return [(index, summarize(_loan(spec))) for index, spec in chunk]
+
+
+def _chunks(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def run(specs, chunk_size=1000, workers=None, ordered=True):
+    """
+    Summarize every loan in ``specs`` across a pool of worker processes.
+
+    Specs are read lazily and sent to the workers ``chunk_size`` loans at a time, with at
+    most two chunks per worker in flight, so an iterable of any length is processed in
+    constant memory. Results are streamed back as ``(index, summary)`` pairs, where
+    ``index`` is the position of the spec in ``specs``.
+
+    :param specs: Iterable of loans to summarize. Each spec is a tuple of
+        ``(principal, interest, term, term_unit, compounded)`` (trailing items may be left
+        out), a mapping of :class:`~mortgage.Loan` keyword arguments, a
+        :class:`~mortgage.loan.LoanSpec` or a ``Loan``. Loans are sent to the workers as
+        their specs, without their schedules.
+    :param chunk_size: Number of loans sent to a worker at a time.
+    :param workers: Number of worker processes, by default one per CPU.
+    :param ordered: Yield results in the order of ``specs``. Otherwise results are
+        yielded as soon as their chunk is finished.
+    :return: iterator of ``(index, Summary)`` pairs
+
+    Usage:
+        >>> from mortgage import portfolio
+        >>> specs = [(200000, .06, 30), (200000, .06, 15, 'years', 'monthly')]
+        >>> [summary.monthly_payment for _, summary in portfolio.run(specs, workers=2)]
+        [Decimal('1199.10'), Decimal('1687.71')]
+    """
+    assert chunk_size > 0, 'chunk_size must be a positive number'
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(((index, spec.spec if isinstance(spec, Loan) else spec)
+                      for index, spec in enumerate(specs)), chunk_size)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(executor.submit(_summarize_chunk, chunk)
+                        for chunk in islice(chunks, 2 * workers))
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                done = [future for future in pending if future in finished]
+                for future in done:
+                    pending.remove(future)
+
+            for future in done:
+                for chunk in islice(chunks, 1):
+                    pending.append(executor.submit(_summarize_chunk, chunk))
+                yield from future.result()
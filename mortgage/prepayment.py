@@ -0,0 +1,104 @@
+"""Payments made ahead of the amortization schedule."""
+from decimal import Decimal
+from numbers import Number
+
+
+def to_decimal(value) -> Decimal:
+    """
+    Return an amount or rate given by the caller as a :class:`Decimal`.
+
+    Floats are taken at their shortest repr, so 0.06 means 0.06 rather than its binary
+    expansion.
+
+    Usage:
+        >>> from mortgage.prepayment import to_decimal
+        >>> to_decimal(.06), to_decimal(250)
+        (Decimal('0.06'), Decimal('250'))
+    """
+    return Decimal(repr(float(value))) if isinstance(value, float) else Decimal(value)
+
+
+class Prepayment(object):
+    """
+    :class:`Prepayment <Prepayment>` object describing principal paid ahead of schedule.
+
+    Prepayments are made on top of the level payment, which stays the same, so a prepaid
+    loan is paid off before the end of its term. Three kinds can be combined:
+
+    :param extra: Extra principal paid with every payment.
+    :param lump_sums: Mapping of payment number to an extra amount paid with that payment.
+    :param cpr: Conditional prepayment rate, the annual fraction of the outstanding balance
+        prepaid. Either one rate for the life of the loan or a curve of rates by payment
+        number (starting with the first payment), whose last rate carries on to the end.
+        Each rate is converted to the equivalent single period rate (SMM for monthly
+        payments) and applied to the balance left after the scheduled principal.
+
+    Usage:
+        >>> from mortgage import Loan
+        >>> from mortgage.prepayment import Prepayment
+        >>> loan = Loan(principal=200000, interest=.06, term=30, prepayment=Prepayment(extra=200))
+        >>> loan.years_to_pay
+        21.0
+    """
+
+    def __init__(self, extra=0, lump_sums=None, cpr=0):
+        curve = (cpr,) if isinstance(cpr, Number) else tuple(cpr)
+
+        assert extra >= 0, 'Extra payment must not be negative'
+        lump_sums = lump_sums or {}
+        assert all(amount >= 0 for amount in lump_sums.values()), 'Lump sums must not be negative'
+        assert curve and all(0 <= rate < 1 for rate in curve), 'CPR must be between zero and one'
+
+        self.extra = to_decimal(extra)
+        self.lump_sums = {number: to_decimal(amount) for number, amount in lump_sums.items()}
+        self.cpr = tuple(to_decimal(rate) for rate in curve)
+        self._smm = {}
+
+    def __repr__(self):
+        cpr = self.cpr[0] if len(self.cpr) == 1 else 'curve'
+        return '<Prepayment extra={}, lump_sums={}, cpr={}>'.format(
+            self.extra, len(self.lump_sums), cpr)
+
+    @classmethod
+    def psa(cls, speed=100, extra=0, lump_sums=None):
+        """
+        Return the Public Securities Association prepayment curve at ``speed`` percent.
+
+        100 PSA ramps the CPR up by 0.2% a month to 6% at month 30 and holds it there.
+        It assumes monthly payments.
+        """
+        curve = [Decimal('0.002') * min(month, 30) * Decimal(speed) / 100 for month in range(1, 31)]
+        return cls(extra=extra, lump_sums=lump_sums, cpr=curve)
+
+    def extra_at(self, number) -> Decimal:
+        """Return the fixed amount prepaid with the nth payment."""
+        return self.extra + self.lump_sums.get(number, 0)
+
+    def _cpr_at(self, number):
+        return self.cpr[min(number, len(self.cpr)) - 1]
+
+    def smm_at(self, number, n_periods) -> Decimal:
+        """Return the fraction of the balance prepaid with the nth payment (SMM for monthly)."""
+        rate = self._cpr_at(number)
+        key = (rate, n_periods)
+        if key not in self._smm:
+            self._smm[key] = 1 - (1 - rate) ** (Decimal(1) / n_periods) if rate else Decimal(0)
+        return self._smm[key]
+
+    def first_difference(self, other: 'Prepayment'):
+        """
+        Return the first payment number at which ``other`` may prepay differently, or ``None``.
+
+        Schedules are identical up to, but not including, this payment.
+        """
+        other = other or Prepayment()
+        candidates = []
+        if self.extra != other.extra:
+            candidates.append(1)
+        candidates.extend(number for number in set(self.lump_sums) | set(other.lump_sums)
+                          if self.lump_sums.get(number, 0) != other.lump_sums.get(number, 0))
+        for index in range(max(len(self.cpr), len(other.cpr))):
+            if self._cpr_at(index + 1) != other._cpr_at(index + 1):
+                candidates.append(index + 1)
+                break
+        return min(candidates) if candidates else None
@@ -0,0 +1,245 @@
+"""Columnar storage for amortization schedules."""
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+from decimal import Decimal
+import sys
+
+Installment = namedtuple('Installment', 'number payment interest principal total_interest balance')
+
+COLUMNS = Installment._fields[1:]
+
+_CENT = Decimal('0.01')
+
+
+def _to_cents(value):
+    if isinstance(value, float):
+        return int(round(value * 100))
+    return int((Decimal(value) * 100).to_integral_value())
+
+
+def from_cents(value):
+    """Convert a whole number of cents to a :class:`~decimal.Decimal` amount with two places."""
+    return Decimal(value).scaleb(-2).quantize(_CENT)
+
+
+def _float_column(values):
+    try:
+        return array('d', values)
+    except TypeError:
+        return array('d', map(float, values))
+
+
+def _cents_column(values):
+    return array('q', map(_to_cents, values))
+
+
+_STORAGE = {
+    'decimal': list,
+    'float': _float_column,
+    'cents': _cents_column,
+}
+
+
+class Schedule(Sequence):
+    """
+    :class:`Schedule <Schedule>` object holding an amortization table one column per field.
+
+    Rows are only turned into :class:`Installment` tuples when they are indexed or iterated,
+    so a schedule costs a handful of containers instead of one tuple per payment.
+
+    Columns are stored according to ``kind``:
+
+    * ``decimal``: lists of :class:`~decimal.Decimal`, keeping full precision
+    * ``float``: contiguous ``array('d')``, 8 bytes per value
+    * ``cents``: contiguous ``array('q')`` of whole cents, 8 bytes per value and exact
+      to the cent. Values are returned as :class:`~decimal.Decimal` with two places.
+
+    :param payment: The payment column.
+    :param interest: The interest portion column.
+    :param principal: The principal portion column.
+    :param total_interest: The cumulative interest column.
+    :param balance: The remaining balance column.
+    :param kind: How the columns are stored.
+    :param start: The payment number of the first row.
+
+    A schedule shared between callers should be :meth:`frozen <freeze>`, so no caller can
+    change the rows every other caller reads.
+
+    Usage:
+        >>> from mortgage.schedule import Schedule
+        >>> schedule = Schedule([0, 30], [0, 10], [0, 20], [0, 10], [100, 80], kind='cents')
+        >>> schedule[1]
+        Installment(number=1, payment=Decimal('30.00'), interest=Decimal('10.00'), principal=Decimal('20.00'), total_interest=Decimal('10.00'), balance=Decimal('80.00'))
+        >>> schedule.balance
+        array('q', [10000, 8000])
+    """
+
+    _frozen = False
+
+    def __init__(self, payment, interest, principal, total_interest, balance, kind='decimal', start=0):
+        assert kind in _STORAGE, 'kind can be either decimal, float, or cents'
+        convert = _STORAGE[kind]
+
+        self.kind = kind
+        self.start = start
+        self.payment = convert(payment)
+        self.interest = convert(interest)
+        self.principal = convert(principal)
+        self.total_interest = convert(total_interest)
+        self.balance = convert(balance)
+        assert len({len(self.column(name)) for name in COLUMNS}) == 1, 'Columns must be the same length'
+
+    def __setattr__(self, name, value):
+        if self._frozen:
+            raise AttributeError('Schedule is frozen')
+        object.__setattr__(self, name, value)
+
+    def __delattr__(self, name):
+        if self._frozen:
+            raise AttributeError('Schedule is frozen')
+        object.__delattr__(self, name)
+
+    def __repr__(self):
+        return '<Schedule payments={}, kind={}>'.format(len(self), self.kind)
+
+    def __eq__(self, other):
+        # Schedules compare by their rows, as the lists of installments they replace did.
+        if isinstance(other, Schedule):
+            if len(self) != len(other):
+                return False
+            if self.kind == other.kind:
+                return self.start == other.start and all(
+                    list(mine) == list(theirs) for mine, theirs in zip(self.columns(), other.columns()))
+            return list(self) == list(other)
+        if isinstance(other, list):
+            return list(self) == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __len__(self):
+        return len(self.balance)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[position] for position in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('schedule index out of range')
+        values = (self._value(column[index]) for column in self.columns())
+        return Installment(self.start + index, *values)
+
+    def __iter__(self):
+        values = zip(*(map(self._value, column) for column in self.columns()))
+        for index, row in enumerate(values, self.start):
+            yield Installment(index, *row)
+
+    @classmethod
+    def from_cents(cls, payment, interest, principal, total_interest, balance, start=0):
+        """Build a ``cents`` schedule from columns that already hold whole cents."""
+        schedule = cls([], [], [], [], [], kind='cents', start=start)
+        schedule.payment = array('q', payment)
+        schedule.interest = array('q', interest)
+        schedule.principal = array('q', principal)
+        schedule.total_interest = array('q', total_interest)
+        schedule.balance = array('q', balance)
+        assert len({len(column) for column in schedule.columns()}) == 1, 'Columns must be the same length'
+        return schedule
+
+    def row(self, index):
+        """Return the nth row as stored, without converting whole cents to amounts."""
+        return (self.start + index,) + tuple(column[index] for column in self.columns())
+
+    def _value(self, value):
+        if self.kind == 'cents':
+            return from_cents(value)
+        return value
+
+    def column(self, name):
+        """
+        Return the stored column for a field without building any rows.
+
+        :param name: one of ``payment``, ``interest``, ``principal``, ``total_interest`` or ``balance``
+        """
+        assert name in COLUMNS, 'column must be one of {}'.format(', '.join(COLUMNS))
+        return getattr(self, name)
+
+    def columns(self):
+        """Return the stored columns in :class:`Installment` field order (without ``number``)."""
+        return [self.column(name) for name in COLUMNS]
+
+    def compact(self, kind='float'):
+        """
+        Return a copy of this schedule stored as ``float`` or ``cents`` columns.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> schedule = Loan(principal=200000, interest=.06, term=30).schedule()
+            >>> schedule.compact().nbytes < schedule.nbytes / 5
+            True
+            >>> schedule.compact('cents')[360].balance
+            Decimal('0.00')
+        """
+        columns = self.columns()
+        if self.kind == 'cents':
+            columns = [[self._value(value) for value in column] for column in columns]
+        return Schedule(*columns, kind=kind, start=self.start)
+
+    @property
+    def frozen(self) -> bool:
+        """Return whether the columns of this schedule are read-only."""
+        return self._frozen
+
+    def freeze(self) -> 'Schedule':
+        """
+        Return a read-only copy of this schedule, or the schedule itself if it is frozen.
+
+        The columns of the copy are tuples and none of its attributes can be set, so it can
+        be handed to many callers at once.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> schedule = Loan(principal=200000, interest=.06, term=30).schedule().freeze()
+            >>> schedule.balance[1] = 0
+            Traceback (most recent call last):
+            ...
+            TypeError: 'tuple' object does not support item assignment
+        """
+        if self._frozen:
+            return self
+        schedule = Schedule([], [], [], [], [], kind=self.kind, start=self.start)
+        for name in COLUMNS:
+            setattr(schedule, name, tuple(self.column(name)))
+        object.__setattr__(schedule, '_frozen', True)
+        return schedule
+
+    def scale(self, factor):
+        """
+        Return a copy of this schedule with every amount multiplied by ``factor``.
+
+        Every column of a level payment schedule is proportional to the principal, so the
+        schedule of one loan can be rescaled to another balance with the same rate and term.
+        ``cents`` schedules are rounded at every payment and cannot be rescaled.
+
+        Usage:
+            >>> from mortgage import Loan
+            >>> schedule = Loan(principal=1, interest=.06, term=30).schedule()
+            >>> round(schedule.scale(200000)[10].balance, 2)
+            Decimal('197963.59')
+        """
+        assert self.kind != 'cents', 'cents schedules are rounded and cannot be rescaled'
+        factor = float(factor) if self.kind == 'float' else Decimal(factor)
+        columns = [[value * factor for value in column] for column in self.columns()]
+        return Schedule(*columns, kind=self.kind, start=self.start)
+
+    @property
+    def nbytes(self) -> int:
+        """Return the approximate memory held by the stored columns in bytes."""
+        size = 0
+        for column in self.columns():
+            size += sys.getsizeof(column)
+            if self.kind == 'decimal' or self._frozen:
+                size += sum(sys.getsizeof(value) for value in column)
+        return size
@@ -0,0 +1,264 @@
+"""Monte Carlo simulation of adjustable-rate loans along random interest rate paths.
+
+Short rates follow a :class:`Vasicek` or :class:`CIR` model, and each loan resets to the
+short rate plus a margin on the schedule of an adjustable-rate mortgage, re-amortizing its
+balance over the rest of its term as :class:`~mortgage.adjustment.Adjustment` resets do.
+Paths are advanced one period at a time for a block of paths at once, so memory grows with
+the number of paths and never with ``paths * periods``.
+
+This module requires `numpy <https://numpy.org>`_, available with ``pip install mortgage[numpy]``.
+"""
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import math
+import os
+
+import numpy as np
+
+from mortgage.batch import level_payments, prepare
+
+# Balances below this are treated as repaid when finding the payoff time.
+PAID_OFF = 1e-6
+
+Distribution = namedtuple('Distribution', 'mean std quantiles')
+Simulation = namedtuple('Simulation', 'paths total_interest payoff balances')
+_Plan = namedtuple('_Plan', 'model principals period_rates n_payments n_periods margins '
+                            'extra fixed reset_every horizons')
+
+
+class Vasicek(object):
+    """
+    :class:`Vasicek <Vasicek>` short rate model, ``dr = speed * (mean - r) dt + volatility dW``.
+
+    Rates are advanced with the exact transition of the process, so the step size does not
+    bias them. Rates can become negative; loans charge no less than zero.
+
+    :param rate: The short rate at the start of every path.
+    :param mean: The long run rate paths revert to.
+    :param speed: How quickly paths revert to ``mean``, per year.
+    :param volatility: The annual volatility of the short rate.
+
+    Usage:
+        >>> from mortgage.simulate import Vasicek
+        >>> paths = Vasicek(rate=.05, mean=.05, speed=.5, volatility=0).paths(2, 12, 1 / 12)
+        >>> paths.shape, float(paths[0, -1])
+        ((2, 13), 0.05)
+    """
+
+    def __init__(self, rate, mean, speed, volatility):
+        assert speed > 0, 'Speed of mean reversion must be positive'
+        assert volatility >= 0, 'Volatility must not be negative'
+
+        self.rate = float(rate)
+        self.mean = float(mean)
+        self.speed = float(speed)
+        self.volatility = float(volatility)
+
+    def __repr__(self):
+        return '<{} rate={}, mean={}, speed={}, volatility={}>'.format(
+            type(self).__name__, self.rate, self.mean, self.speed, self.volatility)
+
+    def step(self, rates, dt, shocks):
+        """Return ``rates`` advanced by ``dt`` years, given standard normal ``shocks``."""
+        decay = math.exp(-self.speed * dt)
+        variance = -math.expm1(-2 * self.speed * dt) / (2 * self.speed)
+        deviation = self.volatility * math.sqrt(variance)
+        return rates * decay + self.mean * (1 - decay) + deviation * shocks
+
+    def paths(self, n_paths, n_steps, dt, seed=None):
+        """
+        Return ``n_paths`` rate paths of ``n_steps`` steps as one ``(paths, steps + 1)`` array.
+
+        This holds every path in memory and is meant for inspecting the model;
+        :func:`simulate` advances its paths one period at a time instead.
+        """
+        generator = np.random.default_rng(seed)
+        paths = np.empty((n_paths, n_steps + 1))
+        paths[:, 0] = self.rate
+        for step in range(n_steps):
+            paths[:, step + 1] = self.step(paths[:, step], dt, generator.standard_normal(n_paths))
+        return paths
+
+
+class CIR(Vasicek):
+    """
+    :class:`CIR <CIR>` Cox-Ingersoll-Ross short rate model,
+    ``dr = speed * (mean - r) dt + volatility * sqrt(r) dW``.
+
+    Rates are advanced with the full truncation Euler scheme, which keeps them from going
+    negative.
+
+    Usage:
+        >>> from mortgage.simulate import CIR
+        >>> model = CIR(rate=.05, mean=.05, speed=.5, volatility=.05)
+        >>> paths = model.paths(100, 360, 1 / 12, seed=1)
+        >>> bool((paths >= 0).all())
+        True
+    """
+
+    def __init__(self, rate, mean, speed, volatility):
+        assert rate >= 0 and mean >= 0, 'CIR rates must not be negative'
+        super().__init__(rate, mean, speed, volatility)
+
+    def step(self, rates, dt, shocks):
+        positive = np.maximum(rates, 0)
+        drift = self.speed * (self.mean - positive) * dt
+        return np.maximum(rates + drift + self.volatility * np.sqrt(positive * dt) * shocks, 0)
+
+
+class _Reduction(object):
+    # Running sums for the mean and standard deviation of per path values, and the values
+    # themselves (one number per path) for the quantiles.
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.squares = 0.0
+        self.blocks = []
+
+    def update(self, values):
+        self.count += values.size
+        self.total += float(values.sum())
+        self.squares += float(np.square(values).sum())
+        self.blocks.append(values)
+
+    def result(self, quantiles) -> Distribution:
+        mean = self.total / self.count
+        std = math.sqrt(max(self.squares / self.count - mean ** 2, 0))
+        values = np.concatenate(self.blocks)
+        points = np.quantile(values, quantiles) if quantiles else []
+        return Distribution(mean=mean, std=std,
+                            quantiles={q: float(value) for q, value in zip(quantiles, points)})
+
+
+def _simulate_block(task):
+    seed, size, plan = task
+    generator = np.random.default_rng(seed)
+    shape = (size, plan.principals.size)
+    dt = 1 / plan.n_periods
+
+    short = np.full(size, plan.model.rate)
+    balance = np.broadcast_to(plan.principals, shape).copy()
+    period_rates = np.broadcast_to(plan.period_rates, shape).copy()
+    payments = np.broadcast_to(level_payments(plan.principals, plan.period_rates, plan.n_payments),
+                               shape).copy()
+    total_interest = np.zeros(size)
+    payoff = np.zeros(size)
+    balances = np.zeros((size, len(plan.horizons)))
+    horizons = {number: index for index, number in enumerate(plan.horizons)}
+
+    for number in range(1, int(plan.n_payments.max()) + 1):
+        short = plan.model.step(short, dt, generator.standard_normal(size))
+        if number > plan.fixed and (number - plan.fixed - 1) % plan.reset_every == 0:
+            rates = np.clip(short[:, np.newaxis] + plan.margins, 0, 1)
+            period_rates = rates / plan.n_periods
+            remaining = np.maximum(plan.n_payments - number + 1, 1)
+            payments = level_payments(balance, period_rates, remaining)
+
+        interest = balance * period_rates
+        principal = np.minimum(payments - interest + plan.extra, balance)
+        principal = np.where(number >= plan.n_payments, balance, principal)
+
+        payoff[(balance > PAID_OFF).any(axis=1)] = number
+        total_interest += interest.sum(axis=1)
+        balance -= principal
+        if number in horizons:
+            balances[:, horizons[number]] = balance.sum(axis=1)
+
+    return total_interest, payoff / plan.n_periods, balances
+
+
+def _blocks(seed, n_paths, block_size, plan):
+    n_blocks = -(-n_paths // block_size)
+    for index, child in enumerate(np.random.SeedSequence(seed).spawn(n_blocks)):
+        yield child, min(block_size, n_paths - index * block_size), plan
+
+
+def _run(tasks, workers):
+    if workers == 1:
+        yield from map(_simulate_block, tasks)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque(executor.submit(_simulate_block, task)
+                        for task in islice(tasks, 2 * workers))
+        while pending:
+            future = pending.popleft()
+            for task in islice(tasks, 1):
+                pending.append(executor.submit(_simulate_block, task))
+            yield future.result()
+
+
+def simulate(principals, rates, terms, model, n_paths=1000, fixed=0, reset_every=12, margin=0,
+             extra=0, horizons=(), quantiles=(.05, .5, .95), compounded='monthly', seed=None,
+             block_size=1000, workers=1) -> Simulation:
+    """
+    Amortize a loan, or a portfolio of loans, along ``n_paths`` simulated short rate paths.
+
+    Each loan charges its initial rate for the first ``fixed`` payments and then resets to
+    the short rate plus ``margin`` (floored at zero) every ``reset_every`` payments, with the
+    payment recomputed to repay the balance over the rest of its term. A portfolio is
+    summed across its loans on every path.
+
+    Paths are simulated ``block_size`` at a time. Each block draws from its own random
+    stream spawned from ``seed``, so results depend on ``seed`` and ``block_size`` but not
+    on ``workers``. The per path totals are reduced as blocks finish, keeping one number
+    per path and statistic rather than any rate or balance history.
+
+    :param principals: The original sum of money borrowed for each loan.
+    :param rates: The initial annual interest rate of each loan.
+    :param terms: The lifespan of each loan in years.
+    :param model: The short rate model, a :class:`Vasicek` or :class:`CIR`.
+    :param n_paths: The number of rate paths to simulate.
+    :param fixed: The number of payments before the first reset.
+    :param reset_every: The number of payments between resets.
+    :param margin: Added to the short rate at each reset, for all loans or one per loan.
+    :param extra: Extra principal paid with every payment of each loan.
+    :param horizons: Payment numbers at which to report the balance left.
+    :param quantiles: Quantiles reported for every statistic.
+    :param compounded: Frequency that interest is compounded, shared by every loan.
+    :param seed: Seed for the random streams, for reproducible results.
+    :param block_size: The number of paths simulated together.
+    :param workers: Number of worker processes. ``1`` simulates in this process and
+        ``None`` uses one process per CPU.
+    :return: :class:`Simulation` with a :class:`Distribution` of the total interest, the
+        payoff time in years, and the balance at each horizon by payment number.
+
+    Usage:
+        >>> from mortgage.simulate import Vasicek, simulate
+        >>> model = Vasicek(rate=.06, mean=.06, speed=.2, volatility=0)
+        >>> result = simulate(200000, .06, 30, model, n_paths=10, horizons=[120], seed=1)
+        >>> round(result.total_interest.mean, 2), round(result.balances[120].mean, 2)
+        (231676.38, 167371.45)
+    """
+    assert isinstance(compounded, str), 'compounded must be shared by every loan'
+    assert n_paths > 0 and block_size > 0, 'n_paths and block_size must be positive numbers'
+    assert fixed >= 0 and reset_every > 0, 'Resets must follow a non-negative fixed period'
+    principals, _, n_payments, period_rates, n_periods = prepare(principals, rates, terms,
+                                                                 compounded)
+    margins = np.broadcast_to(np.asarray(margin, dtype=np.float64), principals.shape)
+    extra = np.broadcast_to(np.asarray(extra, dtype=np.float64), principals.shape)
+    horizons = tuple(sorted(set(horizons)))
+    assert all(0 < number <= n_payments.max() for number in horizons), \
+        'Horizons must be payment numbers within the term'
+
+    plan = _Plan(model=model, principals=principals, period_rates=period_rates,
+                 n_payments=n_payments, n_periods=int(n_periods[0]), margins=margins,
+                 extra=extra, fixed=fixed, reset_every=reset_every, horizons=horizons)
+    workers = workers or os.cpu_count() or 1
+    tasks = _blocks(seed, n_paths, block_size, plan)
+
+    total_interest, payoff = _Reduction(), _Reduction()
+    balances = [_Reduction() for _ in horizons]
+    for block_interest, block_payoff, block_balances in _run(tasks, workers):
+        total_interest.update(block_interest)
+        payoff.update(block_payoff)
+        for index, reduction in enumerate(balances):
+            reduction.update(block_balances[:, index])
+
+    quantiles = tuple(quantiles)
+    return Simulation(paths=n_paths,
+                      total_interest=total_interest.result(quantiles),
+                      payoff=payoff.result(quantiles),
+                      balances={number: reduction.result(quantiles)
+                                for number, reduction in zip(horizons, balances)})
@@ -0,0 +1,119 @@
+"""Solve the level payment annuity equation for the rate, the term or the principal.
+
+Each solver works on the closed-form payment formula used by :class:`~mortgage.Loan`,
+
+.. math:: A = P \\frac{r}{1 - (1 + r)^{-n}}
+
+where ``A`` is the periodic payment, ``P`` the principal, ``r`` the periodic rate and ``n``
+the number of payments, so no amortization schedule is ever built. Rates and terms are
+solved in floating point; principals are returned to the cent like other amounts.
+"""
+from decimal import ROUND_DOWN, Decimal
+import math
+
+from mortgage.loan import PERIODS, payment_count, round_to_cent
+
+RATE_TOLERANCE = 1e-12
+MAX_ITERATIONS = 100
+
+
+def _n_periods(compounded):
+    assert compounded in PERIODS, \
+        'Compounding can occur daily, weekly, biweekly, semimonthly, monthly, or annually'
+    return PERIODS[compounded]
+
+
+def _n_payments(term, n_periods):
+    n_payments = payment_count(term, 'years', n_periods)
+    assert n_payments > 0, 'Term must be at least one payment long'
+    return n_payments
+
+
+def _annuity(rate, n_payments):
+    # Payment per unit of principal, and its derivative with respect to the periodic rate.
+    if rate == 0:
+        return 1 / n_payments, (n_payments + 1) / (2 * n_payments)
+    paid_down = -math.expm1(-n_payments * math.log1p(rate))
+    discount = 1 - paid_down
+    factor = rate / paid_down
+    derivative = (paid_down - n_payments * rate * discount / (1 + rate)) / paid_down ** 2
+    return factor, derivative
+
+
+def rate_from_payment(payment, principal, term, compounded='monthly') -> float:
+    """
+    Return the annual interest rate at which ``principal`` is repaid by ``payment``.
+
+    Newton's method on the annuity equation with its analytic derivative, kept inside a
+    bracket that is narrowed at every step so it cannot diverge. It converges to
+    ``RATE_TOLERANCE`` in a handful of iterations.
+
+    :param payment: The periodic payment (principal and interest).
+    :param principal: The original sum of money borrowed.
+    :param term: The lifespan of the loan in years.
+    :param compounded: Frequency that interest is compounded (and payments are made).
+
+    Usage:
+        >>> from mortgage.solve import rate_from_payment
+        >>> round(rate_from_payment(1199.10, 200000, 30), 5)
+        0.06
+    """
+    n_periods = _n_periods(compounded)
+    n_payments = _n_payments(term, n_periods)
+    target = float(payment) / float(principal)
+    assert target * n_payments >= 1, 'Payment is too small to ever repay the principal'
+
+    # The payment is convex in the rate, so the tangent at zero overestimates the root and
+    # Newton's method steps down to it from the right without overshooting.
+    low, high = 0.0, target
+    rate = min(high, max(0.0, (target - 1 / n_payments) * 2 * n_payments / (n_payments + 1)))
+    for _ in range(MAX_ITERATIONS):
+        factor, derivative = _annuity(rate, n_payments)
+        error = factor - target
+        if abs(error) <= RATE_TOLERANCE * target:
+            break
+        if error > 0:
+            high = rate
+        else:
+            low = rate
+        rate -= error / derivative
+        if not low < rate < high:
+            rate = (low + high) / 2
+    return rate * n_periods
+
+
+def term_from_payment(payment, principal, interest, compounded='monthly') -> float:
+    """
+    Return the term in years over which ``payment`` repays ``principal`` at ``interest``.
+
+    The annuity equation has an exact solution for the number of payments; it is usually
+    fractional, meaning the final payment is smaller than the others.
+
+    Usage:
+        >>> from mortgage.solve import term_from_payment
+        >>> round(term_from_payment(1687.71, 200000, .06), 2)
+        15.0
+    """
+    n_periods = _n_periods(compounded)
+    rate = float(interest) / n_periods
+    payment, principal = float(payment), float(principal)
+    if rate == 0:
+        return principal / payment / n_periods
+    assert payment > principal * rate, 'Payment does not cover the interest on the principal'
+    return -math.log1p(-principal * rate / payment) / math.log1p(rate) / n_periods
+
+
+def principal_from_payment(payment, interest, term, compounded='monthly') -> Decimal:
+    """
+    Return the largest principal that ``payment`` repays at ``interest`` over ``term`` years.
+
+    The principal is rounded down to the cent, so the payment always covers it.
+
+    Usage:
+        >>> from mortgage.solve import principal_from_payment
+        >>> principal_from_payment(1199.10, .06, 30)
+        Decimal('199999.82')
+    """
+    n_periods = _n_periods(compounded)
+    factor, _ = _annuity(float(interest) / n_periods, _n_payments(term, n_periods))
+    return round_to_cent(float(payment) / factor, ROUND_DOWN)
@@ -0,0 +1,187 @@
+"""An on-disk store of amortization schedules, memory-mapped for random access by loan id.
+
+A store is a directory holding two ``.npy`` files:
+
+* ``rows.npy``: every payment row of every loan, with the fixed-width
+  :func:`~mortgage.export.record_dtype`, written by :func:`~mortgage.export.to_npy`
+* ``index.npy``: one entry per loan with its id, its first row and its number of rows,
+  sorted by id
+
+Both files are memory-mapped when a store is opened, so opening one costs nothing however
+many loans it holds, and only the pages of the rows read are loaded. Schedules are returned
+as numpy views of the mapped rows without copying.
+
+This module requires `numpy <https://numpy.org>`_, available with ``pip install mortgage[numpy]``.
+"""
+from array import array
+from numbers import Integral
+import os
+
+import numpy as np
+
+from mortgage.export import iter_schedules, write_npy
+
+INDEX_DTYPE = np.dtype([('loan', '<i8'), ('start', '<i8'), ('length', '<i8')])
+
+
+class ScheduleStore(object):
+    """
+    :class:`ScheduleStore <ScheduleStore>` object reading the schedules saved in a directory.
+
+    Finding a loan is a direct offset when its ids are consecutive integers (as the default
+    ids are) and a binary search of the index otherwise. Reading a payment of a loan once
+    it is found is a single offset into the rows.
+
+    :param path: The directory the store was created in by :meth:`create`.
+
+    Usage:
+        >>> import tempfile
+        >>> from mortgage import Loan
+        >>> from mortgage.store import ScheduleStore
+        >>> path = tempfile.mkdtemp()
+        >>> loans = [Loan(200000, .06, 30), Loan(150000, .045, 15)]
+        >>> store = ScheduleStore.create(path, loans, ids=[1001, 1002])
+        >>> round(store.balance_at(1001, 120), 2)
+        167371.45
+        >>> store.schedule(1002)['balance'].shape
+        (181,)
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = np.load(os.path.join(path, 'rows.npy'), mmap_mode='r')
+        self.index = np.load(os.path.join(path, 'index.npy'), mmap_mode='r')
+        ids = self.index['loan']
+        self._first = int(ids[0]) if len(ids) else 0
+        self._dense = len(ids) > 0 and int(ids[-1]) - self._first == len(ids) - 1
+
+    def __repr__(self):
+        return '<ScheduleStore loans={}, rows={}>'.format(len(self), len(self.rows))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, loan_id):
+        return self._position(loan_id) is not None
+
+    @classmethod
+    def create(cls, path, loans, ids=None, chunk_size=65536) -> 'ScheduleStore':
+        """
+        Save the schedules of ``loans`` in the directory ``path`` and open the new store.
+
+        Schedules are streamed to disk in chunks as by :func:`~mortgage.export.to_npy`,
+        so ``loans`` may be an iterator over more loans than fit in memory. Only the index
+        (24 bytes per loan) is kept in memory until it is written.
+
+        :param path: The directory to create the store in. It is created if needed and
+            existing store files in it are replaced once every schedule is written; if
+            writing fails they are left as they were.
+        :param loans: A :class:`~mortgage.Loan` or schedule, or an iterable of them.
+        :param ids: The unique integer id of each loan, by default its position counting
+            from one. They are read and checked before anything is written, and there must
+            be as many as there are loans: :class:`ValueError` is raised otherwise, and the
+            store is left as it was.
+        :param chunk_size: The number of rows gathered and written at a time.
+        """
+        assert chunk_size > 0, 'chunk_size must be a positive number'
+        if ids is not None:
+            ids = list(ids)
+            assert all(isinstance(loan_id, Integral) for loan_id in ids), 'Loan ids must be integers'
+            ids = np.array(ids, dtype=np.int64)
+            assert np.unique(ids).size == ids.size, 'Loan ids must be unique'
+        os.makedirs(path, exist_ok=True)
+        loan_ids, lengths = array('q'), array('q')
+
+        def indexed():
+            for loan_id, schedule in iter_schedules(loans, ids):
+                loan_ids.append(loan_id)
+                lengths.append(len(schedule))
+                yield loan_id, schedule
+
+        # Both files are written under temporary names and only replace the store's files
+        # once complete, so a failed create never leaves rows and an index that disagree.
+        files = [os.path.join(path, name) for name in ('rows.npy', 'index.npy')]
+        partial = [name + '.partial' for name in files]
+        try:
+            with open(partial[0], 'wb') as handle:
+                write_npy(handle, indexed(), chunk_size)
+
+            index = np.zeros(len(loan_ids), dtype=INDEX_DTYPE)
+            index['loan'] = loan_ids
+            index['length'] = lengths
+            index['start'] = np.cumsum(index['length']) - index['length']
+            index = index[np.argsort(index['loan'], kind='stable')]
+            with open(partial[1], 'wb') as handle:
+                np.save(handle, index)
+        except BaseException:
+            for name in partial:
+                if os.path.exists(name):
+                    os.remove(name)
+            raise
+        for name, final in zip(partial, files):
+            os.replace(name, final)
+        return cls(path)
+
+    @property
+    def ids(self):
+        """Return the ids of the loans in the store, in increasing order."""
+        return self.index['loan']
+
+    def _position(self, loan_id):
+        # Ids equal to an integer, such as 1.0, find the loan stored under that integer.
+        try:
+            number = int(loan_id)
+        except (TypeError, ValueError, OverflowError):
+            return None
+        if number != loan_id:
+            return None
+        loan_id = number
+        if self._dense:
+            position = loan_id - self._first
+            return position if 0 <= position < len(self.index) else None
+        position = int(np.searchsorted(self.index['loan'], loan_id))
+        if position < len(self.index) and self.index['loan'][position] == loan_id:
+            return position
+        return None
+
+    def _locate(self, loan_id):
+        position = self._position(loan_id)
+        if position is None:
+            raise KeyError(loan_id)
+        entry = self.index[position]
+        return int(entry['start']), int(entry['length'])
+
+    def schedule(self, loan_id):
+        """Return the rows of a loan's schedule as a read-only view of the mapped file."""
+        start, length = self._locate(loan_id)
+        return self.rows[start:start + length]
+
+    def row(self, loan_id, nth_payment):
+        """Return the row of a loan's nth payment, raising :class:`IndexError` if it has none."""
+        start, length = self._locate(loan_id)
+        if not 0 <= nth_payment < length:
+            raise IndexError('payment {} is not in the schedule of loan {}'.format(
+                nth_payment, loan_id))
+        return self.rows[start + nth_payment]
+
+    def balance_at(self, loan_id, nth_payment) -> float:
+        """
+        Return the balance of a loan after the nth payment.
+
+        Loans paid off early have no rows after their final payment, and their balance
+        stays at zero.
+        """
+        start, length = self._locate(loan_id)
+        assert nth_payment >= 0, 'Payment number must not be negative'
+        return float(self.rows['balance'][start + min(nth_payment, length - 1)])
+
+    def column(self, name, loan_id=None):
+        """
+        Return a column of every row, or of one loan's rows, as a read-only view.
+
+        :param name: ``loan``, ``number`` or one of the amounts of an
+            :class:`~mortgage.schedule.Installment`
+        :param loan_id: Only return the rows of this loan.
+        """
+        rows = self.rows if loan_id is None else self.schedule(loan_id)
+        return rows[name]
@@ -0,0 +1,84 @@
+"""Compare loans across grids of principals, rates, terms and compounding frequencies.
+
+Every cell of the grid is one loan, summarized with the closed-form annuity formulas used
+by :func:`mortgage.batch.amortize` in one vectorized pass, so no schedule is built and a
+grid of a million cells takes a fraction of a second.
+
+This module requires `numpy <https://numpy.org>`_, available with ``pip install mortgage[numpy]``.
+"""
+from collections import namedtuple
+
+import numpy as np
+
+from mortgage import batch
+
+Sweep = namedtuple('Sweep', 'principal interest term compounded monthly_payment total_interest '
+                            'interest_to_principle apr apy shape')
+
+
+def _axis(values, dtype):
+    return np.atleast_1d(np.asarray(values, dtype=dtype)).ravel()
+
+
+def sweep(principals, rates, terms, compounded='monthly') -> Sweep:
+    """
+    Summarize a loan for every combination of principal, rate, term and compounding.
+
+    The result is a table with one row per cell, ordered by principal, then rate, then
+    term, then compounding, as :func:`itertools.product` would order them. Each column is
+    a flat array; ``column.reshape(result.shape)`` arranges it as a grid with one axis per
+    argument. Amounts are rounded like the matching :class:`~mortgage.Loan` properties.
+
+    :param principals: The principals to compare, a number or a sequence of them.
+    :param rates: The annual interest rates to compare.
+    :param terms: The terms in years to compare.
+    :param compounded: The compounding frequencies to compare, one name or a sequence.
+    :return: :class:`Sweep` of the inputs and ``monthly_payment``, ``total_interest``,
+        ``interest_to_principle``, ``apr`` and ``apy`` for every cell, and the grid shape
+
+    Usage:
+        >>> from mortgage.sweep import sweep
+        >>> table = sweep(200000, [.04, .06], [15, 30])
+        >>> table.monthly_payment.tolist()
+        [1479.38, 954.83, 1687.71, 1199.1]
+        >>> table.interest_to_principle.reshape(table.shape)[0, :, :, 0].tolist()
+        [[33.1, 71.9], [51.9, 115.8]]
+    """
+    principals = _axis(principals, np.float64)
+    rates = _axis(rates, np.float64)
+    terms = _axis(terms, np.float64)
+    compounded = (compounded,) if isinstance(compounded, str) else tuple(compounded)
+    assert np.all(principals > 0), 'Principal must be positive value'
+    assert compounded, 'At least one compounding frequency is required'
+    shape = (principals.size, rates.size, terms.size, len(compounded))
+
+    # The payment is proportional to the principal, so the annuity factor is evaluated once
+    # per rate, term and compounding and scaled to every principal, as batch.rescale does.
+    grid_rates, grid_terms = (axis.ravel() for axis in np.meshgrid(rates, terms, indexing='ij'))
+    principal = principals[:, np.newaxis, np.newaxis, np.newaxis]
+    payments, n_payments, apy = np.empty(shape), np.empty(shape[1:]), np.empty(shape[1:])
+    for index, frequency in enumerate(compounded):
+        prepared = batch.prepare(1, grid_rates, grid_terms, frequency)
+        _, _, frequency_payments, period_rates, n_periods = prepared
+        factor = batch.level_payments(1.0, period_rates, frequency_payments)
+        payments[..., index] = principal[..., 0] * factor.reshape(shape[1:3])
+        n_payments[..., index] = frequency_payments.reshape(shape[1:3])
+        apy[..., index] = np.expm1(n_periods * np.log1p(period_rates)).reshape(shape[1:3])
+
+    total_interest = np.round(payments * n_payments - principal, 2)
+    simple_interest = np.round(principal * rates[:, np.newaxis, np.newaxis], 2)
+
+    def column(values, axis):
+        view = np.reshape(values, [-1 if dimension == axis else 1 for dimension in range(4)])
+        return np.broadcast_to(view, shape).ravel()
+
+    return Sweep(principal=column(principals, 0),
+                 interest=column(rates, 1),
+                 term=column(terms, 2),
+                 compounded=column(np.array(compounded), 3),
+                 monthly_payment=np.round(payments, 2).ravel(),
+                 total_interest=total_interest.ravel(),
+                 interest_to_principle=np.round(total_interest / principal * 100, 1).ravel(),
+                 apr=np.broadcast_to(np.round(simple_interest / principal * 100, 2), shape).ravel(),
+                 apy=np.broadcast_to(np.round(apy * 100, 2), shape).ravel(),
+                 shape=shape)
@@ -1,11 +1,11 @@
 import nox
 
 
-@nox.session(python=['3.5', '3.6', '3.7'])
+@nox.session(python=['3.7', '3.8', '3.9', '3.10', '3.11'])
 def tests(session):
     """Run the unit test suite."""
     session.install('pytest', 'pytest-cov')
-    session.install('-e', '.')
+    session.install('-e', '.[numpy]')
 
     # Run py.test against the unit tests.
     session.run(
@@ -13,9 +13,10 @@ setup(
     author_email='austin.s.mcconnell@gmail.com',
     url='https://github.com/austinmcconnell/mortgage',
     packages=find_packages(exclude=['docs', 'tests']),
-    python_requires='>=3.5',
+    python_requires='>=3.7',
     install_requires=[],
     extras_require={
+        'numpy': ['numpy>=1.17'],
         'develop': ['bump2version>=1.0.1,<2.0.0',
                     'pre-commit>=2.15.0,<3.0.0',
                     'pytest>=6.2.5,<7.0.0',
@@ -34,9 +35,11 @@ setup(
         'License :: OSI Approved :: MIT License',
         'Natural Language :: English',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
         'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
     ],
     test_suite='tests'
 )
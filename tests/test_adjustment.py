@@ -0,0 +1,144 @@
+from decimal import Decimal
+import pytest
+
+from mortgage import Loan
+from mortgage.adjustment import Adjustment
+from mortgage.prepayment import Prepayment
+
+
+def convert(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+paths = [
+    Adjustment(resets={61: .07}),
+    Adjustment.arm([.07, .08, .065, .05], fixed=60),
+    Adjustment(recasts={120: 50000}),
+    Adjustment(resets={37: .05, 85: 0}, recasts={48: 10000, 85: 5000}),
+]
+
+
+class TestAdjustment(object):
+
+    def test_arm(self):
+        adjustment = Adjustment.arm([.07, .08], fixed=60, every=12)
+        assert sorted(adjustment.resets) == [61, 73]
+        assert adjustment.reset_at(73) == Decimal('0.08')
+        assert adjustment.reset_at(74) is None
+
+    def test_last_event(self):
+        adjustment = Adjustment(resets={61: .07}, recasts={24: 1000})
+        assert adjustment.last_event(23) is None
+        assert adjustment.last_event(60) == 24
+        assert adjustment.last_event(61) == 61
+        assert adjustment.last_reset(60) is None
+
+    def test_first_difference(self):
+        adjustment = Adjustment(resets={61: .07, 73: .08})
+        assert adjustment.first_difference(Adjustment(resets={61: .07, 73: .08})) is None
+        assert adjustment.first_difference(Adjustment(resets={61: .07, 73: .09})) == 73
+        assert adjustment.first_difference(Adjustment(resets={61: .07}, recasts={12: 1})) == 12
+        assert adjustment.first_difference(None) == 61
+
+    @pytest.mark.parametrize('resets, recasts', [
+        ({0: .07}, None),
+        ({61: 1.5}, None),
+        (None, {12: -1}),
+    ])
+    def test_invalid(self, resets, recasts):
+        with pytest.raises(AssertionError):
+            Adjustment(resets=resets, recasts=recasts)
+
+
+class TestAdjustedLoan(object):
+
+    def test_reset_reamortizes_remaining_balance(self):
+        base = Loan(principal=200000, interest=.06, term=30)
+        loan = Loan(principal=200000, interest=.06, term=30, adjustment=Adjustment(resets={61: .07}))
+        schedule = loan.schedule()
+        assert schedule[60] == base.schedule()[60]
+        tail = Loan(principal=base.balance_at(60), interest=.07, term=25)
+        assert convert(schedule[61].payment) == tail.monthly_payment
+        assert convert(schedule[61].interest) == convert(base.balance_at(60) * Decimal('0.07') / 12)
+        assert convert(schedule[-1].balance) == 0
+        assert loan.years_to_pay == 30.0
+
+    def test_recast_lowers_payment(self):
+        base = Loan(principal=200000, interest=.06, term=30)
+        loan = Loan(principal=200000, interest=.06, term=30, adjustment=Adjustment(recasts={120: 50000}))
+        schedule = loan.schedule()
+        assert convert(schedule[120].payment) == convert(base.monthly_payment + 50000)
+        assert loan.balance_at(120) == convert(167371.45 - 50000)
+        tail = Loan(principal=loan.balance_at(120), interest=.06, term=20)
+        assert convert(schedule[121].payment) == tail.monthly_payment
+        assert convert(schedule[-1].balance) == 0
+        assert len(schedule) == 361
+
+    def test_recast_paying_off_stops(self):
+        loan = Loan(principal=200000, interest=.06, term=30, adjustment=Adjustment(recasts={12: 300000}))
+        assert len(loan.schedule()) == 13
+        assert loan.schedule()[-1].balance == 0
+        assert loan.years_to_pay == 1.0
+
+    @pytest.mark.parametrize('backend', ['float', 'bank'])
+    def test_backends_match_decimal(self, backend):
+        adjustment = paths[3]
+        exact = Loan(principal=200000, interest=.06, term=30, adjustment=adjustment)
+        loan = Loan(principal=200000, interest=.06, term=30, backend=backend, adjustment=adjustment)
+        assert len(loan.schedule()) == len(exact.schedule())
+        for number in (1, 37, 48, 85, 200):
+            difference = Decimal(loan.schedule(number).payment) - exact.schedule(number).payment
+            assert abs(difference) <= Decimal('0.01')
+        assert abs(loan.total_interest - exact.total_interest) <= Decimal('1.00')
+
+    def test_bank_ends_at_zero(self):
+        loan = Loan(principal=200000, interest=.06, term=30, backend='bank', adjustment=paths[1])
+        assert loan.schedule()[-1].balance == 0
+
+    def test_with_prepayment(self):
+        loan = Loan(principal=200000, interest=.06, term=30, adjustment=paths[0],
+                    prepayment=Prepayment(extra=200))
+        assert loan.schedule()[-1].balance == 0
+        assert loan.years_to_pay < 30
+
+
+class TestWithAdjustment(object):
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    @pytest.mark.parametrize('adjustment', paths)
+    def test_matches_fresh_loan(self, backend, adjustment):
+        loan = Loan(principal=200000, interest=.06, term=30, backend=backend)
+        loan.schedule()
+        derived = loan.with_adjustment(adjustment)
+        fresh = Loan(principal=200000, interest=.06, term=30, backend=backend, adjustment=adjustment)
+        assert list(derived.schedule()) == list(fresh.schedule())
+        assert derived.total_interest == fresh.total_interest
+
+    @pytest.mark.parametrize('backend', ['decimal', 'bank'])
+    def test_path_from_path(self, backend):
+        first = Loan(principal=200000, interest=.06, term=30, backend=backend, adjustment=paths[1])
+        first.schedule()
+        adjustment = Adjustment.arm([.07, .08, .09, .10], fixed=60)
+        derived = first.with_adjustment(adjustment)
+        fresh = Loan(principal=200000, interest=.06, term=30, backend=backend, adjustment=adjustment)
+        assert list(derived.schedule()) == list(fresh.schedule())
+        assert derived.schedule()[:85] == first.schedule()[:85]
+
+    def test_prepayment_keeps_adjustment(self):
+        loan = Loan(principal=200000, interest=.06, term=30, adjustment=paths[1])
+        loan.schedule()
+        derived = loan.with_prepayment(Prepayment(lump_sums={100: 10000}))
+        fresh = Loan(principal=200000, interest=.06, term=30, adjustment=paths[1],
+                     prepayment=Prepayment(lump_sums={100: 10000}))
+        assert list(derived.schedule()) == list(fresh.schedule())
+
+    def test_unchanged_shares_schedule(self):
+        loan = Loan(principal=200000, interest=.06, term=30, adjustment=paths[0])
+        loan.schedule()
+        assert loan.with_adjustment(Adjustment(resets={61: .07})).schedule() is loan.schedule()
+
+    def test_removing_adjustment(self):
+        loan = Loan(principal=200000, interest=.06, term=30, adjustment=paths[0])
+        loan.schedule()
+        derived = loan.with_adjustment(None)
+        assert list(derived.schedule()) == list(Loan(principal=200000, interest=.06, term=30).schedule())
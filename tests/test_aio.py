@@ -0,0 +1,173 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from itertools import cycle, islice
+import threading
+import pytest
+
+from mortgage import Loan, aio
+
+specs = [(100000 + 5000 * index, .03 + .00125 * index, 15 if index % 2 else 30) for index in range(25)]
+vectorize = [False] + ([True] if aio.batch is not None else [])
+
+
+async def load(service, requests, concurrency):
+    """Send ``requests`` to ``service`` from ``concurrency`` clients, as fast as they answer."""
+    requests = iter(enumerate(requests))
+    results = {}
+
+    async def client():
+        for index, spec in requests:
+            results[index] = await service.quote(*spec)
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return [results[index] for index in range(len(results))]
+
+
+def serve(coroutine_function, **options):
+    async def main():
+        async with aio.QuoteService(**options) as service:
+            return await coroutine_function(service), service.stats()
+    return asyncio.run(main())
+
+
+class TestQuoteService(object):
+
+    @pytest.mark.parametrize('vectorized', vectorize)
+    def test_matches_loan(self, vectorized):
+        forms = specs + [(200000, .06, 30, 'years', 'daily'), (150000, .045, 15, 'years', 'annually'),
+                         (200000, .06, 360, 'months', 'biweekly'), (90000, .05, 730, 'days')]
+        quotes, _ = serve(lambda service: load(service, forms, 8), vectorize=vectorized)
+        assert quotes == [Loan(*spec).summary() for spec in forms]
+
+    def test_coalesces_identical_requests(self):
+        quotes, stats = serve(lambda service: load(service, [specs[0]] * 100, 100))
+        assert len(set(quotes)) == 1
+        assert stats.requests == 100
+        assert stats.computed == 1
+        assert stats.coalesced == 99
+
+    def test_batches_queued_requests(self):
+        quotes, stats = serve(lambda service: load(service, specs, len(specs)), max_batch=10)
+        assert len(quotes) == len(specs)
+        assert stats.computed == len(specs)
+        assert stats.batches == 3
+
+    def test_load(self):
+        requests = list(islice(cycle(specs), 2000))
+        quotes, stats = serve(lambda service: load(service, requests, 64), max_pending=16)
+        assert quotes == [Loan(*spec).summary() for spec in requests]
+        assert stats.requests == 2000
+        assert stats.computed + stats.coalesced == 2000
+        assert stats.pending == 0
+        assert 0 < stats.latency_p50 <= stats.latency_p99
+        assert stats.throughput > 0
+
+    def test_batches_requests_made_while_executor_is_busy(self):
+        release = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        async def staggered(service):
+            quotes = [asyncio.ensure_future(service.quote(*specs[0]))]
+            for spec in specs[1:10]:
+                await asyncio.sleep(0.005)
+                quotes.append(asyncio.ensure_future(service.quote(*spec)))
+            await asyncio.sleep(0.005)
+            release.set()
+            return await asyncio.gather(*quotes)
+
+        executor.submit(release.wait)
+        try:
+            quotes, stats = serve(staggered, max_delay=0, executor=executor)
+        finally:
+            release.set()
+            executor.shutdown()
+        assert quotes == [Loan(*spec).summary() for spec in specs[:10]]
+        assert stats.batches == 2
+
+    def test_close_computes_queued_requests(self):
+        async def closing():
+            service = aio.QuoteService(max_batch=2, max_delay=0)
+            quotes = [asyncio.ensure_future(service.quote(*spec)) for spec in specs[:5]]
+            await asyncio.sleep(0)
+            await service.close()
+            return await asyncio.wait_for(asyncio.gather(*quotes), 5)
+
+        assert asyncio.run(closing()) == [Loan(*spec).summary() for spec in specs[:5]]
+
+    def test_quote_after_close(self):
+        async def closed():
+            service = aio.QuoteService(max_delay=0)
+            first = await service.quote(*specs[0])
+            await service.close()
+            await service.close()
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(service.quote(*specs[0]), 5)
+            with pytest.raises(RuntimeError):
+                await asyncio.wait_for(service.quote(*specs[1]), 5)
+            return first
+
+        assert asyncio.run(closed()) == Loan(*specs[0]).summary()
+
+    def test_back_pressure(self):
+        release = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        async def blocked(service):
+            first = asyncio.ensure_future(service.quote(*specs[0]))
+            await asyncio.sleep(0.01)
+            with pytest.raises(asyncio.TimeoutError):
+                await service.quote(*specs[1])
+            release.set()
+            return await first
+
+        executor.submit(release.wait)
+        try:
+            quote, stats = serve(blocked, max_pending=1, max_wait=0.05, executor=executor)
+        finally:
+            release.set()
+            executor.shutdown()
+        assert quote == Loan(*specs[0]).summary()
+        assert stats.rejected == 1
+        assert stats.computed == 1
+
+    def test_errors_reach_every_caller(self, monkeypatch):
+        def fail(keys, vectorize):
+            raise ValueError('unavailable')
+
+        monkeypatch.setattr(aio, 'quote_batch', fail)
+
+        async def failing(service):
+            return await asyncio.gather(*(service.quote(*specs[0]) for _ in range(3)),
+                                        return_exceptions=True)
+
+        errors, stats = serve(failing)
+        assert all(isinstance(error, ValueError) for error in errors)
+        assert stats.pending == 0
+
+    @pytest.mark.parametrize('args', [
+        (0, .06, 30),
+        (200000, 1.5, 30),
+        (200000, .06, 0),
+        (200000, .06, 30, 'decades'),
+        (200000, .06, 30, 'years', 'hourly'),
+    ])
+    def test_invalid(self, args):
+        with pytest.raises(AssertionError):
+            serve(lambda service: service.quote(*args))
+
+    def test_module_quote(self):
+        for _ in range(2):
+            assert asyncio.run(aio.quote(*specs[3])) == Loan(*specs[3]).summary()
+
+    def test_quote_batch(self):
+        keys = [spec + ('years', 'monthly') for spec in specs[:3]]
+        assert aio.quote_batch(keys) == [Loan(*key).summary() for key in keys]
+        assert aio.quote_batch([]) == []
+
+    @pytest.mark.parametrize('vectorized', vectorize)
+    def test_fractional_terms(self, vectorized):
+        keys = [(200000, .06, 15.5, 'years', 'monthly'), (150000, .045, 10.25, 'years', 'daily')]
+        quotes = aio.quote_batch(keys, vectorize=vectorized)
+        assert quotes == [Loan(*key).summary() for key in keys]
+        assert quotes[0].monthly_payment == Loan(200000, .06, 15.5).monthly_payment
+        assert quotes[0].years_to_pay == 15.5
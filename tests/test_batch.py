@@ -0,0 +1,117 @@
+from decimal import Decimal
+import pytest
+
+from mortgage import Loan
+
+np = pytest.importorskip('numpy')
+batch = pytest.importorskip('mortgage.batch')
+
+
+def convert(value):
+    return Decimal(repr(float(value))).quantize(Decimal('0.01'))
+
+
+loans = [
+    (200000, .06, 30, 'monthly'),
+    (200000, .06, 15, 'monthly'),
+    (350000, .04125, 30, 'monthly'),
+    (125000, .0375, 10, 'annually'),
+    (90000, .07, 5, 'daily'),
+]
+
+
+@pytest.fixture(scope='module')
+def portfolio():
+    principals, rates, terms, compounded = zip(*loans)
+    return principals, rates, terms, compounded
+
+
+class TestBatch(object):
+
+    def test_summaries_match_loan(self, portfolio):
+        summaries = batch.amortize(*portfolio, reduced=True)
+        for index, (principal, interest, term, compounded) in enumerate(loans):
+            loan = Loan(principal=principal, interest=interest, term=term, compounded=compounded)
+            assert convert(summaries.monthly_payment[index]) == loan.monthly_payment
+            assert convert(summaries.total_interest[index]) == loan.total_interest
+            assert convert(summaries.apr[index]) == loan.apr
+            assert convert(summaries.apy[index]) == loan.apy
+
+    @pytest.mark.parametrize('compounded', ['monthly', 'daily'])
+    def test_rates_round_half_cents_like_loan(self, compounded):
+        principals = [100000, 100000, 100000, 123456, 200000]
+        rates = [.02355, .00285, .00035, .04875, .06]
+        summaries = batch.amortize(principals, rates, 30, compounded, reduced=True)
+        assert summaries.apr.tolist()[:4] == [2.36, 0.28, 0.04, 4.88]
+        for index, (principal, interest) in enumerate(zip(principals, rates)):
+            loan = Loan(principal=principal, interest=interest, term=30, compounded=compounded)
+            assert convert(summaries.apr[index]) == loan.apr
+            assert convert(summaries.apy[index]) == loan.apy
+
+    @pytest.mark.parametrize('field', ['interest', 'principal', 'balance'])
+    def test_schedules_match_loan(self, portfolio, field):
+        schedules = batch.amortize(*portfolio)
+        for index, (principal, interest, term, compounded) in enumerate(loans):
+            loan = Loan(principal=principal, interest=interest, term=term, compounded=compounded)
+            for installment in loan.schedule()[::30]:
+                expected = Loan._quantize(getattr(installment, field))
+                assert convert(getattr(schedules, field)[index, installment.number]) == expected
+
+    def test_ragged_terms_are_masked(self, portfolio):
+        schedules = batch.amortize(*portfolio)
+        assert schedules.balance.shape == (len(loans), 5 * 365 + 1)
+        assert schedules.mask.sum(axis=1).tolist() == [361, 181, 361, 11, 1826]
+        assert not schedules.interest[~schedules.mask].any()
+        assert not schedules.balance[~schedules.mask].any()
+
+    def test_scalar_arguments_broadcast(self):
+        summaries = batch.amortize([200000, 100000], .06, 30, reduced=True)
+        assert summaries.monthly_payment.tolist() == [1199.10, 599.55]
+
+    def test_zero_interest(self):
+        schedules = batch.amortize(1200, 0, 1)
+        assert schedules.principal[0, 1:].tolist() == [100.0] * 12
+        assert schedules.balance[0, -1] == 0
+
+    @pytest.mark.parametrize('term', [15.5, 10.25, 0.5])
+    def test_fractional_terms_match_loan(self, term):
+        loan = Loan(principal=200000, interest=.06, term=term)
+        summaries = batch.amortize(200000, .06, term, reduced=True)
+        assert convert(summaries.monthly_payment[0]) == loan.monthly_payment
+        assert convert(summaries.total_interest[0]) == loan.total_interest
+        schedules = batch.amortize(200000, .06, term)
+        assert schedules.mask.sum() == len(loan.schedule())
+
+    def test_terms_shorter_than_a_payment(self):
+        with pytest.raises(AssertionError):
+            batch.amortize(200000, .06, 0.01)
+
+    def test_prepare(self):
+        loans = batch.prepare([200000, 150000], [.06, .045], 15, ['monthly', 'annually'])
+        assert loans.n_payments.tolist() == [180, 15]
+        assert loans.period_rates.tolist() == [.005, .045]
+        payments = batch.level_payments(loans.principals, loans.period_rates, loans.n_payments)
+        summaries = batch.amortize([200000, 150000], [.06, .045], 15, ['monthly', 'annually'],
+                                   reduced=True)
+        assert payments.round(2).tolist() == summaries.monthly_payment.tolist()
+
+    def test_invalid_compounding(self):
+        with pytest.raises(AssertionError):
+            batch.amortize(200000, .06, 30, compounded='hourly')
+
+    def test_rescale_matches_amortize(self):
+        principals = [100000, 200000, 350000]
+        rescaled = batch.rescale(principals, .06, 30)
+        expected = batch.amortize(principals, .06, 30)
+        for field in ('interest', 'principal', 'balance'):
+            assert np.allclose(getattr(rescaled, field), getattr(expected, field), atol=1e-6)
+        assert (rescaled.mask == expected.mask).all()
+
+    def test_solvers_match_scalar(self, portfolio):
+        principals, rates, terms, compounded = portfolio
+        payments = [Loan(principal=principal, interest=rate, term=term, compounded=compounding)._monthly_payment
+                    for principal, rate, term, compounding in loans]
+        payments = np.array([float(payment) for payment in payments])
+        assert np.allclose(batch.rate_from_payment(payments, principals, terms, compounded), rates, atol=1e-9)
+        assert np.allclose(batch.term_from_payment(payments, principals, rates, compounded), terms)
+        assert batch.principal_from_payment(payments, rates, terms, compounded).tolist() == list(principals)
@@ -0,0 +1,167 @@
+from decimal import Decimal
+import pickle
+import threading
+import pytest
+
+from mortgage import Loan, cache
+from mortgage.adjustment import Adjustment
+from mortgage.cache import LRUCache
+from mortgage.prepayment import Prepayment
+
+
+def convert(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+@pytest.fixture(autouse=True)
+def empty_caches():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+class TestLRUCache(object):
+
+    def test_hits_and_misses(self):
+        lru = LRUCache(maxsize=2)
+        assert lru.get('a', lambda: 1) == 1
+        assert lru.get('a', lambda: 2) == 1
+        info = lru.info()
+        assert (info.hits, info.misses, info.currsize) == (1, 1, 1)
+
+    def test_evicts_least_recently_used(self):
+        lru = LRUCache(maxsize=2)
+        lru.get('a', lambda: 1)
+        lru.get('b', lambda: 2)
+        lru.get('a', lambda: 1)
+        lru.get('c', lambda: 3)
+        assert 'a' in lru and 'c' in lru and 'b' not in lru
+        assert lru.info().evictions == 1
+
+    def test_byte_limit(self):
+        lru = LRUCache(maxsize=None, maxbytes=10, sizeof=len)
+        lru.get('a', lambda: 'x' * 6)
+        lru.get('b', lambda: 'y' * 6)
+        assert len(lru) == 1
+        assert lru.info().nbytes == 6
+
+    def test_byte_limit_requires_sizeof(self):
+        with pytest.raises(AssertionError):
+            LRUCache(maxbytes=10)
+
+    def test_clear(self):
+        lru = LRUCache()
+        lru.get('a', lambda: 1)
+        lru.clear()
+        assert len(lru) == 0
+        assert lru.info().misses == 0
+
+
+class TestLoanCache(object):
+
+    def test_get_loan_is_shared(self):
+        loan = cache.get_loan(200000, .06, 30)
+        assert cache.get_loan(200000, .06, 30) is loan
+        assert cache.get_loan(200000, .06, 15) is not loan
+        assert cache.cache_info()['loans'].hits == 1
+        assert cache.get_loan(Decimal(200000), Decimal('0.06'), 30) is loan
+
+    def test_shared_loan_is_immutable(self):
+        loan = cache.get_loan(200000, .06, 30)
+        with pytest.raises(AttributeError):
+            loan.term = 15
+        with pytest.raises(AttributeError):
+            loan.interest = Decimal('0.07')
+        with pytest.raises(AttributeError):
+            del loan.principal
+        assert cache.get_loan(200000, .06, 30).term == 30
+        assert loan.schedule() is loan.schedule()
+        assert loan.total_interest == Loan(200000, .06, 30).total_interest
+        with pytest.raises(AttributeError):
+            loan._Loan__schedule = None
+
+    def test_first_schedule_read_from_threads(self):
+        loan = cache.get_loan(200000, .06, 30, backend='float')
+        barrier = threading.Barrier(8)
+        schedules, errors = [], []
+
+        def read():
+            barrier.wait()
+            try:
+                schedules.append(loan.schedule())
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append(error)
+
+        threads = [threading.Thread(target=read) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert len(schedules) == 8 and all(schedule is schedules[0] for schedule in schedules)
+
+    def test_shared_schedule_is_read_only(self):
+        loan = cache.get_loan(200000, .06, 30)
+        schedule = loan.schedule()
+        assert schedule.frozen
+        with pytest.raises(TypeError):
+            schedule.balance[1] = 0
+        with pytest.raises(AttributeError):
+            schedule.balance = []
+        prepaid = loan.with_prepayment(Prepayment(lump_sums={120: 10000}))
+        assert not prepaid.schedule().frozen
+        assert prepaid.schedule()[119] == schedule[119]
+
+    def test_pickle(self):
+        loan = cache.get_loan(200000, .06, 30)
+        copy = pickle.loads(pickle.dumps(loan))
+        assert copy.total_interest == loan.total_interest
+        with pytest.raises(AttributeError):
+            copy.term = 15
+
+    def test_derived_loans_are_not_shared(self):
+        rescaled = cache.get_loan(200000, .06, 30).rescale(100000)
+        rescaled.term = 15
+        assert cache.get_loan(200000, .06, 30).term == 30
+
+    def test_get_loan_with_prepayment_and_frequency(self):
+        prepayment = Prepayment(extra=200)
+        loan = cache.get_loan(200000, .06, 30, prepayment=prepayment, payment_frequency='biweekly')
+        assert cache.get_loan(200000, .06, 30, prepayment=prepayment,
+                              payment_frequency='biweekly') is loan
+        assert cache.get_loan(200000, .06, 30, payment_frequency='biweekly') is not loan
+        expected = Loan(200000, .06, 30, prepayment=prepayment, payment_frequency='biweekly')
+        assert loan.total_interest == expected.total_interest
+        adjustment = Adjustment(resets={61: .07})
+        assert cache.get_loan(200000, .06, 30, adjustment=adjustment).adjustment is adjustment
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    def test_get_schedule_matches_loan(self, backend):
+        expected = Loan(principal=350000, interest=.045, term=30, backend=backend).schedule()
+        schedule = cache.get_schedule(350000, .045, 30, backend=backend)
+        for number in (1, 180, 360):
+            assert convert(schedule[number].balance) == convert(expected[number].balance)
+            assert convert(schedule[number].total_interest) == convert(expected[number].total_interest)
+
+    def test_get_schedule_is_read_only(self):
+        schedule = cache.get_schedule(200000, .06, 30)
+        with pytest.raises(TypeError):
+            schedule.balance[1] = 0
+        assert cache.get_schedule(200000, .06, 30) is schedule
+        assert convert(schedule[1].balance) == convert(199800.90)
+
+    def test_get_schedule_keys_on_spec(self):
+        schedule = cache.get_schedule(200000, .06, 30)
+        assert cache.get_schedule(Decimal(200000), Decimal('0.06'), 30) is schedule
+        biweekly = cache.get_schedule(200000, .06, 30, payment_frequency='biweekly')
+        assert len(biweekly) == 781 and len(schedule) == 361
+        expected = Loan(200000, .06, 30, payment_frequency='biweekly').schedule()
+        assert convert(biweekly[400].balance) == convert(expected[400].balance)
+
+    def test_principals_share_unit_schedule(self):
+        cache.get_schedule(200000, .06, 30)
+        cache.get_schedule(300000, .06, 30)
+        info = cache.cache_info()
+        assert info['unit_schedules'].misses == 1
+        assert info['unit_schedules'].hits == 1
+        assert info['schedules'].currsize == 2
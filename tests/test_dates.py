@@ -0,0 +1,188 @@
+from datetime import date, timedelta
+import pytest
+
+from mortgage import Loan
+from mortgage.prepayment import Prepayment
+
+np = pytest.importorskip('numpy')
+dates = pytest.importorskip('mortgage.dates')
+batch = pytest.importorskip('mortgage.batch')
+
+
+def as_strings(values):
+    return [str(value) for value in values]
+
+
+class TestPaymentDates(object):
+
+    def test_monthly_keeps_day_of_month(self):
+        schedule = dates.payment_dates('2023-10-31', 6)[0]
+        assert as_strings(schedule) == ['2023-09-30', '2023-10-31', '2023-11-30', '2023-12-31',
+                                        '2024-01-31', '2024-02-29', '2024-03-31']
+
+    @pytest.mark.parametrize('frequency, step', [('daily', 1), ('weekly', 7), ('biweekly', 14)])
+    def test_day_steps(self, frequency, step):
+        schedule = dates.payment_dates('2024-03-01', 30, frequency)[0]
+        assert (np.diff(schedule).astype(int) == step).all()
+        assert str(schedule[1]) == '2024-03-01'
+
+    def test_semimonthly(self):
+        schedule = dates.payment_dates('2024-01-01', 5, 'semimonthly')[0]
+        assert as_strings(schedule) == ['2023-12-16', '2024-01-01', '2024-01-16', '2024-02-01',
+                                        '2024-02-16', '2024-03-01']
+
+    def test_annually(self):
+        schedule = dates.payment_dates('2024-02-29', 2, 'annually')[0]
+        assert as_strings(schedule) == ['2023-02-28', '2024-02-29', '2025-02-28']
+
+    def test_many_loans(self):
+        firsts = np.array(['2024-01-15', '2024-06-30', '2025-02-01'], dtype='datetime64[D]')
+        schedules = dates.payment_dates(firsts, [3, 5, 1])
+        assert schedules.shape == (3, 6)
+        assert (schedules[:, 1] == firsts).all()
+        assert np.isnat(schedules[0, 4:]).all() and np.isnat(schedules[2, 2:]).all()
+        assert not np.isnat(schedules[1]).any()
+
+    def test_matches_python_dates(self):
+        first = date(2024, 1, 10)
+        schedule = dates.payment_dates(first, 52, 'weekly')[0]
+        assert schedule[1:].tolist() == [first + timedelta(weeks=week) for week in range(52)]
+
+    def test_invalid(self):
+        with pytest.raises(AssertionError):
+            dates.payment_dates('2024-01-01', 12, 'hourly')
+        with pytest.raises(AssertionError):
+            dates.payment_dates('2024-01-01', 0)
+
+
+class TestDayCount(object):
+
+    @pytest.mark.parametrize('start, end, days', [
+        ('2024-01-15', '2024-02-15', 30),
+        ('2024-01-31', '2024-02-29', 29),
+        ('2024-01-30', '2024-03-31', 60),
+        ('2024-01-31', '2024-03-31', 60),
+        ('2024-02-29', '2024-03-31', 32),
+        ('2023-12-15', '2024-12-15', 360),
+    ])
+    def test_thirty_360(self, start, end, days):
+        assert dates.day_count(start, end, '30/360') == days
+
+    def test_actual(self):
+        starts = ['2024-01-01', '2024-02-01', '2023-02-01']
+        ends = ['2024-02-01', '2024-03-01', '2023-03-01']
+        assert dates.day_count(starts, ends, 'ACT/360').tolist() == [31, 29, 28]
+        assert dates.day_count(starts, ends, 'ACT/365').tolist() == [31, 29, 28]
+
+    def test_year_fraction(self):
+        assert dates.year_fraction('2024-01-01', '2025-01-01', 'ACT/365') == 366 / 365
+        assert dates.year_fraction('2024-01-01', '2025-01-01', 'ACT/360') == 366 / 360
+        assert dates.year_fraction('2024-01-01', '2025-01-01', '30/360') == 1
+
+    def test_invalid(self):
+        with pytest.raises(AssertionError):
+            dates.day_count('2024-01-01', '2024-02-01', 'ACT/ACT')
+
+
+principals = [200000, 150000, 90000]
+rates = [.06, .045, .07]
+terms = [30, 15, 5]
+
+
+class TestAmortize(object):
+
+    def test_thirty_360_matches_batch(self):
+        dated = dates.amortize(principals, rates, terms, '2024-02-01')
+        plain = batch.amortize(principals, rates, terms)
+        assert (dated.mask == plain.mask).all()
+        assert np.allclose(dated.balance, plain.balance, atol=1e-6)
+        assert np.allclose(dated.interest, plain.interest, atol=1e-6)
+        assert np.allclose(dated.principal, plain.principal, atol=1e-6)
+
+    @pytest.mark.parametrize('convention', ['ACT/360', 'ACT/365'])
+    def test_actual_accrual(self, convention):
+        dated = dates.amortize(principals, rates, terms, '2024-02-01', convention=convention)
+        year = dates.CONVENTIONS[convention]
+        days = np.diff(dated.date, axis=1).astype(float)
+        expected = dated.balance[:, :-1] * np.array(rates)[:, np.newaxis] * days / year
+        assert np.allclose(dated.interest[:, 1:][dated.mask[:, 1:]], expected[dated.mask[:, 1:]])
+        assert np.allclose(dated.balance[:, 1:] + dated.principal[:, 1:], dated.balance[:, :-1])
+        assert (dated.balance[:, -1] == 0).all()
+        assert (dated.balance[dated.mask] >= 0).all()
+        assert str(dated.date[0, 1]) == '2024-02-01'
+        assert dated.interest[0, 1] == pytest.approx(200000 * .06 * 31 / year)
+
+    def test_conventions_order_total_interest(self):
+        totals = [dates.amortize(principals, rates, terms, '2024-02-01', convention=convention)
+                  .interest.sum(axis=1) for convention in ('30/360', 'ACT/365', 'ACT/360')]
+        assert (totals[0] < totals[1]).all() and (totals[1] < totals[2]).all()
+
+    def test_first_payments_per_loan(self):
+        firsts = ['2024-02-01', '2024-03-15', '2025-01-31']
+        dated = dates.amortize(principals, rates, terms, firsts, convention='ACT/365')
+        assert as_strings(dated.date[:, 1]) == firsts
+        single = dates.amortize(principals[2], rates[2], terms[2], firsts[2], convention='ACT/365')
+        assert np.allclose(dated.balance[2, :61], single.balance[0])
+
+    @pytest.mark.parametrize('compounded, convention', [
+        ('daily', '30/360'), ('daily', 'ACT/360'), ('weekly', '30/360'),
+        ('semimonthly', 'ACT/365'), ('monthly', 'ACT/360'),
+    ])
+    def test_final_payment_absorbs_residual(self, compounded, convention):
+        dated = dates.amortize(principals, rates, terms, '2024-01-31', convention=convention,
+                               compounded=compounded)
+        plain = batch.amortize(principals, rates, terms, compounded=compounded)
+        level = plain.interest[:, 1] + plain.principal[:, 1]
+        payments = dated.interest + dated.principal
+        assert (dated.balance >= 0).all() and (dated.interest >= 0).all()
+        assert np.allclose(dated.principal.sum(axis=1), principals)
+        for row, paid, balance, payment in zip(payments, dated.mask, dated.balance, level):
+            numbers = np.flatnonzero(paid)[1:]
+            last = numbers[balance[numbers] > 0].max(initial=0) + 1
+            assert np.allclose(row[1:last], payment)
+            assert row[last] > 0 and (row[last + 1:] == 0).all()
+
+    def test_contractual_payment(self):
+        dated = dates.amortize(200000, .06, 30, '2024-02-01', convention='ACT/360')
+        payments = (dated.interest + dated.principal)[0]
+        assert round(payments[1], 2) == 1199.10
+        assert (np.round(payments[1:360], 2) == 1199.10).all()
+        assert payments[360] > 1199.10
+
+    def test_zero_rate(self):
+        dated = dates.amortize(120000, 0, 10, '2024-01-31', convention='ACT/365')
+        assert (dated.interest == 0).all()
+        assert np.allclose(dated.principal[0, 1:], 1000)
+
+    def test_fractional_terms(self):
+        dated = dates.amortize(200000, .06, 15.5, '2024-02-01')
+        assert dated.mask.sum() == len(Loan(200000, .06, 15.5).schedule())
+        assert str(dated.date[0, -1]) == '2039-07-01'
+
+    def test_padding(self):
+        dated = dates.amortize(principals, rates, terms, '2024-02-01', convention='ACT/360')
+        padded = ~dated.mask
+        assert np.isnat(dated.date[padded]).all()
+        assert (dated.interest[padded] == 0).all() and (dated.principal[padded] == 0).all()
+        assert (dated.balance[padded] == 0).all()
+
+
+class TestLoanDates(object):
+
+    def test_rows(self):
+        loan = Loan(principal=200000, interest=.06, term=30, payment_frequency='biweekly')
+        rows = dates.loan_dates(loan, '2024-01-05')
+        assert len(rows) == len(loan.schedule()) == 781
+        assert str(rows[1]) == '2024-01-05'
+
+    def test_does_not_build_schedule(self):
+        loan = Loan(principal=200000, interest=.06, term=15.5)
+        rows = dates.loan_dates(loan, '2024-01-01')
+        assert len(rows) == loan.n_payments + 1 == 187
+        assert loan._Loan__schedule is None
+
+    def test_paid_off_early(self):
+        loan = Loan(principal=90000, interest=.07, term=5, prepayment=Prepayment(extra=500))
+        rows = dates.loan_dates(loan, '2024-01-01')
+        assert len(rows) == len(loan.schedule()) < 61
+        assert not np.isnat(rows).any()
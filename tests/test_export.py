@@ -0,0 +1,150 @@
+import csv
+from decimal import Decimal
+import io
+import pytest
+
+from mortgage import Loan
+from mortgage.export import FIELDS, to_csv
+from mortgage.prepayment import Prepayment
+from mortgage.schedule import Schedule
+
+
+def convert(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+loans = [
+    Loan(principal=200000, interest=.06, term=30),
+    Loan(principal=150000, interest=.045, term=15, backend='bank'),
+    Loan(principal=90000, interest=.07, term=5, backend='float', prepayment=Prepayment(extra=100)),
+]
+
+
+def read_csv(text):
+    return list(csv.DictReader(io.StringIO(text)))
+
+
+class TestCsv(object):
+
+    def test_rows_match_schedules(self):
+        out = io.StringIO()
+        assert to_csv(loans, out) == sum(len(loan.schedule()) for loan in loans)
+        rows = read_csv(out.getvalue())
+        assert list(rows[0]) == list(FIELDS)
+        for loan_id, loan in enumerate(loans, 1):
+            written = [row for row in rows if row['loan'] == str(loan_id)]
+            assert len(written) == len(loan.schedule())
+            for row, installment in zip(written, loan.schedule()):
+                assert int(row['number']) == installment.number
+                assert Decimal(row['balance']) == convert(installment.balance)
+                assert Decimal(row['interest']) == convert(installment.interest)
+
+    @pytest.mark.parametrize('chunk_size', [1, 7, 361, 10000])
+    def test_chunk_size(self, chunk_size):
+        expected, out = io.StringIO(), io.StringIO()
+        to_csv(loans, expected)
+        assert to_csv(loans, out, chunk_size=chunk_size) == 361 + 181 + len(loans[2].schedule())
+        assert out.getvalue() == expected.getvalue()
+
+    def test_ids_and_header(self):
+        out = io.StringIO()
+        to_csv(loans[:2], out, ids=['a', 'b'], header=False)
+        lines = out.getvalue().splitlines()
+        assert lines[0].startswith('a,0,')
+        assert lines[-1].startswith('b,180,')
+
+    @pytest.mark.parametrize('ids', [['a', 'b'], ['a', 'b', 'c', 'd']])
+    def test_ids_must_match_loans(self, ids):
+        with pytest.raises(ValueError):
+            to_csv(loans, io.StringIO(), ids=ids)
+        with pytest.raises(ValueError):
+            to_csv(iter(loans), io.StringIO(), ids=iter(ids))
+
+    def test_ids_are_quoted(self):
+        out = io.StringIO()
+        ids = ['Smith, J.', 'say "hi"', 'plain']
+        to_csv([Loan(200000, .06, 1)] * 3, out, ids=ids)
+        rows = read_csv(out.getvalue())
+        assert [row['loan'] for row in rows[::13]] == ids
+        assert all(len(row) == len(FIELDS) for row in rows)
+        assert out.getvalue().splitlines()[1].startswith('"Smith, J.",0,')
+
+    def test_no_negative_zero(self):
+        out = io.StringIO()
+        to_csv(Schedule([0, 5], [0, 1], [0, 4], [0, 1], [4, -0.001], kind='float'), out)
+        assert '-0.00' not in out.getvalue()
+        assert read_csv(out.getvalue())[-1]['balance'] == '0.00'
+
+    def test_schedules(self):
+        schedule = Loan(principal=200000, interest=.06, term=30).schedule()
+        expected, out = io.StringIO(), io.StringIO()
+        to_csv(schedule.compact('cents'), out)
+        to_csv(schedule, expected)
+        assert read_csv(out.getvalue())[-1]['balance'] == '0.00'
+        assert out.getvalue() == expected.getvalue()
+
+    def test_path(self, tmp_path):
+        path = str(tmp_path / 'schedules.csv')
+        to_csv(iter(loans), path)
+        with open(path) as handle:
+            assert len(read_csv(handle.read())) == 361 + 181 + len(loans[2].schedule())
+
+    def test_empty(self):
+        out = io.StringIO()
+        assert to_csv([], out) == 0
+        assert out.getvalue() == ','.join(FIELDS) + '\n'
+
+
+class TestNpy(object):
+
+    np = pytest.importorskip('numpy')
+
+    def test_rows_match_schedules(self, tmp_path):
+        from mortgage.export import record_dtype, to_npy
+
+        path = str(tmp_path / 'schedules.npy')
+        assert to_npy(loans, path, ids=[10, 20, 30]) == 361 + 181 + len(loans[2].schedule())
+        rows = self.np.load(path, mmap_mode='r')
+        assert rows.dtype == record_dtype()
+        assert rows.dtype.itemsize == 52
+        start = 0
+        for loan_id, loan in zip([10, 20, 30], loans):
+            schedule = loan.schedule()
+            written = rows[start:start + len(schedule)]
+            assert (written['loan'] == loan_id).all()
+            assert written['number'].tolist() == list(range(len(schedule)))
+            for row, installment in zip(written, schedule):
+                assert convert(repr(float(row['balance']))) == convert(installment.balance)
+            start += len(schedule)
+
+    def test_ids_must_match_loans(self, tmp_path):
+        from mortgage.export import to_npy
+
+        with pytest.raises(ValueError):
+            to_npy(loans, str(tmp_path / 'short.npy'), ids=[10, 20])
+        with pytest.raises(ValueError):
+            to_npy(loans[:1], io.BytesIO(), ids=[10, 20])
+
+    @pytest.mark.parametrize('chunk_size', [1, 100, 361, 542, 100000])
+    def test_chunk_size(self, chunk_size):
+        from mortgage.export import to_npy
+
+        expected, out = io.BytesIO(), io.BytesIO()
+        to_npy(loans[:2], expected)
+        assert to_npy(loans[:2], out, chunk_size=chunk_size) == 542
+        assert out.getvalue() == expected.getvalue()
+        assert self.np.load(io.BytesIO(out.getvalue())).shape == (542,)
+
+    def test_header_is_aligned(self):
+        from mortgage.export import _npy_header, record_dtype
+
+        for rows in (0, 10 ** 12):
+            assert len(_npy_header(record_dtype(), rows)) % 64 == 0
+        assert len(_npy_header(record_dtype(), 0)) == len(_npy_header(record_dtype(), 10 ** 12))
+
+    def test_empty(self):
+        from mortgage.export import to_npy
+
+        out = io.BytesIO()
+        assert to_npy([], out) == 0
+        assert self.np.load(io.BytesIO(out.getvalue())).shape == (0,)
@@ -0,0 +1,144 @@
+from urllib.request import urlopen
+import pytest
+
+from mortgage import Loan, cache, instrumentation
+from mortgage.prepayment import Prepayment
+
+
+@pytest.fixture(autouse=True)
+def disabled():
+    cache.clear()
+    yield
+    instrumentation.disable()
+
+
+class TestSinks(object):
+
+    def test_disabled_by_default(self):
+        assert instrumentation.enabled is False
+
+    def test_callback(self):
+        events = []
+        instrumentation.enable(lambda *event: events.append(event))
+        assert instrumentation.enabled
+        Loan(principal=200000, interest=.06, term=30).schedule()
+        assert ('counter', 'schedule.builds', 1) in events
+        assert any(kind == 'timer' and name == 'schedule.build' for kind, name, _ in events)
+
+    def test_disable_one_sink(self):
+        first, second = instrumentation.Registry(), instrumentation.Registry()
+        instrumentation.enable(first, second)
+        instrumentation.disable(first)
+        assert instrumentation.enabled
+        instrumentation.count('test')
+        assert 'test' not in first.counters
+        assert second.counters['test'] == 1
+        instrumentation.disable(second)
+        assert not instrumentation.enabled
+
+    def test_recording_disables_afterwards(self):
+        with instrumentation.recording() as registry:
+            instrumentation.count('test', 2)
+        instrumentation.count('test', 3)
+        assert registry.counters == {'test': 2}
+        assert not instrumentation.enabled
+
+    def test_nothing_recorded_when_disabled(self):
+        registry = instrumentation.Registry()
+        Loan(principal=200000, interest=.06, term=30).schedule()
+        assert registry.snapshot() == {'counters': {}, 'timers': {}}
+
+
+class TestEvents(object):
+
+    def test_schedule_build(self):
+        with instrumentation.recording() as registry:
+            loan = Loan(principal=200000, interest=.06, term=30)
+            loan.schedule()
+            loan.schedule()
+        assert registry.counters['schedule.builds'] == 1
+        assert registry.counters['schedule.rows'] == 361
+        assert registry.counters['loan.recurrence'] == 1
+        assert registry.timers['schedule.build'][0] == 1
+
+    def test_closed_form(self):
+        with instrumentation.recording() as registry:
+            loan = Loan(principal=200000, interest=.06, term=30)
+            loan.balance_at(120)
+            loan.cumulative_interest(120)
+            loan.schedule(120)
+            loan.total_interest
+        assert registry.counters['loan.closed_form'] == 4
+        assert 'schedule.builds' not in registry.counters
+
+    def test_payment_evaluations(self):
+        with instrumentation.recording() as registry:
+            loan = Loan(principal=200000, interest=.06, term=30)
+            loan.monthly_payment
+            loan.total_interest
+            loan.split_payment(1, loan.monthly_payment)
+        assert registry.counters['loan.payment'] == 3
+        assert registry.counters['loan.split_payment'] == 1
+
+    def test_resume(self):
+        loan = Loan(principal=200000, interest=.06, term=30)
+        loan.schedule()
+        with instrumentation.recording() as registry:
+            derived = loan.with_prepayment(Prepayment(lump_sums={300: 1000}))
+        assert registry.counters['schedule.resumes'] == 1
+        assert registry.counters['schedule.reused_rows'] == 300
+        assert registry.counters['schedule.rows'] == len(derived.schedule()) - 300
+
+    def test_cache(self):
+        with instrumentation.recording() as registry:
+            cache.get_loan(200000, .06, 30)
+            cache.get_loan(200000, .06, 30)
+        assert registry.counters['cache.loans.misses'] == 1
+        assert registry.counters['cache.loans.hits'] == 1
+
+    def test_cache_evictions(self):
+        lru = cache.LRUCache(maxsize=1, name='test')
+        with instrumentation.recording() as registry:
+            lru.get('a', lambda: 1)
+            lru.get('b', lambda: 2)
+        assert registry.counters['cache.test.evictions'] == 1
+
+
+class TestRegistry(object):
+
+    def test_timers(self):
+        registry = instrumentation.Registry()
+        registry('timer', 'build', 0.5)
+        registry('timer', 'build', 0.25)
+        assert registry.snapshot()['timers'] == {'build': {'count': 2, 'sum': 0.75, 'max': 0.5}}
+
+    def test_render(self):
+        registry = instrumentation.Registry()
+        registry('counter', 'schedule.rows', 361)
+        registry('timer', 'schedule.build', 0.5)
+        assert registry.render().splitlines() == [
+            '# TYPE mortgage_schedule_rows_total counter',
+            'mortgage_schedule_rows_total 361',
+            '# TYPE mortgage_schedule_build_seconds summary',
+            'mortgage_schedule_build_seconds_count 1',
+            'mortgage_schedule_build_seconds_sum 0.5',
+        ]
+
+    def test_clear(self):
+        registry = instrumentation.Registry()
+        registry('counter', 'test', 1)
+        registry.clear()
+        assert registry.counters == {}
+
+    def test_serve(self):
+        registry = instrumentation.Registry()
+        registry('counter', 'schedule.builds', 2)
+        server = instrumentation.serve(registry)
+        try:
+            host, port = server.server_address
+            with urlopen('http://{}:{}/metrics'.format(host, port)) as response:
+                body = response.read().decode()
+        finally:
+            server.shutdown()
+            server.server_close()
+        assert 'mortgage_schedule_builds_total 2' in body
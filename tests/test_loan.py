@@ -1,7 +1,12 @@
 from decimal import Decimal
+import json
+import pickle
 import pytest
 
 from mortgage import Loan
+from mortgage.adjustment import Adjustment
+from mortgage.loan import PERIODS, SPLIT_TOLERANCE, TOLERANCES, LoanSpec, Summary, period_table
+from mortgage.prepayment import Prepayment
 
 
 def convert(value):
@@ -97,3 +102,419 @@ class TestLoan(object):
 
     def test_summarize(self, loan_200k):
         assert loan_200k.summarize is None
+
+    def test_summarize_prints_summary(self, loan_200k, capsys):
+        loan_200k.summarize
+        lines = capsys.readouterr().out.splitlines()
+        assert lines[0] == 'Original Balance:         $    200,000'
+        assert lines[5] == 'Monthly Payment:          $    1199.10'
+        assert lines[9] == 'Total payments:           $ 431,676.38'
+        assert lines[10] == 'Interest to principal:           115.8 %'
+
+
+class TestSummary(object):
+
+    @pytest.mark.parametrize('loan', [
+        Loan(principal=200000, interest=.06, term=30),
+        Loan(principal=150000, interest=.045, term=15, compounded='daily', backend='float'),
+        Loan(principal=150000, interest=.045, term=15, backend='bank'),
+        Loan(principal=90000, interest=.07, term=5, prepayment=Prepayment(extra=500)),
+    ])
+    def test_matches_properties(self, loan):
+        summary = loan.summary()
+        assert summary.principal == loan.principal
+        assert summary.interest == loan.interest
+        assert summary.apy == loan.apy
+        assert summary.apr == loan.apr
+        assert (summary.term, summary.term_unit) == (loan.term, loan.term_unit)
+        assert summary.monthly_payment == loan.monthly_payment
+        assert summary.total_principal == loan.total_principal
+        assert summary.total_interest == loan.total_interest
+        assert summary.total_paid == loan.total_paid
+        assert summary.interest_to_principle == loan.interest_to_principle
+        assert summary.years_to_pay == loan.years_to_pay
+
+    def test_does_not_build_schedule(self):
+        loan = Loan(principal=200000, interest=.06, term=30)
+        loan.summary()
+        assert loan._Loan__schedule is None
+
+    def test_to_json(self, loan_200k):
+        summary = loan_200k.summary()
+        decoded = json.loads(summary.to_json())
+        assert list(decoded) == list(Summary._fields)
+        assert decoded['monthly_payment'] == 1199.10
+        assert decoded['total_paid'] == 431676.38
+        assert decoded['term_unit'] == 'years'
+        assert summary.to_dict() == decoded
+
+    def test_is_a_tuple(self, loan_200k):
+        summary = loan_200k.summary()
+        assert summary == tuple(summary)
+        assert summary._replace(term=15).term == 15
+
+
+class TestLazySchedule(object):
+
+    def test_schedule_not_built_on_init(self):
+        loan = Loan(principal=200000, interest=.06, term=30)
+        assert loan._Loan__schedule is None
+
+    def test_summary_statistics_do_not_build_schedule(self):
+        loan = Loan(principal=200000, interest=.06, term=30)
+        assert loan.monthly_payment == convert(1199.10)
+        assert loan.total_paid == convert(431676.38)
+        assert loan.interest_to_principle == 115.8
+        assert loan._Loan__schedule is None
+
+    def test_schedule_built_on_first_access(self):
+        loan = Loan(principal=200000, interest=.06, term=30)
+        assert len(loan.schedule()) == 361
+        assert loan._Loan__schedule is not None
+
+    @pytest.mark.parametrize('compounded', ['daily', 'monthly', 'annually'])
+    def test_closed_form_total_interest_matches_schedule(self, compounded):
+        loan = Loan(principal=200000, interest=.06, term=15, compounded=compounded)
+        assert loan.total_interest == convert(loan.schedule()[-1].total_interest)
+
+
+class TestRecurrence(object):
+
+    @pytest.mark.parametrize('compounded', ['daily', 'monthly', 'annually'])
+    def test_recurrence_matches_closed_form(self, compounded):
+        loan = Loan(principal=200000, interest=.06, term=15, compounded=compounded)
+        assert loan.verify() <= SPLIT_TOLERANCE
+
+    def test_verify_rejects_deviation(self):
+        loan = Loan(principal=200000, interest=.06, term=15)
+        with pytest.raises(AssertionError):
+            loan.verify(tolerance=Decimal('1E-40'))
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    def test_zero_rate(self, backend):
+        loan = Loan(principal=120000, interest=0, term=10, backend=backend)
+        interest_payment, principal_payment = loan.split_payment(5, loan._monthly_payment)
+        assert interest_payment == 0 and principal_payment == 1000
+        assert type(interest_payment) is type(principal_payment) is type(loan._monthly_payment)
+        assert loan.verify() == 0
+
+    def test_final_balance_is_zero(self, loan_200k):
+        assert convert(loan_200k.schedule()[-1].balance) == convert(0)
+
+
+class TestBackends(object):
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    def test_summary_statistics(self, backend):
+        loan = Loan(principal=200000, interest=.06, term=30, backend=backend)
+        assert loan.monthly_payment == convert(1199.10)
+        assert loan.apr == convert(6.00)
+        assert loan.apy == convert(6.17)
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    @pytest.mark.parametrize('compounded', ['daily', 'monthly', 'annually'])
+    def test_schedule_within_tolerance(self, backend, compounded):
+        loan = Loan(principal=200000, interest=.06, term=15, compounded=compounded, backend=backend)
+        deviation = loan.verify()
+        if backend != 'bank':
+            assert deviation <= TOLERANCES[backend]
+
+    @pytest.mark.parametrize('interest', [.06, .12, .2, .3])
+    @pytest.mark.parametrize('compounded', ['daily', 'monthly'])
+    def test_bank_drift_grows_with_rate_and_term(self, interest, compounded):
+        loan = Loan(principal=200000, interest=interest, term=30, compounded=compounded,
+                    backend='bank')
+        periods = PERIODS[compounded]
+        bound = .005 + .01 * ((1 + interest / periods) ** (30 * periods) - 1)
+        deviation = loan.verify()
+        assert float(deviation) <= bound * (1 + 1e-9)
+        if interest >= .12:
+            assert deviation > Decimal('0.05')
+
+    def test_float_schedule(self):
+        loan = Loan(principal=200000, interest=.06, term=30, backend='float')
+        assert loan.schedule().kind == 'float'
+        assert isinstance(loan.schedule(10).balance, float)
+        assert convert(loan.schedule(10).balance) == convert(197963.59)
+        assert loan.total_interest == convert(231676.38)
+
+    def test_bank_schedule_is_whole_cents(self):
+        loan = Loan(principal=200000, interest=.06, term=30, backend='bank')
+        schedule = loan.schedule()
+        assert schedule.kind == 'cents'
+        assert schedule[1].interest == Decimal('1000.00')
+        assert schedule[1].principal == Decimal('199.10')
+        assert all(installment.payment == Decimal('1199.10') for installment in schedule[1:360])
+
+    def test_bank_final_payment_absorbs_residual(self):
+        loan = Loan(principal=200000, interest=.06, term=30, backend='bank')
+        final = loan.schedule(360)
+        assert final.balance == 0
+        assert final.payment == final.principal + final.interest
+        assert abs(final.payment - loan.monthly_payment) < 2
+        assert loan.total_interest == final.total_interest
+
+    def test_bank_total_interest_close_to_exact(self):
+        exact = Loan(principal=200000, interest=.06, term=30)
+        bank = Loan(principal=200000, interest=.06, term=30, backend='bank')
+        assert abs(bank.total_interest - exact.total_interest) < 360 * Decimal('0.005')
+
+    def test_invalid_backend(self):
+        with pytest.raises(AssertionError):
+            Loan(principal=200000, interest=.06, term=30, backend='int')
+
+    @pytest.mark.parametrize('backend', ['float', 'bank'])
+    def test_with_backend(self, backend):
+        loan = Loan(principal=200000, interest=.06, term=30, compounded='daily', currency='£',
+                    adjustment=Adjustment(resets={61: .07}))
+        loan.schedule()
+        derived = loan.with_backend(backend)
+        assert derived.backend == backend and loan.backend == 'decimal'
+        assert derived.adjustment is loan.adjustment and derived._currency == '£'
+        assert derived.monthly_payment == loan.monthly_payment
+
+
+class TestIterSchedule(object):
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    def test_matches_schedule(self, backend):
+        streamed = Loan(principal=200000, interest=.06, term=15, backend=backend)
+        built = Loan(principal=200000, interest=.06, term=15, backend=backend)
+        for streamed_row, built_row in zip(streamed.iter_schedule(), built.schedule()):
+            assert streamed_row.number == built_row.number
+            assert convert(streamed_row.balance) == convert(built_row.balance)
+            assert convert(streamed_row.total_interest) == convert(built_row.total_interest)
+        assert streamed._Loan__schedule is None
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float'])
+    def test_seek(self, backend):
+        loan = Loan(principal=200000, interest=.06, term=30, backend=backend)
+        rows = list(loan.iter_schedule(start=5, stop=11))
+        assert [row.number for row in rows] == list(range(5, 11))
+        assert convert(rows[0].total_interest) == convert(4990.00)
+        assert convert(rows[-1].balance) == convert(197963.59)
+        assert convert(rows[-1].principal) == convert(208.24)
+
+    def test_bank_seek_replays_rounding(self):
+        streamed = Loan(principal=200000, interest=.06, term=30, backend='bank')
+        built = Loan(principal=200000, interest=.06, term=30, backend='bank')
+        assert list(streamed.iter_schedule(start=5, stop=11)) == built.schedule()[5:11]
+
+    def test_daily_compounding_seek(self):
+        loan = Loan(principal=200000, interest=.06, term=30, compounded='daily')
+        last = next(loan.iter_schedule(start=30 * 365))
+        assert convert(last.balance) == convert(0)
+        assert convert(last.total_interest) == loan.total_interest
+
+    def test_uses_built_schedule(self, loan_200k):
+        loan_200k.schedule()
+        assert list(loan_200k.iter_schedule(358)) == loan_200k.schedule()[358:]
+
+    def test_stop_is_clamped(self, loan_200k):
+        assert len(list(loan_200k.iter_schedule(350, 1000))) == 11
+        assert list(loan_200k.iter_schedule(5, 5)) == []
+
+
+class TestRandomAccess(object):
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float'])
+    @pytest.mark.parametrize('nth_payment', [1, 5, 10, 180, 360])
+    def test_single_row_matches_schedule(self, backend, nth_payment):
+        direct = Loan(principal=200000, interest=.06, term=30, backend=backend)
+        built = Loan(principal=200000, interest=.06, term=30, backend=backend)
+        built.schedule()
+        row = direct.schedule(nth_payment)
+        assert direct._Loan__schedule is None
+        assert row.number == nth_payment
+        for field in ('payment', 'interest', 'principal', 'total_interest', 'balance'):
+            value, expected = getattr(row, field), getattr(built.schedule(nth_payment), field)
+            assert abs(Decimal(value) - Decimal(expected)) <= TOLERANCES[backend]
+            assert convert(value) == convert(expected)
+
+    def test_negative_index_uses_schedule(self, loan_200k):
+        assert loan_200k.schedule(-1).number == 360
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    @pytest.mark.parametrize('nth_payment', [0, 1, 120, 360])
+    def test_balance_and_cumulative_interest(self, backend, nth_payment):
+        loan = Loan(principal=200000, interest=.06, term=30, backend=backend)
+        row = Loan(principal=200000, interest=.06, term=30, backend=backend).schedule()[nth_payment]
+        assert loan.balance_at(nth_payment) == convert(row.balance)
+        assert loan.cumulative_interest(nth_payment) == convert(row.total_interest)
+
+    def test_payment_outside_term(self, loan_200k):
+        with pytest.raises(AssertionError):
+            loan_200k.balance_at(361)
+        with pytest.raises(AssertionError):
+            loan_200k.cumulative_interest(-1)
+
+
+class TestRescale(object):
+
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    @pytest.mark.parametrize('principal', [1000, 200000, 1234567])
+    def test_matches_direct_loan(self, backend, principal):
+        unit = Loan(principal=1, interest=.06, term=30, backend=backend)
+        loan = unit.rescale(principal)
+        expected = Loan(principal=principal, interest=.06, term=30, backend=backend)
+        assert loan.principal == expected.principal
+        assert loan.monthly_payment == expected.monthly_payment
+        assert loan.total_interest == expected.total_interest
+        for number in (1, 120, 360):
+            for field in ('interest', 'principal', 'total_interest', 'balance'):
+                assert convert(getattr(loan.schedule(number), field)) == \
+                    convert(getattr(expected.schedule(number), field))
+
+    def test_reuses_schedule(self):
+        unit = Loan(principal=1, interest=.06, term=30)
+        loan = unit.rescale(200000)
+        assert loan._Loan__schedule is not None
+        assert unit._Loan__schedule is not None
+
+    def test_keeps_terms(self):
+        unit = Loan(principal=1, interest=.045, term=15, compounded='annually', currency='£')
+        loan = unit.rescale(5000)
+        assert (loan.interest, loan.term, loan.compounded, loan._currency) == \
+            (unit.interest, 15, 'annually', '£')
+
+
+class TestYearsToPay(object):
+
+    @pytest.mark.parametrize('compounded', ['daily', 'monthly', 'annually'])
+    def test_full_term(self, compounded):
+        assert Loan(principal=200000, interest=.06, term=30, compounded=compounded).years_to_pay == 30
+
+    def test_n_payments(self):
+        assert Loan(principal=200000, interest=.06, term=15.5).n_payments == 186
+        loan = Loan(principal=200000, interest=.06, term=30, prepayment=Prepayment(extra=500))
+        assert loan.n_payments == 360 > len(loan.schedule()) - 1
+
+
+class TestLoanSpec(object):
+
+    def test_round_trip(self):
+        spec = LoanSpec(principal=90000, interest=.07, term=5, compounded='daily', currency='€',
+                        backend='bank', prepayment=Prepayment(extra=500))
+        restored = pickle.loads(pickle.dumps(spec))
+        assert restored._loan is None
+        loan, original = restored.loan(), spec.loan()
+        assert (loan.principal, loan.interest, loan.term) == (original.principal, original.interest, 5)
+        assert (loan.compounded, loan._currency, loan.backend) == ('daily', '€', 'bank')
+        assert list(loan.schedule()) == list(original.schedule())
+        assert restored.loan() is loan
+
+    def test_pickle_leaves_schedule_behind(self):
+        loan = Loan(principal=200000, interest=.06, term=30)
+        loan.schedule()
+        size = len(pickle.dumps(loan.spec))
+        assert size < 300
+        assert size * 50 < len(pickle.dumps(loan))
+        restored = pickle.loads(pickle.dumps(loan.spec)).loan()
+        assert restored._Loan__schedule is None
+        assert restored.schedule()[120] == loan.schedule()[120]
+
+    def test_loan_spec(self):
+        loan = Loan(principal=200000, interest=.06, term=30, backend='float')
+        assert loan.spec.loan() is loan
+        assert loan.spec == LoanSpec(200000, loan.interest, 30, backend='float')
+        assert Loan(*loan.spec._values()).interest == loan.interest
+
+    def test_immutable(self):
+        spec = LoanSpec(principal=200000, interest=.06, term=30)
+        with pytest.raises(AttributeError):
+            spec.term = 15
+        with pytest.raises(AttributeError):
+            del spec.term
+        with pytest.raises(AttributeError):
+            spec.__dict__  # pylint: disable=pointless-statement
+
+    def test_equality_and_hash(self):
+        spec = LoanSpec(principal=200000, interest=.06, term=30)
+        assert spec == LoanSpec(200000, .06, 30)
+        assert spec != LoanSpec(200000, .06, 15)
+        assert spec != (200000, .06, 30)
+        assert len({spec, LoanSpec(200000, .06, 30), pickle.loads(pickle.dumps(spec))}) == 1
+
+    @pytest.mark.parametrize('interest', [.06, .07, .04125])
+    def test_spec_normalizes_numbers(self, interest):
+        specs = [Loan(200000, interest, 30).spec, LoanSpec(200000, interest, 30),
+                 LoanSpec(200000.0, interest, 30), LoanSpec(Decimal(200000), interest, 30),
+                 LoanSpec(200000, Loan(200000, interest, 30).interest, 30)]
+        assert all(spec == specs[0] for spec in specs)
+        assert len(set(specs)) == 1
+        assert LoanSpec(200000, Decimal('0.06'), 30) == LoanSpec(200000, .06, 30)
+        assert specs[1].loan().total_paid == Loan(200000, interest, 30).total_paid
+
+    def test_validates(self):
+        with pytest.raises(AssertionError):
+            LoanSpec(principal=200000, interest=.06, term=30, compounded='hourly')
+
+
+class TestFrequencies(object):
+
+    def test_term_units(self):
+        in_years = Loan(principal=200000, interest=.06, term=30)
+        in_months = Loan(principal=200000, interest=.06, term=360, term_unit='months')
+        assert len(in_months.schedule()) == 361
+        assert list(in_months.schedule()) == list(in_years.schedule())
+        assert in_months.years_to_pay == 30
+        in_days = Loan(principal=200000, interest=.06, term=3650, term_unit='days', compounded='daily')
+        assert len(in_days.schedule()) == 3651
+        assert in_days.monthly_payment == Loan(200000, .06, 10, compounded='daily').monthly_payment
+
+    @pytest.mark.parametrize('frequency, n_payments', [
+        ('daily', 10950), ('weekly', 1560), ('biweekly', 780), ('semimonthly', 720), ('annually', 30)])
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    def test_payment_frequency(self, frequency, n_payments, backend):
+        loan = Loan(principal=200000, interest=.06, term=30, payment_frequency=frequency,
+                    backend=backend)
+        schedule = loan.schedule()
+        assert len(schedule) == n_payments + 1
+        assert abs(schedule[-1].balance) < Decimal('0.01')
+        assert loan.years_to_pay == 30
+        if backend != 'bank':
+            loan.verify()
+            assert loan.balance_at(n_payments // 2) == convert(schedule[n_payments // 2].balance)
+
+    def test_effective_rate_matches_compounding(self):
+        loan = Loan(principal=200000, interest=.06, term=30, payment_frequency='biweekly')
+        assert loan.payment_frequency == 'biweekly'
+        assert loan.payments_per_year == 26
+        assert abs((1 + loan._period_rate) ** 26 - Decimal('1.005') ** 12) < Decimal('1E-20')
+        assert loan.apy == Loan(principal=200000, interest=.06, term=30).apy
+        assert loan.monthly_payment == convert(552.69)
+
+    def test_same_frequency_is_unchanged(self):
+        loan = Loan(principal=200000, interest=.06, term=30, compounded='daily',
+                    payment_frequency='daily')
+        assert loan._period_rate == Decimal('0.06') / 365
+        assert list(loan.schedule()) == list(Loan(200000, .06, 30, compounded='daily').schedule())
+
+    def test_tables_are_shared(self):
+        first = Loan(principal=200000, interest=.05, term=30, payment_frequency='weekly')
+        second = Loan(principal=350000, interest=.05, term=30, payment_frequency='weekly')
+        assert first._table is second._table
+        assert first._table is not Loan(200000, .05, 15, payment_frequency='weekly')._table
+        assert period_table(.05, 'monthly', 'weekly', 1560, float) == first._replace(backend='float')._table
+
+    def test_zero_rate(self):
+        loan = Loan(principal=120000, interest=0, term=10, payment_frequency='semimonthly')
+        assert loan.monthly_payment == convert(500)
+        assert loan.total_interest == 0
+
+    def test_spec_keeps_payment_frequency(self):
+        loan = Loan(principal=200000, interest=.06, term=30, payment_frequency='biweekly')
+        restored = pickle.loads(pickle.dumps(loan.spec)).loan()
+        assert restored.payment_frequency == 'biweekly'
+        assert restored.monthly_payment == loan.monthly_payment
+        assert loan._replace(principal=100000).payment_frequency == 'biweekly'
+
+    @pytest.mark.parametrize('kwargs', [
+        dict(payment_frequency='hourly'),
+        dict(term=1, term_unit='days'),
+    ])
+    def test_invalid(self, kwargs):
+        params = dict(principal=200000, interest=.06, term=30)
+        params.update(kwargs)
+        with pytest.raises(AssertionError):
+            Loan(**params)
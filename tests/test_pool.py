@@ -0,0 +1,138 @@
+import pytest
+
+from mortgage import Loan
+from mortgage.adjustment import Adjustment
+from mortgage.prepayment import Prepayment
+
+np = pytest.importorskip('numpy')
+pool = pytest.importorskip('mortgage.pool')
+
+principals = [200000, 150000, 90000, 320000]
+rates = [.06, .045, .07, .0525]
+terms = [30, 15, 5, 30]
+
+
+def column(loan, name, length):
+    values = np.zeros(length)
+    rows = [float(getattr(installment, name)) for installment in loan.schedule()]
+    values[:len(rows)] = rows
+    return values
+
+
+class TestPool(object):
+
+    def test_sums_match_schedules(self):
+        loans = [Loan(*spec) for spec in zip(principals, rates, terms)]
+        loans.append(Loan(100000, .05, 10, backend='bank'))
+        loans.append(Loan(120000, .04, 20, prepayment=Prepayment(extra=250)))
+        flows = pool.Pool().add_loans(loans).cash_flows()
+        assert flows.balance.shape == (361,)
+        for name in ('payment', 'interest', 'principal', 'balance'):
+            expected = sum(column(loan, name, 361) for loan in loans)
+            assert np.allclose(getattr(flows, name), expected, atol=0.01)
+
+    def test_wac_and_wam(self):
+        loans = [Loan(200000, .06, 30), Loan(100000, .03, 15)]
+        flows = pool.Pool().add_loans(loans).cash_flows()
+        first, second = (column(loan, 'balance', 361) for loan in loans)
+        assert flows.wac[0] == pytest.approx(.05)
+        assert flows.wam[0] == pytest.approx(300)
+        assert flows.wac[100] == pytest.approx((first[100] * .06 + second[100] * .03)
+                                               / (first[100] + second[100]))
+        assert flows.wam[100] == pytest.approx((first[100] * 260 + second[100] * 80)
+                                               / (first[100] + second[100]))
+        assert flows.wac[200] == pytest.approx(.06) and flows.wam[200] == pytest.approx(160)
+        assert np.isnan(flows.wac[360]) and np.isnan(flows.wam[360])
+
+    def test_loan_counts(self):
+        loans = [Loan(*spec) for spec in zip(principals, rates, terms)]
+        flows = pool.Pool().add_loans(loans).cash_flows()
+        assert flows.loans.dtype == np.int64
+        assert flows.loans[[0, 59, 60, 179, 180, 360]].tolist() == [4, 4, 3, 3, 2, 0]
+
+    def test_adjustment_coupons(self):
+        loan = Loan(200000, .05, 30, adjustment=Adjustment(resets={61: .07}))
+        flows = pool.Pool().add(loan).cash_flows()
+        assert flows.wac[59] == pytest.approx(.05)
+        assert flows.wac[60] == pytest.approx(.07)
+        assert np.allclose(flows.interest, column(loan, 'interest', 361), atol=0.01)
+
+    def test_group_by_function(self):
+        loans = [Loan(*spec) for spec in zip(principals, rates, terms)]
+        grouped = pool.Pool().add_loans(loans, keys=lambda loan: loan.term)
+        assert grouped.keys() == [30, 15, 5]
+        assert grouped.cash_flows(30).balance[0] == 520000
+        assert grouped.cash_flows(5).balance.shape == (61,)
+        assert grouped.periods == 361
+        assert set(grouped.groups()) == {30, 15, 5}
+
+    def test_group_by_rate_bucket(self):
+        loans = [Loan(*spec) for spec in zip(principals, rates, terms)]
+        keys = pool.rate_bucket(rates, .01).tolist()
+        grouped = pool.Pool().add_loans(loans, keys=keys)
+        assert sorted(grouped.keys()) == [0.04, 0.05, 0.06, 0.07]
+        assert grouped.cash_flows(0.05).wac[0] == pytest.approx(.0525)
+
+    def test_missing_group(self):
+        with pytest.raises(KeyError):
+            pool.Pool().add(Loan(200000, .06, 30), 'a').cash_flows()
+
+    def test_merge(self):
+        loans = [Loan(*spec) for spec in zip(principals, rates, terms)]
+        whole = pool.Pool().add_loans(loans, keys=lambda loan: loan.term > 10)
+        first = pool.Pool().add_loans(loans[:2], keys=lambda loan: loan.term > 10)
+        second = pool.Pool().add_loans(loans[2:], keys=lambda loan: loan.term > 10)
+        merged = first.merge(second)
+        assert len(merged) == 2 and False in merged
+        for key in (True, False):
+            assert np.allclose(merged._sums[key], whole._sums[key])
+
+
+class TestAddBatch(object):
+
+    @pytest.mark.parametrize('chunk_size', [1, 3, 4096])
+    def test_matches_add_loans(self, chunk_size):
+        keys = ['long', 'short', 'short', 'long']
+        batched = pool.Pool().add_batch(principals, rates, terms, keys, chunk_size=chunk_size)
+        loans = [Loan(*spec) for spec in zip(principals, rates, terms)]
+        looped = pool.Pool().add_loans(loans, keys)
+        assert sorted(batched.keys()) == ['long', 'short']
+        for key in ('long', 'short'):
+            expected, actual = looped.cash_flows(key), batched.cash_flows(key)
+            for name in pool.CashFlows._fields:
+                assert np.allclose(getattr(actual, name), getattr(expected, name), atol=1e-6,
+                                   equal_nan=True)
+
+    def test_one_key(self):
+        batched = pool.Pool().add_batch(principals, rates, terms, 'all', chunk_size=2)
+        assert batched.keys() == ['all']
+        assert batched.cash_flows('all').balance[0] == sum(principals)
+        assert pool.Pool().add_batch(principals, rates, terms).keys() == [None]
+
+    def test_compounded(self):
+        batched = pool.Pool().add_batch(principals, rates, terms, compounded='biweekly')
+        loans = [Loan(*spec, compounded='biweekly') for spec in zip(principals, rates, terms)]
+        looped = pool.Pool().add_loans(loans)
+        assert np.allclose(batched.cash_flows().payment, looped.cash_flows().payment, atol=1e-6)
+        assert np.allclose(batched.cash_flows().wam[1:780], looped.cash_flows().wam[1:780])
+
+    def test_fractional_terms(self):
+        batched = pool.Pool().add_batch(200000, .06, 15.5).cash_flows()
+        looped = pool.Pool().add(Loan(200000, .06, 15.5)).cash_flows()
+        assert batched.balance.shape == looped.balance.shape == (187,)
+        assert np.allclose(batched.payment, looped.payment, atol=1e-6)
+        assert np.allclose(batched.wam[:-1], looped.wam[:-1])
+
+    def test_invalid(self):
+        with pytest.raises(AssertionError):
+            pool.Pool().add_batch(principals, rates, terms, chunk_size=0)
+        with pytest.raises(AssertionError):
+            pool.Pool().add_batch(principals, rates, terms, keys=['a', 'b'])
+        with pytest.raises(AssertionError):
+            pool.rate_bucket(rates, 0)
+
+
+class TestRateBucket(object):
+
+    def test_edges(self):
+        assert pool.rate_bucket([.0499, .05, .0549, .055], .005).tolist() == [.045, .05, .05, .055]
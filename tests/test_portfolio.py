@@ -0,0 +1,67 @@
+from decimal import Decimal
+import json
+import pytest
+
+from mortgage import Loan, portfolio
+from mortgage.loan import LoanSpec
+
+
+def convert(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+specs = [(100000 + 5000 * index, .03 + .00125 * index, 15 if index % 2 else 30) for index in range(23)]
+
+
+class TestPortfolio(object):
+
+    def test_summarize(self):
+        summary = portfolio.summarize(Loan(principal=200000, interest=.06, term=30))
+        assert summary.principal == convert(200000)
+        assert summary.apy == convert(6.17)
+        assert summary.apr == convert(6.00)
+        assert summary.monthly_payment == convert(1199.10)
+        assert summary.total_interest == convert(231676.38)
+        assert summary.total_paid == convert(431676.38)
+        assert summary.interest_to_principle == 115.8
+        assert summary.years_to_pay == 30
+
+    def test_ordered(self):
+        results = list(portfolio.run(iter(specs), chunk_size=4, workers=2))
+        assert [index for index, _ in results] == list(range(len(specs)))
+        for index, summary in results:
+            assert summary == portfolio.summarize(Loan(*specs[index]))
+
+    def test_unordered(self):
+        results = list(portfolio.run(specs, chunk_size=3, workers=3, ordered=False))
+        assert sorted(index for index, _ in results) == list(range(len(specs)))
+
+    def test_spec_forms(self):
+        forms = [
+            (200000, .06, 30),
+            {'principal': 200000, 'interest': .06, 'term': 30, 'compounded': 'monthly'},
+            Loan(principal=200000, interest=.06, term=30),
+            LoanSpec(principal=200000, interest=.06, term=30),
+        ]
+        summaries = [summary for _, summary in portfolio.run(forms, workers=1)]
+        assert summaries[0] == summaries[1] == summaries[2] == summaries[3]
+
+    def test_empty(self):
+        assert list(portfolio.run([], workers=1)) == []
+
+    def test_invalid_chunk_size(self):
+        with pytest.raises(AssertionError):
+            list(portfolio.run(specs, chunk_size=0))
+
+    def test_summaries(self):
+        forms = specs[:3] + [specs[0], {'principal': 200000, 'interest': .06, 'term': 30}]
+        results = portfolio.summaries(iter(forms))
+        assert results[:4] == [portfolio.summarize(Loan(*spec)) for spec in forms[:4]]
+        assert results[0] is results[3]
+        assert results[4] == Loan(principal=200000, interest=.06, term=30).summary()
+
+    def test_to_json(self):
+        results = portfolio.summaries(specs[:2])
+        decoded = json.loads(portfolio.to_json(results))
+        assert decoded == [summary.to_dict() for summary in results]
+        assert portfolio.to_json([]) == '[]'
@@ -0,0 +1,98 @@
+from decimal import Decimal
+import pytest
+
+from mortgage import Loan
+from mortgage.prepayment import Prepayment
+
+
+def convert(value):
+    return Decimal(value).quantize(Decimal('0.01'))
+
+
+scenarios = [
+    Prepayment(extra=200),
+    Prepayment(lump_sums={120: 50000}),
+    Prepayment(cpr=.06),
+    Prepayment.psa(150),
+    Prepayment(extra=100, lump_sums={12: 1000, 24: 1000}, cpr=[.01, .02, .03]),
+]
+
+
+class TestPrepayment(object):
+
+    def test_extra_principal_pays_off_early(self):
+        loan = Loan(principal=200000, interest=.06, term=30, prepayment=Prepayment(extra=200))
+        schedule = loan.schedule()
+        assert len(schedule) == 253
+        assert schedule[-1].balance == 0
+        assert convert(schedule[1].principal) == convert(399.10)
+        assert convert(schedule[1].payment) == convert(1399.10)
+        assert loan.years_to_pay == 21.0
+        assert loan.total_interest == convert(151875.87)
+
+    def test_lump_sum(self):
+        loan = Loan(principal=200000, interest=.06, term=30, prepayment=Prepayment(lump_sums={120: 50000}))
+        assert convert(loan.schedule(120).principal) == convert(50360.44)
+        assert loan.balance_at(120) == convert(167371.45 - 50000)
+        assert loan.balance_at(360) == 0
+
+    def test_cpr(self):
+        loan = Loan(principal=200000, interest=.06, term=30, prepayment=Prepayment(cpr=.06))
+        first = loan.schedule(1)
+        smm = 1 - (1 - Decimal('.06')) ** (Decimal(1) / 12)
+        assert convert(first.principal) == convert(Decimal('199.101050305504789182922487')
+                                                   + (200000 - Decimal('199.101050305504789182922487')) * smm)
+
+    def test_psa_curve(self):
+        prepayment = Prepayment.psa(100)
+        assert prepayment.smm_at(1, 1) == Decimal('0.002')
+        assert prepayment.smm_at(30, 1) == Decimal('0.06')
+        assert prepayment.smm_at(300, 1) == Decimal('0.06')
+
+    def test_first_difference(self):
+        base = Prepayment(lump_sums={120: 1000})
+        assert base.first_difference(Prepayment(lump_sums={120: 1000})) is None
+        assert base.first_difference(Prepayment(lump_sums={120: 1000, 200: 5})) == 200
+        assert base.first_difference(Prepayment(lump_sums={60: 1, 120: 1000})) == 60
+        assert base.first_difference(None) == 120
+        assert Prepayment().first_difference(Prepayment(extra=1)) == 1
+        assert Prepayment(cpr=[.01, .02]).first_difference(Prepayment(cpr=[.01, .02, .03])) == 3
+
+    @pytest.mark.parametrize('prepayment', scenarios)
+    @pytest.mark.parametrize('backend', ['decimal', 'float', 'bank'])
+    def test_incremental_matches_fresh(self, backend, prepayment):
+        base = Loan(principal=200000, interest=.06, term=30, backend=backend)
+        base.schedule()
+        incremental = base.with_prepayment(prepayment)
+        fresh = Loan(principal=200000, interest=.06, term=30, backend=backend, prepayment=prepayment)
+        assert incremental._Loan__schedule is not None
+        assert len(incremental.schedule()) == len(fresh.schedule())
+        for number in range(1, len(fresh.schedule()), 7):
+            assert convert(incremental.schedule(number).balance) == convert(fresh.schedule(number).balance)
+        assert incremental.total_interest == fresh.total_interest
+        assert incremental.years_to_pay == fresh.years_to_pay
+
+    def test_incremental_reuses_prefix(self):
+        base = Loan(principal=200000, interest=.06, term=30)
+        base.schedule()
+        loan = base.with_prepayment(Prepayment(lump_sums={300: 1000}))
+        assert loan.schedule().balance[299] is base.schedule().balance[299]
+        assert loan.schedule(301).balance < base.schedule(301).balance
+
+    def test_removing_prepayment(self):
+        prepaid = Loan(principal=200000, interest=.06, term=30, prepayment=Prepayment(extra=200))
+        prepaid.schedule()
+        loan = prepaid.with_prepayment(None)
+        assert len(loan.schedule()) == 361
+        assert loan.total_interest == convert(231676.38)
+
+    @pytest.mark.parametrize('backend', ['decimal', 'bank'])
+    def test_iter_schedule_stops_at_payoff(self, backend):
+        loan = Loan(principal=200000, interest=.06, term=30, backend=backend, prepayment=Prepayment(extra=200))
+        rows = list(loan.iter_schedule(250))
+        assert [row.number for row in rows] == [250, 251, 252]
+        assert rows[-1].balance == 0
+
+    def test_invalid_cpr(self):
+        with pytest.raises(AssertionError):
+            Prepayment(cpr=1)
@@ -0,0 +1,91 @@
+from array import array
+from decimal import Decimal
+import pytest
+
+from mortgage import Loan
+from mortgage.schedule import Installment, Schedule
+
+
+@pytest.fixture(scope='module')
+def schedule():
+    return Loan(principal=200000, interest=.06, term=30).schedule()
+
+
+class TestSchedule(object):
+
+    def test_length(self, schedule):
+        assert len(schedule) == 361
+
+    def test_indexing_builds_installments(self, schedule):
+        installment = schedule[1]
+        assert isinstance(installment, Installment)
+        assert installment.number == 1
+        assert schedule[-1].number == 360
+
+    def test_index_out_of_range(self, schedule):
+        with pytest.raises(IndexError):
+            schedule[361]
+
+    def test_slice_returns_installments(self, schedule):
+        assert [installment.number for installment in schedule[1:4]] == [1, 2, 3]
+
+    def test_iteration_matches_indexing(self, schedule):
+        assert list(schedule)[180] == schedule[180]
+
+    def test_column_access(self, schedule):
+        assert schedule.column('balance')[0] == Decimal(200000)
+        with pytest.raises(AssertionError):
+            schedule.column('number')
+
+    @pytest.mark.parametrize('kind, typecode', [('float', 'd'), ('cents', 'q')])
+    def test_compact_columns_are_contiguous(self, schedule, kind, typecode):
+        compact = schedule.compact(kind)
+        assert all(isinstance(column, array) and column.typecode == typecode
+                   for column in compact.columns())
+        assert compact.nbytes * 5 < schedule.nbytes
+
+    def test_float_schedule_values(self, schedule):
+        compact = schedule.compact('float')
+        assert round(compact[10].balance, 2) == 197963.59
+
+    def test_cents_schedule_values(self, schedule):
+        compact = schedule.compact('cents')
+        assert compact[10].balance == Decimal('197963.59')
+        assert compact.balance[10] == 19796359
+        assert compact.compact('float')[10].balance == 197963.59
+
+    def test_equality(self, schedule):
+        same = Loan(principal=200000, interest=.06, term=30).schedule()
+        assert same is not schedule and same == schedule
+        assert not same != schedule
+        assert schedule == list(schedule) and list(schedule) == schedule
+        assert schedule != Loan(principal=200000, interest=.06, term=15).schedule()
+        assert schedule != Loan(principal=200001, interest=.06, term=30).schedule()
+        assert schedule.freeze() == schedule
+        assert schedule != tuple(schedule) and schedule != 'schedule'
+        cents = Schedule([0, 30], [0, 10], [0, 20], [0, 10], [100, 80])
+        assert cents.compact('cents') == cents
+        with pytest.raises(TypeError):
+            hash(schedule)
+
+    def test_mismatched_columns(self):
+        with pytest.raises(AssertionError):
+            Schedule([0], [0], [0], [0], [100, 90])
+
+    def test_invalid_kind(self):
+        with pytest.raises(AssertionError):
+            Schedule([0], [0], [0], [0], [100], kind='int')
+
+    @pytest.mark.parametrize('kind', ['decimal', 'float', 'cents'])
+    def test_freeze(self, schedule, kind):
+        source = schedule if kind == 'decimal' else schedule.compact(kind)
+        frozen = source.freeze()
+        assert frozen.frozen and not source.frozen
+        assert frozen.freeze() is frozen
+        assert list(frozen) == list(source)
+        assert all(isinstance(column, tuple) for column in frozen.columns())
+        with pytest.raises(TypeError):
+            frozen.balance[1] = 0
+        with pytest.raises(AttributeError):
+            frozen.start = 1
+        assert not frozen.compact().frozen
@@ -0,0 +1,116 @@
+from decimal import Decimal
+import pytest
+
+from mortgage import Loan
+from mortgage.adjustment import Adjustment
+
+np = pytest.importorskip('numpy')
+simulate = pytest.importorskip('mortgage.simulate')
+
+
+def convert(value):
+    return Decimal(repr(float(value))).quantize(Decimal('0.01'))
+
+
+class TestModels(object):
+
+    def test_vasicek_reverts_to_mean(self):
+        model = simulate.Vasicek(rate=.02, mean=.06, speed=1, volatility=.01)
+        paths = model.paths(5000, 240, 1 / 12, seed=1)
+        assert paths[:, 0].tolist() == [.02] * 5000
+        assert abs(paths[:, -1].mean() - .06) < .001
+
+    def test_vasicek_variance(self):
+        model = simulate.Vasicek(rate=.05, mean=.05, speed=.5, volatility=.02)
+        paths = model.paths(20000, 600, 1 / 12, seed=2)
+        assert abs(paths[:, -1].std() - .02 / np.sqrt(2 * .5)) < .001
+
+    def test_cir_stays_positive(self):
+        model = simulate.CIR(rate=.01, mean=.03, speed=.2, volatility=.2)
+        assert (model.paths(1000, 360, 1 / 12, seed=3) >= 0).all()
+
+    def test_seeded_paths_repeat(self):
+        model = simulate.Vasicek(rate=.05, mean=.05, speed=.5, volatility=.02)
+        assert (model.paths(10, 12, 1 / 12, seed=4) == model.paths(10, 12, 1 / 12, seed=4)).all()
+
+    @pytest.mark.parametrize('args', [
+        (.05, .05, 0, .01),
+        (.05, .05, .5, -.01),
+    ])
+    def test_invalid(self, args):
+        with pytest.raises(AssertionError):
+            simulate.Vasicek(*args)
+        with pytest.raises(AssertionError):
+            simulate.CIR(-.01, .05, .5, .01)
+
+
+class TestSimulate(object):
+
+    def test_constant_rate_matches_loan(self):
+        model = simulate.Vasicek(rate=.06, mean=.06, speed=.2, volatility=0)
+        result = simulate.simulate(200000, .06, 30, model, n_paths=3, horizons=[60, 120], seed=1)
+        loan = Loan(principal=200000, interest=.06, term=30)
+        assert convert(result.total_interest.mean) == loan.total_interest
+        assert result.total_interest.std < 1e-6
+        assert convert(result.balances[120].mean) == loan.balance_at(120)
+        assert result.payoff.mean == pytest.approx(30.0)
+
+    def test_fractional_term_matches_loan(self):
+        model = simulate.Vasicek(rate=.06, mean=.06, speed=.2, volatility=0)
+        result = simulate.simulate(200000, .06, 15.5, model, n_paths=2, seed=1)
+        loan = Loan(principal=200000, interest=.06, term=15.5)
+        assert convert(result.total_interest.mean) == loan.total_interest
+        assert result.payoff.mean == pytest.approx(15.5)
+
+    def test_deterministic_path_matches_adjustment(self):
+        # With no volatility the short rate path is known, so the simulated ARM can be
+        # replayed with the equivalent resets.
+        model = simulate.Vasicek(rate=.03, mean=.06, speed=.5, volatility=0)
+        result = simulate.simulate(200000, .05, 30, model, n_paths=2, fixed=60, margin=.01,
+                                   horizons=[84], seed=1)
+        rates = model.paths(1, 360, 1 / 12)[0]
+        resets = {number: rates[number] + .01 for number in range(61, 361, 12)}
+        loan = Loan(principal=200000, interest=.05, term=30, backend='float',
+                    adjustment=Adjustment(resets=resets))
+        assert convert(result.total_interest.mean) == loan.total_interest
+        assert convert(result.balances[84].mean) == loan.balance_at(84)
+
+    def test_portfolio_sums_loans(self):
+        model = simulate.Vasicek(rate=.05, mean=.05, speed=.2, volatility=0)
+        result = simulate.simulate([200000, 100000], .05, [30, 15], model, n_paths=2, seed=1)
+        loans = [Loan(principal=200000, interest=.05, term=30),
+                 Loan(principal=100000, interest=.05, term=15)]
+        assert convert(result.total_interest.mean) == sum(loan.total_interest for loan in loans)
+        assert result.payoff.mean == pytest.approx(30.0)
+
+    def test_extra_payments_shorten_payoff(self):
+        model = simulate.Vasicek(rate=.05, mean=.05, speed=.2, volatility=.01)
+        result = simulate.simulate(200000, .05, 30, model, n_paths=200, fixed=360, extra=500,
+                                   seed=1)
+        assert result.payoff.mean < 20
+
+    def test_reproducible_across_workers(self):
+        model = simulate.CIR(rate=.05, mean=.05, speed=.3, volatility=.05)
+        kwargs = dict(n_paths=500, fixed=60, margin=.02, horizons=[120], seed=42, block_size=100)
+        first = simulate.simulate(200000, .05, 30, model, workers=1, **kwargs)
+        second = simulate.simulate(200000, .05, 30, model, workers=2, **kwargs)
+        assert first == second
+        assert first.total_interest.std > 0
+        quantiles = first.total_interest.quantiles
+        assert quantiles[.05] < quantiles[.5] < quantiles[.95]
+
+    def test_seed_changes_result(self):
+        model = simulate.Vasicek(rate=.05, mean=.05, speed=.3, volatility=.02)
+        first = simulate.simulate(200000, .05, 30, model, n_paths=100, seed=1)
+        second = simulate.simulate(200000, .05, 30, model, n_paths=100, seed=2)
+        assert first.total_interest.mean != second.total_interest.mean
+
+    def test_partial_block(self):
+        model = simulate.Vasicek(rate=.05, mean=.05, speed=.3, volatility=.02)
+        result = simulate.simulate(200000, .05, 30, model, n_paths=250, block_size=100, seed=1)
+        assert result.paths == 250
+
+    def test_invalid_horizon(self):
+        model = simulate.Vasicek(rate=.05, mean=.05, speed=.3, volatility=.02)
+        with pytest.raises(AssertionError):
+            simulate.simulate(200000, .05, 30, model, horizons=[361])
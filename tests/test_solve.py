@@ -0,0 +1,68 @@
+from decimal import Decimal
+import pytest
+
+from mortgage import Loan, solve
+
+loans = [
+    (200000, .06, 30, 'monthly'),
+    (200000, .06, 15, 'monthly'),
+    (350000, .04125, 30, 'monthly'),
+    (125000, .0375, 10, 'annually'),
+    (90000, .07, 5, 'daily'),
+    (50000, .0001, 1, 'monthly'),
+    (50000, .95, 30, 'monthly'),
+]
+
+
+class TestSolve(object):
+
+    @pytest.mark.parametrize('principal, interest, term, compounded', loans)
+    def test_rate_from_payment(self, principal, interest, term, compounded):
+        loan = Loan(principal=principal, interest=interest, term=term, compounded=compounded)
+        rate = solve.rate_from_payment(loan._monthly_payment, principal, term, compounded)
+        assert rate == pytest.approx(interest, abs=1e-9)
+
+    @pytest.mark.parametrize('principal, interest, term, compounded', loans)
+    def test_term_from_payment(self, principal, interest, term, compounded):
+        loan = Loan(principal=principal, interest=interest, term=term, compounded=compounded)
+        assert solve.term_from_payment(loan._monthly_payment, principal, interest, compounded) == \
+            pytest.approx(term, rel=1e-5)
+
+    @pytest.mark.parametrize('principal, interest, term, compounded', loans)
+    def test_principal_from_payment(self, principal, interest, term, compounded):
+        loan = Loan(principal=principal, interest=interest, term=term, compounded=compounded)
+        assert solve.principal_from_payment(loan._monthly_payment, interest, term, compounded) == principal
+
+    def test_fractional_terms_round_like_loan(self):
+        loan = Loan(principal=100000, interest=.05, term=14.5, compounded='annually')
+        payment = loan._monthly_payment
+        assert solve.rate_from_payment(payment, 100000, 14.5, 'annually') == pytest.approx(.05)
+        assert solve.principal_from_payment(payment, .05, 14.5, 'annually') == 100000
+        batch = pytest.importorskip('mortgage.batch')
+        prepared = batch.prepare(100000, .05, 14.5, 'annually')
+        assert prepared.n_payments.tolist() == [14]
+
+    def test_principal_is_rounded_down(self):
+        principal = solve.principal_from_payment(1199.13, .06, 30)
+        assert principal == Decimal('200004.82')
+        assert Loan(principal=principal, interest=.06, term=30)._monthly_payment <= Decimal('1199.13')
+        assert Loan(principal=principal + Decimal('0.01'), interest=.06,
+                    term=30)._monthly_payment > Decimal('1199.13')
+
+    def test_converges_in_a_few_iterations(self, monkeypatch):
+        calls = []
+        annuity = solve._annuity
+        monkeypatch.setattr(solve, '_annuity', lambda rate, n: calls.append(rate) or annuity(rate, n))
+        solve.rate_from_payment(1199.10, 200000, 30)
+        assert len(calls) <= 6
+
+    def test_zero_interest(self):
+        assert solve.rate_from_payment(1000, 12000, 1) == pytest.approx(0, abs=1e-9)
+        assert solve.term_from_payment(1000, 12000, 0) == 1
+        assert solve.principal_from_payment(1000, 0, 1) == 12000
+
+    def test_payment_too_small(self):
+        with pytest.raises(AssertionError):
+            solve.rate_from_payment(100, 200000, 30)
+        with pytest.raises(AssertionError):
+            solve.term_from_payment(1000, 200000, .06)
@@ -0,0 +1,134 @@
+from decimal import Decimal
+import pytest
+
+from mortgage import Loan
+from mortgage.prepayment import Prepayment
+
+np = pytest.importorskip('numpy')
+store = pytest.importorskip('mortgage.store')
+
+
+def convert(value):
+    return Decimal(repr(float(value))).quantize(Decimal('0.01'))
+
+
+loans = [
+    Loan(principal=200000, interest=.06, term=30),
+    Loan(principal=150000, interest=.045, term=15, backend='bank'),
+    Loan(principal=90000, interest=.07, term=5, prepayment=Prepayment(extra=500)),
+]
+
+
+@pytest.fixture
+def dense(tmp_path):
+    return store.ScheduleStore.create(str(tmp_path / 'dense'), loans)
+
+
+@pytest.fixture
+def sparse(tmp_path):
+    return store.ScheduleStore.create(str(tmp_path / 'sparse'), iter(loans), ids=[907, 12, 5000])
+
+
+class TestScheduleStore(object):
+
+    def test_balances_match_loans(self, dense, sparse):
+        for loan_id, sparse_id, loan in zip([1, 2, 3], [907, 12, 5000], loans):
+            for number in (0, 1, 30, len(loan.schedule()) - 1):
+                expected = convert(loan.schedule()[number].balance)
+                assert convert(dense.balance_at(loan_id, number)) == expected
+                assert convert(sparse.balance_at(sparse_id, number)) == expected
+
+    def test_index(self, dense, sparse):
+        assert len(dense) == 3
+        assert dense.ids.tolist() == [1, 2, 3]
+        assert sparse.ids.tolist() == [12, 907, 5000]
+        assert 907 in sparse and 908 not in sparse
+        assert 0 not in dense and 4 not in dense
+
+    def test_reopen(self, sparse):
+        reopened = store.ScheduleStore(sparse.path)
+        assert len(reopened.rows) == len(sparse.rows)
+        assert reopened.balance_at(12, 5) == sparse.balance_at(12, 5)
+
+    def test_schedule_is_a_view(self, dense):
+        schedule = dense.schedule(2)
+        assert len(schedule) == 181
+        assert schedule['number'].tolist() == list(range(181))
+        assert (schedule['loan'] == 2).all()
+        assert np.shares_memory(schedule, dense.rows)
+        assert not schedule.flags.writeable
+
+    def test_row(self, dense):
+        row = dense.row(1, 120)
+        assert int(row['number']) == 120
+        assert convert(row['balance']) == Decimal('167371.45')
+        with pytest.raises(IndexError):
+            dense.row(1, 361)
+
+    def test_paid_off_balance_stays_zero(self, dense):
+        length = len(loans[2].schedule())
+        assert length < 61
+        assert dense.balance_at(3, 60) == dense.balance_at(3, length - 1)
+        assert convert(dense.balance_at(3, 60)) == 0
+
+    def test_column(self, dense):
+        assert dense.column('balance').shape == (361 + 181 + len(loans[2].schedule()),)
+        assert convert(dense.column('interest', 1)[1]) == Decimal('1000.00')
+
+    def test_missing_loan(self, dense, sparse):
+        with pytest.raises(KeyError):
+            dense.schedule(4)
+        with pytest.raises(KeyError):
+            sparse.balance_at(13, 1)
+
+    def test_duplicate_ids(self, tmp_path):
+        def unread():
+            raise AssertionError('loans must not be read')
+            yield
+        with pytest.raises(AssertionError, match='unique'):
+            store.ScheduleStore.create(str(tmp_path / 'new'), unread(), ids=[1, 1])
+        assert not (tmp_path / 'new').exists()
+
+    @pytest.mark.parametrize('ids', [[7, 8], [7, 8, 9, 10]])
+    def test_ids_must_match_loans(self, tmp_path, ids):
+        path = str(tmp_path)
+        store.ScheduleStore.create(path, loans, ids=[1, 2, 3])
+        with pytest.raises(ValueError):
+            store.ScheduleStore.create(path, loans, ids=ids)
+        assert sorted(item.name for item in tmp_path.iterdir()) == ['index.npy', 'rows.npy']
+        assert store.ScheduleStore(path).ids.tolist() == [1, 2, 3]
+
+    def test_ids_must_be_integers(self, tmp_path):
+        with pytest.raises(AssertionError, match='integers'):
+            store.ScheduleStore.create(str(tmp_path / 'new'), loans, ids=[1, 2.5, 3])
+        assert not (tmp_path / 'new').exists()
+        assert store.ScheduleStore.create(str(tmp_path), loans, ids=np.arange(3)).ids.tolist() == [0, 1, 2]
+
+    def test_integral_lookups(self, dense, sparse):
+        assert dense.balance_at(1.0, 0) == dense.balance_at(1, 0)
+        assert sparse.balance_at(np.int64(907), 0) == sparse.balance_at(907, 0)
+        assert 2.0 in dense and 907.0 in sparse
+        for missing in (1.5, 'a', None, float('nan')):
+            assert missing not in dense and missing not in sparse
+        with pytest.raises(KeyError):
+            dense.schedule(1.5)
+
+    def test_failed_create_keeps_previous_store(self, tmp_path):
+        path = str(tmp_path)
+        store.ScheduleStore.create(path, loans, ids=[1, 2, 3])
+
+        def failing():
+            yield loans[0]
+            raise ValueError('unavailable')
+
+        with pytest.raises(ValueError):
+            store.ScheduleStore.create(path, failing(), ids=[7, 8])
+        assert sorted(item.name for item in tmp_path.iterdir()) == ['index.npy', 'rows.npy']
+        kept = store.ScheduleStore(path)
+        assert kept.ids.tolist() == [1, 2, 3]
+        assert convert(kept.balance_at(3, 0)) == convert(90000)
+
+    def test_empty(self, tmp_path):
+        empty = store.ScheduleStore.create(str(tmp_path), [])
+        assert len(empty) == 0
+        assert 1 not in empty
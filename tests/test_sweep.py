@@ -0,0 +1,70 @@
+from decimal import Decimal
+from itertools import product
+import pytest
+
+from mortgage import Loan
+
+np = pytest.importorskip('numpy')
+sweep = pytest.importorskip('mortgage.sweep')
+
+
+def convert(value):
+    return Decimal(repr(float(value))).quantize(Decimal('0.01'))
+
+
+principals = [100000, 200000, 350000]
+rates = [.03, .04125, .05, .06]
+terms = [10, 15, 30]
+frequencies = ['monthly', 'daily', 'annually']
+
+
+@pytest.fixture(scope='module')
+def table():
+    return sweep.sweep(principals, rates, terms, frequencies)
+
+
+class TestSweep(object):
+
+    def test_shape_and_order(self, table):
+        assert table.shape == (3, 4, 3, 3)
+        assert table.monthly_payment.shape == (108,)
+        cells = list(product(principals, rates, terms, frequencies))
+        assert list(zip(table.principal.tolist(), table.interest.tolist(), table.term.tolist(),
+                        table.compounded.tolist())) == cells
+
+    def test_matches_loan(self, table):
+        cells = product(principals, rates, terms, frequencies)
+        for index, (principal, rate, term, compounded) in enumerate(cells):
+            loan = Loan(principal=principal, interest=rate, term=term, compounded=compounded)
+            assert convert(table.monthly_payment[index]) == loan.monthly_payment
+            assert convert(table.total_interest[index]) == loan.total_interest
+            assert table.interest_to_principle[index] == loan.interest_to_principle
+            assert convert(table.apr[index]) == loan.apr
+            assert convert(table.apy[index]) == loan.apy
+
+    def test_grid(self, table):
+        grid = table.monthly_payment.reshape(table.shape)
+        assert grid[1, 3, 2, 0] == 1199.10
+        assert (np.diff(grid[..., 0], axis=0) > 0).all()
+
+    def test_scalars(self):
+        table = sweep.sweep(200000, .06, 30)
+        assert table.shape == (1, 1, 1, 1)
+        assert table.monthly_payment.tolist() == [1199.10]
+        assert table.total_interest.tolist() == [231676.38]
+
+    def test_fractional_terms(self):
+        table = sweep.sweep(200000, .06, [15.5, 30])
+        assert table.term.tolist() == [15.5, 30]
+        assert convert(table.monthly_payment[0]) == Loan(200000, .06, 15.5).monthly_payment
+
+    @pytest.mark.parametrize('args', [
+        (0, .06, 30, 'monthly'),
+        (200000, 1.5, 30, 'monthly'),
+        (200000, .06, 0, 'monthly'),
+        (200000, .06, 30, 'hourly'),
+        (200000, .06, 30, []),
+    ])
+    def test_invalid(self, args):
+        with pytest.raises(AssertionError):
+            sweep.sweep(*args)